@@ -11,8 +11,11 @@ from .fixtures import (
     log_in_as_medical_secretary,
     log_in_as_nurse,
     log_in_as_prescriber,
+    log_in_session_cache,
+    mavis_testing_api,
     national_reporting_file_generator,
     national_reporting_healthcare_assistant,
+    national_reporting_lease,
     national_reporting_medical_secretary,
     national_reporting_nurse,
     national_reporting_onboarding,
@@ -20,9 +23,11 @@ from .fixtures import (
     national_reporting_prescriber,
     national_reporting_superuser,
     national_reporting_team,
+    onboarding_pool,
     point_of_care_clinics,
     point_of_care_file_generator,
     point_of_care_healthcare_assistant,
+    point_of_care_lease,
     point_of_care_medical_secretary,
     point_of_care_nurse,
     point_of_care_onboarding,
@@ -75,8 +80,11 @@ __all__ = [
     "log_in_as_medical_secretary",
     "log_in_as_nurse",
     "log_in_as_prescriber",
+    "log_in_session_cache",
+    "mavis_testing_api",
     "national_reporting_file_generator",
     "national_reporting_healthcare_assistant",
+    "national_reporting_lease",
     "national_reporting_medical_secretary",
     "national_reporting_nurse",
     "national_reporting_onboarding",
@@ -84,9 +92,11 @@ __all__ = [
     "national_reporting_prescriber",
     "national_reporting_superuser",
     "national_reporting_team",
+    "onboarding_pool",
     "point_of_care_clinics",
     "point_of_care_file_generator",
     "point_of_care_healthcare_assistant",
+    "point_of_care_lease",
     "point_of_care_medical_secretary",
     "point_of_care_nurse",
     "point_of_care_onboarding",
@@ -0,0 +1,57 @@
+"""Offline benchmarks for the tooling in this repository.
+
+Each module can be run directly, for example:
+    python -m mavis.test.benchmarks.placeholder_substitution
+"""
+
+import logging
+import time
+from collections.abc import Callable
+
+from mavis.test.constants import Programme
+from mavis.test.data.file_generator import FileGenerator
+from mavis.test.data_models import Child, Clinic, Organisation, School, User
+
+
+def configure_logging() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def offline_file_generator() -> FileGenerator:
+    """A FileGenerator populated with generated data, needing no Mavis instance."""
+    year_groups = {programme.group: 9 for programme in Programme}
+    schools = {
+        programme.group: [
+            School(
+                name=f"Benchmark School {index}",
+                urn=f"10000{index}",
+                site="",
+                address_line_1="",
+                address_line_2="",
+                address_town="",
+                address_postcode="",
+            )
+            for index in range(2)
+        ]
+        for programme in Programme
+    }
+    return FileGenerator(
+        organisation=Organisation.generate(),
+        schools=schools,
+        nurse=User.generate("nurse"),
+        children=Child.generate_children_in_year_group_for_each_programme_group(
+            2, year_groups
+        ),
+        clinics=[Clinic.generate()],
+        year_groups=year_groups,
+    )
@@ -0,0 +1,202 @@
+"""
+Load benchmark for the CarePlus mock's InsertImmsRecord endpoint.
+
+Posts --requests SOAP requests for each payload size, with up to --concurrency
+in flight over kept-alive connections, and logs requests per second and
+latency percentiles. Each payload is a CarePlus CSV export (as Mavis sends)
+of --rows vaccination records. Without --base-url a CarePlus mock is started
+in this process, processing at most --workers requests at once if given and
+keeping the accepted records in --record-store; as it shares the CPU with the
+client, start one separately with python -m mavis.test.mocks.careplus for
+steadier numbers.
+
+Usage:
+    python -m mavis.test.benchmarks.careplus [--requests 2000]
+      [--concurrency 50] [--rows 1 --rows 30 --rows 300] [--workers N]
+      [--record-store none|memory|sqlite]
+      [--base-url http://127.0.0.1:8080/MOCK/soap.SCHImms.cls]
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import logging
+import statistics
+import threading
+import time
+from xml.sax.saxutils import escape
+
+import httpx
+
+from mavis.test.benchmarks import configure_logging
+from mavis.test.constants import ReportFormat
+from mavis.test.data import ChildBatch
+from mavis.test.mocks.careplus import (
+    CAREPLUS_BASE_URL,
+    DEFAULT_MAX_REQUEST_BYTES,
+    CarePlusServer,
+    Config,
+    SOAPHandler,
+    build_service_path,
+)
+from mavis.test.mocks.careplus.store import (
+    MemoryRecordStore,
+    RecordStore,
+    SQLiteRecordStore,
+)
+
+DEFAULT_REQUESTS = 2_000
+DEFAULT_CONCURRENCY = 50
+DEFAULT_ROWS = [1, 30, 300]
+VACCINE_COLUMNS = 6
+VACCINE_SLOTS = 5
+RECORD_STORES: dict[str, type[RecordStore] | None] = {
+    "none": None,
+    "memory": MemoryRecordStore,
+    "sqlite": SQLiteRecordStore,
+}
+
+log = logging.getLogger(__name__)
+
+
+def _start_mock(workers: int | None, store: RecordStore | None) -> str:
+    config: Config = {
+        "host": "127.0.0.1",
+        "port": 0,
+        "path": build_service_path("MOCK"),
+        "max_request_bytes": DEFAULT_MAX_REQUEST_BYTES,
+    }
+    server = CarePlusServer(
+        (config["host"], config["port"]),
+        SOAPHandler.make_handler(config, store),
+        workers=workers,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://{config['host']}:{server.server_port}{config['path']}"
+
+
+def careplus_csv(rows: int) -> str:
+    """A CarePlus export of rows children, each given one flu vaccination."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\r\n")
+    writer.writerow(ReportFormat.CAREPLUS.headers.split(","))
+    empty_slots = [""] * VACCINE_COLUMNS * (VACCINE_SLOTS - 1)
+    for child in ChildBatch.generate(rows, year_group=9):
+        writer.writerow(
+            [
+                child.nhs_number,
+                child.last_name,
+                child.first_name,
+                child.date_of_birth.strftime("%d/%m/%Y"),
+                child.address[0],
+                child.parents[0].full_name,
+                "",
+                "01/09/2025",
+                "09:30",
+                "SC",
+                "R1LA",
+                "IN",
+                "R1LB",
+                "Y",
+                "",
+                "",
+                "FLU",
+                "1",
+                "",
+                "Left Upper Arm",
+                "Sequirus",
+                "AB1234",
+                *empty_slots,
+                "Not Known",
+            ]
+        )
+    return output.getvalue()
+
+
+def soap_envelope(payload: str) -> bytes:
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
+               xmlns:s0="{CAREPLUS_BASE_URL}">
+  <soap:Body>
+    <s0:InsertImmsRecord>
+      <s0:strUserId>benchmark</s0:strUserId>
+      <s0:strPwd>benchmark</s0:strPwd>
+      <s0:strPayload>{escape(payload)}</s0:strPayload>
+    </s0:InsertImmsRecord>
+  </soap:Body>
+</soap:Envelope>""".encode()
+
+
+async def _post_all(
+    client: httpx.AsyncClient, url: str, body: bytes, requests: int, concurrency: int
+) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = {
+        "Content-Type": "text/xml; charset=utf-8",
+        "SOAPAction": f"{CAREPLUS_BASE_URL}/soap.SCHImms.InsertImmsRecord",
+    }
+    latencies: list[float] = []
+
+    async def post() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(url, content=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(post() for _ in range(requests)))
+    return time.perf_counter() - start, latencies
+
+
+async def _run(url: str, rows: list[int], requests: int, concurrency: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        for row_count in rows:
+            body = soap_envelope(careplus_csv(row_count))
+            # open the connections and warm up before timing
+            await _post_all(client, url, body, 10 * concurrency, concurrency)
+            elapsed, latencies = await _post_all(
+                client, url, body, requests, concurrency
+            )
+            percentiles = statistics.quantiles(latencies, n=100)
+            log.info(
+                "%5d rows %8.1f KB  %7d requests in %6.2fs  %8.1f/s  %6.1f MB/s"
+                "  p50 %6.1fms  p95 %6.1fms  p99 %6.1fms",
+                row_count,
+                len(body) / 1024,
+                requests,
+                elapsed,
+                requests / elapsed,
+                requests * len(body) / elapsed / 1024 / 1024,
+                percentiles[49] * 1000,
+                percentiles[94] * 1000,
+                percentiles[98] * 1000,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rows", type=int, action="append")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--record-store", choices=list(RECORD_STORES), default="none")
+    parser.add_argument("--base-url")
+    args = parser.parse_args()
+
+    configure_logging()
+    # the mock logs every request
+    logging.getLogger("mavis.test.mocks.careplus").setLevel(logging.WARNING)
+    store_class = RECORD_STORES[args.record_store]
+    url = args.base_url or _start_mock(
+        args.workers, store_class() if store_class else None
+    )
+    log.info("Running against %s", url)
+
+    asyncio.run(_run(url, args.rows or DEFAULT_ROWS, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
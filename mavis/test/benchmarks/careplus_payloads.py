@@ -0,0 +1,94 @@
+"""
+Benchmark of the CarePlus mock validating large InsertImmsRecord requests.
+
+Posts one request for each of --sizes megabytes of CarePlus CSV, timing the
+best of --repeat, and then posts it once more while tracing allocations to
+find the peak memory the mock needed to parse and validate it. Without
+--base-url a CarePlus mock is started in this process; the peak memory is
+only measured for that mock.
+
+Usage:
+    python -m mavis.test.benchmarks.careplus_payloads [--sizes 1 10 100]
+      [--repeat 3] [--base-url http://127.0.0.1:8080/MOCK/soap.SCHImms.cls]
+"""
+
+import argparse
+import logging
+import threading
+import tracemalloc
+
+import httpx
+
+from mavis.test.benchmarks import best_of, configure_logging
+from mavis.test.benchmarks.careplus import careplus_csv, soap_envelope
+from mavis.test.mocks.careplus import (
+    CarePlusServer,
+    Config,
+    SOAPHandler,
+    build_service_path,
+)
+
+DEFAULT_SIZES = [1, 10, 100]
+DEFAULT_REPEAT = 3
+SAMPLE_ROWS = 1_000
+MB = 1024 * 1024
+
+log = logging.getLogger(__name__)
+
+
+def _start_mock(max_request_bytes: int) -> str:
+    config: Config = {
+        "host": "127.0.0.1",
+        "port": 0,
+        "path": build_service_path("MOCK"),
+        "max_request_bytes": max_request_bytes,
+    }
+    server = CarePlusServer(
+        (config["host"], config["port"]), SOAPHandler.make_handler(config)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://{config['host']}:{server.server_port}{config['path']}"
+
+
+def large_careplus_csv(size_bytes: int) -> str:
+    """A CarePlus export of about size_bytes, repeating a sample of rows."""
+    header, _, rows = careplus_csv(SAMPLE_ROWS).partition("\r\n")
+    return header + "\r\n" + rows * max(1, round(size_bytes / len(rows)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--base-url")
+    args = parser.parse_args()
+
+    configure_logging()
+    url = args.base_url or _start_mock(2 * max(args.sizes) * MB)
+    log.info("Running against %s", url)
+
+    with httpx.Client(timeout=600) as client:
+        for size in args.sizes:
+            body = soap_envelope(large_careplus_csv(size * MB))
+
+            def post(body: bytes = body) -> None:
+                client.post(url, content=body).raise_for_status()
+
+            elapsed = best_of(args.repeat, post)
+            peak = ""
+            if not args.base_url:
+                tracemalloc.start()
+                post()
+                peak = f"  peak {tracemalloc.get_traced_memory()[1] / MB:7.1f} MB"
+                tracemalloc.stop()
+            log.info(
+                "%5d MB  %6.2fs  %7.1f MB/s%s",
+                size,
+                elapsed,
+                len(body) / MB / elapsed,
+                peak,
+            )
+
+
+if __name__ == "__main__":
+    main()
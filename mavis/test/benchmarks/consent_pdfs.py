@@ -0,0 +1,175 @@
+"""
+Compares checking the health questions of consent form PDFs as the tests used
+to (extracting every page, then normalizing and searching for each question)
+with find_phrases_missing_from_pdf, from cold and once the PDF text is cached.
+
+Each PDF is a synthetic consent form for HPV, flu, MMR, MMRV, MenACWY or
+Td/IPV (the doubles), of --pages pages: the health questions on the second and
+third, one of them across the page break, and notes on the rest, as the real
+forms have. Timings are the best of --repeat.
+
+Usage:
+    python -m mavis.test.benchmarks.consent_pdfs [--pages 8] [--repeat 20]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import textwrap
+from pathlib import Path
+
+from pypdf import PdfReader
+
+from mavis.test import utils
+from mavis.test.benchmarks import best_of, configure_logging
+from mavis.test.constants import ConsentOption, HealthQuestion, Programme
+from mavis.test.utils import find_phrases_missing_from_pdf, normalize_text
+
+DEFAULT_PAGES = 8
+DEFAULT_REPEAT = 20
+LINES_PER_PAGE = 60
+LINE_WIDTH = 90
+
+CONSENT_FORMS: dict[str, list[HealthQuestion]] = {
+    "HPV": Programme.HPV.health_questions(),
+    "flu": Programme.FLU.health_questions(ConsentOption.NASAL_SPRAY_OR_INJECTION),
+    "MMR": Programme.MMR_MMRV.health_questions(),
+    "MMRV": Programme.MMR_MMRV.health_questions(mmrv_eligibility=True),
+    "MenACWY": Programme.MENACWY.health_questions(),
+    "Td/IPV": Programme.TD_IPV.health_questions(),
+}
+WORDS = [
+    "your", "child", "consent", "vaccination", "school", "nurse", "parent",
+    "guardian", "form", "please", "answer", "the", "following", "questions",
+    "about", "health", "before", "their", "appointment",
+]  # fmt: skip
+
+log = logging.getLogger(__name__)
+
+
+def _pdf_string(line: str) -> bytes:
+    escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("latin-1") + b")"
+
+
+def write_pdf(path: Path, pages: list[list[str]]) -> None:
+    """A PDF of pages of lines of Helvetica, without pulling in a PDF library."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b""]
+    objects[2] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    page_numbers = []
+    for lines in pages:
+        content = b"BT /F1 9 Tf 12 TL 40 800 Td %s ET" % b" ".join(
+            _pdf_string(line) + b" Tj T*" for line in lines
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842]"
+            b" /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % len(objects)
+        )
+        page_numbers.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % number for number in page_numbers)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(pages))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, pdf_object in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, pdf_object)
+    cross_reference = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        cross_reference,
+    )
+    path.write_bytes(output)
+
+
+def write_consent_form(
+    path: Path, questions: list[HealthQuestion], pages: int, seed: int = 0
+) -> None:
+    rng = random.Random(seed)
+
+    def notes(lines: int) -> list[str]:
+        return [" ".join(rng.choice(WORDS) for _ in range(14)) for _ in range(lines)]
+
+    question_lines = [
+        line
+        for question in questions
+        for line in [*textwrap.wrap(str(question), LINE_WIDTH), "Yes / No", ""]
+    ]
+    # the questions start part way down the second page and run onto the third
+    body = notes(LINES_PER_PAGE + LINES_PER_PAGE - len(question_lines) // 2)
+    body += question_lines
+    body += notes(max(0, pages * LINES_PER_PAGE - len(body)))
+    write_pdf(
+        path,
+        [
+            body[start : start + LINES_PER_PAGE]
+            for start in range(0, len(body), LINES_PER_PAGE)
+        ],
+    )
+
+
+def _find_missing_baseline(path: Path, questions: list[HealthQuestion]) -> list:
+    """read_pdf_as_normalized_text and assert_questions_in_pdf as they were."""
+    reader = PdfReader(path)
+    pdf_text = ""
+    for pdf_page in reader.pages:
+        pdf_text += pdf_page.extract_text()
+    pdf_text_normalized = normalize_text(pdf_text)
+    return [
+        question
+        for question in questions
+        if normalize_text(str(question)) not in pdf_text_normalized
+    ]
+
+
+def _find_missing_cold(path: Path, questions: list[HealthQuestion]) -> list:
+    utils._pdf_text_cache.clear()  # noqa: SLF001
+    return find_phrases_missing_from_pdf(path, questions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args()
+
+    configure_logging()
+    log.info(
+        "%-8s %9s %13s %14s %11s",
+        "form",
+        "questions",
+        "baseline (ms)",
+        "early stop (ms)",
+        "cached (ms)",
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for name, questions in CONSENT_FORMS.items():
+            path = Path(directory) / f"{name.replace('/', '_')}.pdf"
+            write_consent_form(path, questions, args.pages)
+            for find_missing in (_find_missing_baseline, _find_missing_cold):
+                if missing := find_missing(path, questions):
+                    msg = f"{find_missing.__name__} missed {missing} in {name}"
+                    raise AssertionError(msg)
+
+            def timed(find_missing, path=path, questions=questions) -> float:  # noqa: ANN001
+                return best_of(args.repeat, lambda: find_missing(path, questions))
+
+            log.info(
+                "%-8s %9d %13.2f %14.2f %11.3f",
+                name,
+                len(questions),
+                timed(_find_missing_baseline) * 1000,
+                timed(_find_missing_cold) * 1000,
+                timed(find_phrases_missing_from_pdf) * 1000,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Load driver for the IMMS API helpers, run against the IMMS mock by default.
+
+Creates a vaccination record for each of --records children with up to
+--concurrency requests in flight, searches for each of them, and then times
+AsyncImmsApiHelper verifying the whole batch. Without --base-url an IMMS mock
+is started in this process with the given latency.
+
+Usage:
+    python -m mavis.test.benchmarks.imms_api [--records 2000] [--concurrency 50]
+      [--latency-ms 0] [--base-url http://127.0.0.1:8081/]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import threading
+import time
+import urllib.parse
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from mavis.test.benchmarks import configure_logging
+from mavis.test.constants import DeliverySite, ImmsEndpoints, Vaccine
+from mavis.test.data import ChildBatch
+from mavis.test.data.file_utils import create_fhir_immunization_payload
+from mavis.test.data_models import School
+from mavis.test.fixtures.fhir_api import AuthToken
+from mavis.test.helpers.imms_api_helper import (
+    AsyncImmsApiHelper,
+    ImmsApiVaccinationRecord,
+)
+from mavis.test.mocks.imms import Config, IMMSHandler, IMMSServer
+from mavis.test.utils import get_current_datetime
+
+DEFAULT_RECORDS = 2_000
+DEFAULT_CONCURRENCY = 50
+VACCINE = Vaccine.SEQUIRUS
+DELIVERY_SITE = DeliverySite.LEFT_ARM_UPPER
+
+log = logging.getLogger(__name__)
+
+
+def _start_mock(latency_ms: float) -> str:
+    config: Config = {
+        "host": "127.0.0.1",
+        "port": 0,
+        "latency_seconds": latency_ms / 1000,
+        "latency_jitter_seconds": 0,
+    }
+    server = IMMSServer(
+        (config["host"], config["port"]), IMMSHandler.make_handler(config)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://{config['host']}:{server.server_port}/"
+
+
+def _get_token(base_url: str) -> AuthToken:
+    response = httpx.post(
+        urllib.parse.urljoin(base_url, "oauth2-mock/token"),
+        data={"grant_type": "client_credentials", "client_assertion": "benchmark"},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return AuthToken(response.json()["access_token"])
+
+
+async def _run_concurrently(
+    requests: list[Callable[[], Awaitable[httpx.Response]]], concurrency: int
+) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def run(request: Callable[[], Awaitable[httpx.Response]]) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await request()
+            latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(request) for request in requests))
+    return time.perf_counter() - start, latencies
+
+
+def _log_results(name: str, elapsed: float, latencies: list[float]) -> None:
+    percentiles = statistics.quantiles(latencies, n=100)
+    log.info(
+        "%-8s %7d requests in %6.2fs  %8.1f/s  p50 %6.1fms  p95 %6.1fms  p99 %6.1fms",
+        name,
+        len(latencies),
+        elapsed,
+        len(latencies) / elapsed,
+        percentiles[49] * 1000,
+        percentiles[94] * 1000,
+        percentiles[98] * 1000,
+    )
+
+
+async def _run(base_url: str, records: int, concurrency: int) -> None:
+    helper = AsyncImmsApiHelper(
+        _get_token(base_url), max_concurrency=concurrency, initial_interval_seconds=0.1
+    )
+    school = School(
+        name="Benchmark School",
+        urn="100000",
+        site="",
+        address_line_1="",
+        address_line_2="",
+        address_town="",
+        address_postcode="",
+    )
+    vaccination_time = get_current_datetime().replace(microsecond=0)
+    children = list(ChildBatch.generate(records, year_group=9))
+
+    payloads = [
+        create_fhir_immunization_payload(
+            VACCINE, child, school, DELIVERY_SITE, vaccination_time
+        )
+        for child in children
+    ]
+
+    create_headers = {**helper.headers, "content-type": "application/fhir+json"}
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        creates = [
+            lambda payload=payload: client.post(
+                ImmsEndpoints.CREATE.to_url, headers=create_headers, json=payload
+            )
+            for payload in payloads
+        ]
+        _log_results("create", *await _run_concurrently(creates, concurrency))
+
+        searches = [
+            lambda child=child: client.get(
+                ImmsEndpoints.READ.to_url,
+                headers=helper.headers,
+                params={
+                    "-immunization.target": VACCINE.programme.upper(),
+                    "patient.identifier": "https://fhir.nhs.uk/Id/nhs-number|"
+                    + child.nhs_number,
+                },
+            )
+            for child in children
+        ]
+        _log_results("search", *await _run_concurrently(searches, concurrency))
+
+    expected_records = [
+        ImmsApiVaccinationRecord.from_values(
+            VACCINE, child, DELIVERY_SITE, school, vaccination_time
+        )
+        for child in children
+    ]
+    start = time.perf_counter()
+    await helper.check_records_in_imms_api_async(expected_records)
+    log.info(
+        "verify   %7d records in %6.2fs with AsyncImmsApiHelper",
+        records,
+        time.perf_counter() - start,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=DEFAULT_RECORDS)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--base-url")
+    args = parser.parse_args()
+
+    configure_logging()
+    base_url = args.base_url or _start_mock(args.latency_ms)
+    # ImmsEndpoints reads the base URL from the environment
+    os.environ["IMMS_BASE_URL"] = base_url
+    log.info("Running against %s", base_url)
+
+    asyncio.run(_run(base_url, args.records, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
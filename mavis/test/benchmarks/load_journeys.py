@@ -0,0 +1,116 @@
+"""
+Self-benchmark of the Python load drivers, run against the Mavis stub.
+
+Runs the nurse and consent journeys flat out (no think time) with --users
+virtual users each, writes the samples to a JTL file and times analysing it,
+so changes to the runner, the journeys' parsing or the analyser can be
+measured without a Mavis. Without --base-url a Mavis stub is started in this
+process with the given latency; as it shares the CPU with the driver, start
+one separately with python -m mavis.test.mocks.mavis for steadier numbers.
+
+Usage:
+    python -m mavis.test.benchmarks.load_journeys [--users 20]
+      [--sessions 5] [--patients-per-session 200] [--latency-ms 0]
+      [--journey nurse --journey consent] [--base-url http://127.0.0.1:4001/]
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from mavis.test.benchmarks import configure_logging
+from mavis.test.data_models import User
+from mavis.test.load import (
+    ConsentJourney,
+    LoadProfile,
+    LoadRunner,
+    NurseJourney,
+    analyse_jtl,
+)
+from mavis.test.mocks.mavis import MavisStubHandler, MavisStubServer, default_config
+from mavis.test.mocks.mavis.store import MavisStore
+
+DEFAULT_USERS = 20
+DEFAULT_SESSIONS = 5
+DEFAULT_PATIENTS_PER_SESSION = 200
+DURATION_SECONDS = 600
+JOURNEYS = {"nurse": NurseJourney, "consent": ConsentJourney}
+
+log = logging.getLogger(__name__)
+
+
+def _start_stub(sessions: int, patients_per_session: int, latency_ms: float) -> str:
+    config = default_config()
+    config["latency_seconds"] = latency_ms / 1000
+    store = MavisStore.generate(sessions, patients_per_session, 0.5, seed=1)
+    server = MavisStubServer(
+        (config["host"], config["port"]), MavisStubHandler.make_handler(config, store)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://{config['host']}:{server.server_port}/"
+
+
+def _run_journey(base_url: str, name: str, users: int, jtl_path: Path) -> None:
+    nurse = User.generate("nurse")
+    runner = LoadRunner(
+        base_url,
+        LoadProfile(
+            users=users,
+            ramp_up_seconds=0,
+            duration_seconds=DURATION_SECONDS,
+            think_time_scale=0,
+        ),
+        jtl_path=jtl_path,
+    )
+    start = time.perf_counter()
+    recorder = asyncio.run(runner.run(JOURNEYS[name](nurse=nurse)))
+    elapsed = time.perf_counter() - start
+    samples = sum(len(timings) for timings in recorder.elapsed_by_label.values())
+    log.info(
+        "%-8s %7d samples in %6.2fs  %8.1f samples/s  %d errors",
+        name,
+        samples,
+        elapsed,
+        samples / elapsed,
+        sum(recorder.errors_by_label.values()),
+    )
+
+    start = time.perf_counter()
+    summary = analyse_jtl(jtl_path)
+    log.info(
+        "analyse  %7d samples in %6.2fs",
+        sum(stats.samples for stats in summary.transactions.values()),
+        time.perf_counter() - start,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument(
+        "--patients-per-session", type=int, default=DEFAULT_PATIENTS_PER_SESSION
+    )
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--journey", action="append", choices=list(JOURNEYS))
+    parser.add_argument("--base-url")
+    args = parser.parse_args()
+
+    configure_logging()
+    logging.getLogger("mavis.test.load").setLevel(logging.WARNING)
+    base_url = args.base_url or _start_stub(
+        args.sessions, args.patients_per_session, args.latency_ms
+    )
+    log.info("Running against %s", base_url)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.journey or JOURNEYS:
+            _run_journey(base_url, name, args.users, Path(directory, f"{name}.jtl"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Compares reading offline recording spreadsheets with pandas and looking up
+children with boolean masks, as SessionsOverviewPage used to, with
+OfflineSpreadsheet.
+
+Each workbook is a synthetic Vaccinations sheet of --sizes rows, in the
+columns Mavis exports. Reads are timed from cold (the best of --repeat), and
+again once the workbook is cached, with the peak memory traced while reading
+it; lookups are timed for --lookups random children.
+
+Usage:
+    python -m mavis.test.benchmarks.offline_spreadsheet [--sizes 10000 50000]
+      [--repeat 3] [--lookups 100]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import Workbook
+
+from mavis.test.benchmarks import best_of, configure_logging
+from mavis.test.constants import Programme
+from mavis.test.data.offline_spreadsheet import OFFLINE_SHEET, OfflineSpreadsheet
+
+DEFAULT_SIZES = [10_000, 50_000]
+DEFAULT_REPEAT = 3
+DEFAULT_LOOKUPS = 100
+MB = 1024 * 1024
+
+COLUMNS = [
+    "ORGANISATION_CODE", "SCHOOL_URN", "SCHOOL_NAME", "CARE_SETTING",
+    "CLINIC_NAME", "PERSON_FORENAME", "PERSON_SURNAME", "PERSON_DOB",
+    "YEAR_GROUP", "PERSON_GENDER_CODE", "PERSON_ADDRESS_LINE_1",
+    "PERSON_POSTCODE", "NHS_NUMBER", "CONSENT_STATUS", "CONSENT_DETAILS",
+    "HEALTH_QUESTION_ANSWERS", "TRIAGE_STATUS", "TRIAGED_BY", "TRIAGE_DATE",
+    "TRIAGE_NOTES", "GILLICK_STATUS", "GILLICK_ASSESSMENT_DATE",
+    "GILLICK_ASSESSED_BY", "GILLICK_ASSESSMENT_NOTES", "PSD_STATUS",
+    "VACCINATED", "DATE_OF_VACCINATION", "TIME_OF_VACCINATION", "PROGRAMME",
+    "VACCINE_GIVEN", "PERFORMING_PROFESSIONAL_EMAIL", "BATCH_NUMBER",
+    "BATCH_EXPIRY_DATE", "ANATOMICAL_SITE", "DOSE_SEQUENCE",
+    "REASON_NOT_VACCINATED", "NOTES", "SESSION_ID", "UUID",
+]  # fmt: skip
+FORENAMES = ["Amelia", "Oliver", "Isla", "George", "Ava", "Noah", "Freya", "Leo"]
+SURNAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Evans"]
+
+log = logging.getLogger(__name__)
+
+
+def _child_names(index: int) -> tuple[str, str]:
+    return (
+        f"{FORENAMES[index % len(FORENAMES)]}{index}",
+        SURNAMES[index % len(SURNAMES)],
+    )
+
+
+def write_offline_spreadsheet(path: Path, rows: int, seed: int = 0) -> None:
+    """A Vaccinations sheet of rows children, each with one programme."""
+    rng = random.Random(seed)
+    programmes = [programme.offline_sheet_name for programme in Programme]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(OFFLINE_SHEET)
+    sheet.append(COLUMNS)
+    consent_date = datetime(2025, 9, 1, 9, 30)  # noqa: DTZ001
+    for index in range(rows):
+        forename, surname = _child_names(index)
+        vaccinated = rng.random() < 0.5  # noqa: PLR2004
+        values = {
+            "ORGANISATION_CODE": "R1L",
+            "SCHOOL_URN": "100001",
+            "SCHOOL_NAME": "Benchmark School",
+            "CARE_SETTING": 1,
+            "PERSON_FORENAME": forename,
+            "PERSON_SURNAME": surname,
+            "PERSON_DOB": datetime(2011, 1, 1) + timedelta(days=index % 365),  # noqa: DTZ001
+            "YEAR_GROUP": 9,
+            "PERSON_GENDER_CODE": "Not known",
+            "PERSON_ADDRESS_LINE_1": f"{index} Any Street",
+            "PERSON_POSTCODE": "SW1A 1AA",
+            "NHS_NUMBER": f"999{index:07d}",
+            "CONSENT_STATUS": "Consent given",
+            "CONSENT_DETAILS": "On 2025-09-01 at 09:30 GIVEN by Parent Name",
+            "HEALTH_QUESTION_ANSWERS": "Does your child have any allergies? No",
+            "TRIAGE_STATUS": "Safe to vaccinate" if index % 3 == 0 else None,
+            "PSD_STATUS": "PSD added" if index % 5 == 0 else None,
+            "VACCINATED": "Y" if vaccinated else None,
+            "DATE_OF_VACCINATION": consent_date if vaccinated else None,
+            "PROGRAMME": programmes[index % len(programmes)],
+            "PERFORMING_PROFESSIONAL_EMAIL": "nurse@example.com",
+            "BATCH_NUMBER": "ABC123" if vaccinated else None,
+            "SESSION_ID": "AbCdEfGhIj",
+            "UUID": f"00000000-0000-4000-8000-{index:012d}",
+        }
+        sheet.append([values.get(column) for column in COLUMNS])
+    workbook.save(path)
+
+
+def _pandas_lookup(data_frame: pd.DataFrame, forename: str, surname: str) -> None:
+    row = data_frame[
+        (data_frame["PERSON_FORENAME"] == forename)
+        & (data_frame["PERSON_SURNAME"] == surname)
+    ]
+    if row.empty:
+        raise LookupError(forename)
+
+
+def _spreadsheet_lookup(
+    spreadsheet: OfflineSpreadsheet, forename: str, surname: str
+) -> None:
+    if not spreadsheet.rows_for_child(forename, surname):
+        raise LookupError(forename)
+
+
+def _peak_mb(func: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / MB
+    finally:
+        tracemalloc.stop()
+
+
+def _read_cold(path: Path) -> OfflineSpreadsheet:
+    OfflineSpreadsheet._cache.clear()  # noqa: SLF001
+    return OfflineSpreadsheet.read(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--lookups", type=int, default=DEFAULT_LOOKUPS)
+    args = parser.parse_args()
+
+    configure_logging()
+    log.info(
+        "%8s %-12s %10s %10s %12s %10s",
+        "rows",
+        "reader",
+        "read (s)",
+        "cached (s)",
+        "lookup (ms)",
+        "peak (MB)",
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = Path(directory) / f"offline_{size}.xlsx"
+            start = time.perf_counter()
+            write_offline_spreadsheet(path, size)
+            log.info(
+                "Wrote %d rows (%.1f MB) in %.1fs",
+                size,
+                path.stat().st_size / MB,
+                time.perf_counter() - start,
+            )
+            children = [
+                _child_names(index)
+                for index in random.Random(size).sample(range(size), args.lookups)
+            ]
+
+            def read_pandas(path: Path = path) -> pd.DataFrame:
+                return pd.read_excel(path, sheet_name=OFFLINE_SHEET, dtype=str)
+
+            data_frame = read_pandas()
+            pandas_read = best_of(args.repeat, read_pandas)
+            pandas_lookup = best_of(
+                args.repeat,
+                lambda data_frame=data_frame, children=children: [
+                    _pandas_lookup(data_frame, *child) for child in children
+                ],
+            )
+            log.info(
+                "%8d %-12s %10.2f %10.2f %12.3f %10.1f",
+                size,
+                "pandas",
+                pandas_read,
+                pandas_read,
+                pandas_lookup * 1000 / args.lookups,
+                _peak_mb(read_pandas),
+            )
+
+            spreadsheet = _read_cold(path)
+            spreadsheet_read = best_of(args.repeat, lambda path=path: _read_cold(path))
+            cached_read = best_of(
+                args.repeat, lambda path=path: OfflineSpreadsheet.read(path)
+            )
+            spreadsheet_lookup = best_of(
+                args.repeat,
+                lambda spreadsheet=spreadsheet, children=children: [
+                    _spreadsheet_lookup(spreadsheet, *child) for child in children
+                ],
+            )
+            log.info(
+                "%8d %-12s %10.2f %10.4f %12.3f %10.1f",
+                size,
+                "streaming",
+                spreadsheet_read,
+                cached_read,
+                spreadsheet_lookup * 1000 / args.lookups,
+                _peak_mb(lambda path=path: _read_cold(path)),
+            )
+
+
+if __name__ == "__main__":
+    main()
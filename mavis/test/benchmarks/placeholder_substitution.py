@@ -0,0 +1,119 @@
+"""
+Compares the per-cell placeholder substitution used previously by FileGenerator
+with the compiled PlaceholderEngine.
+
+Line replacements return a constant so that only the substitution itself is
+timed, not Faker or NHS number generation.
+
+Usage:
+    python -m mavis.test.benchmarks.placeholder_substitution
+      [--sizes 1000 10000 100000] [--template class_list/i_positive.csv]
+"""
+
+import argparse
+import csv
+import logging
+import tempfile
+from collections.abc import Callable
+from itertools import cycle, islice
+from pathlib import Path
+
+import pandas as pd
+
+from mavis.test.benchmarks import best_of, configure_logging, offline_file_generator
+from mavis.test.constants import Programme
+from mavis.test.data.file_generator import FileGenerator
+from mavis.test.data.placeholder_engine import get_placeholder_engine
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_TEMPLATE = "class_list/i_positive.csv"
+
+log = logging.getLogger(__name__)
+
+
+def _write_template(source: Path, destination: Path, rows: int) -> None:
+    with source.open(newline="", encoding="utf-8") as source_file:
+        reader = csv.reader(source_file)
+        header = next(reader)
+        template_rows = list(reader)
+
+    with destination.open("w", newline="", encoding="utf-8") as destination_file:
+        writer = csv.writer(destination_file)
+        writer.writerow(header)
+        writer.writerows(islice(cycle(template_rows), rows))
+
+
+def _get_replacements(
+    file_generator: FileGenerator,
+) -> tuple[dict[str, str], dict[str, Callable[[], str]]]:
+    file_replacements = file_generator.create_file_replacements_dict(
+        programme_group=Programme.HPV.group, session_id=None
+    )
+    line_replacements = {
+        placeholder: lambda: "generated"
+        for placeholder in file_generator.create_line_replacements_dict(
+            Programme.HPV.group
+        )
+    }
+    return file_replacements, line_replacements
+
+
+def _legacy_substitution(file_generator: FileGenerator, template: Path) -> None:
+    file_replacements, line_replacements = _get_replacements(file_generator)
+    df = pd.read_csv(template, dtype=str)
+    df = file_generator.replace_substrings_in_df(df, file_replacements)
+    df.apply(
+        lambda col: col.apply(
+            lambda x: (
+                line_replacements[x.strip()]()
+                if isinstance(x, str) and x.strip() in line_replacements
+                else x
+            ),
+        ),
+    )
+
+
+def _compiled_substitution(file_generator: FileGenerator, template: Path) -> None:
+    file_replacements, line_replacements = _get_replacements(file_generator)
+    df = pd.read_csv(template, dtype=str)
+    get_placeholder_engine(template).substitute_df(
+        df, file_replacements, line_replacements
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    configure_logging()
+    file_generator = offline_file_generator()
+    source = FileGenerator.template_path / args.template
+
+    log.info("%10s %12s %12s %9s", "rows", "legacy (s)", "compiled (s)", "speed-up")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            template = Path(directory) / f"template_{size}.csv"
+            _write_template(source, template, size)
+
+            legacy = best_of(
+                args.repeat,
+                lambda template=template: _legacy_substitution(
+                    file_generator, template
+                ),
+            )
+            compiled = best_of(
+                args.repeat,
+                lambda template=template: _compiled_substitution(
+                    file_generator, template
+                ),
+            )
+            log.info(
+                "%10d %12.3f %12.3f %8.1fx", size, legacy, compiled, legacy / compiled
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -288,6 +288,18 @@ class Programme(StrEnum):
             ]
         return [*common_categories]
 
+    @property
+    def programme_type(self) -> str:
+        """The name Mavis uses for this programme in URLs and form values."""
+        programme_types = {
+            self.FLU: "flu",
+            self.HPV: "hpv",
+            self.MENACWY: "menacwy",
+            self.MMR_MMRV: "mmr",
+            self.TD_IPV: "td_ipv",
+        }
+        return programme_types[self]
+
     @property
     def offline_sheet_name(self) -> str:
         # TODO: Some programmes have multiple supported named (e.g. 3-in-1 and Td/IPV),
@@ -1,3 +1,5 @@
+from .child_batch import ChildBatch
+from .downloads import DownloadCache, get_download_cache
 from .file_generator import FileGenerator
 from .file_mappings import (
     ChildFileMapping,
@@ -11,14 +13,19 @@ from .file_utils import (
     increment_date_of_birth_for_records,
     read_scenario_list_from_file,
 )
+from .offline_spreadsheet import OfflineSpreadsheet
 
 __all__ = [
+    "ChildBatch",
     "ChildFileMapping",
     "ClassFileMapping",
+    "DownloadCache",
     "FileGenerator",
     "FileMapping",
+    "OfflineSpreadsheet",
     "VaccsFileMapping",
     "create_child_list_from_file",
+    "get_download_cache",
     "get_session_id",
     "increment_date_of_birth_for_records",
     "read_scenario_list_from_file",
@@ -0,0 +1,92 @@
+"""
+Entry point for generating large cohort files from the FileGenerator templates.
+
+Usage:
+    python -m mavis.test.data --rows 50000 --school-urn 108657
+      [--template child/i_cohort.csv] [--year-group 9] [--programme-group HPV]
+      [--org-code R1L] [--chunk-size 5000] [--prefix cohort_] [--seed 42]
+
+Rows are streamed to working/working_<worker>/<prefix><timestamp>.csv, so
+memory use stays flat however many rows are requested.
+
+With --seed the template is not used; the cohort is built by ChildBatch
+instead and written to <prefix>seed_<seed>.csv, and the same seed gives the
+same file on any machine on the same day.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from mavis.test.constants import Programme
+from mavis.test.data.child_batch import ChildBatch
+from mavis.test.data.file_generator import DEFAULT_STREAM_CHUNK_SIZE, FileGenerator
+from mavis.test.data_models import Organisation, School
+
+DEFAULT_TEMPLATE = "child/i_cohort.csv"
+DEFAULT_YEAR_GROUP = 9
+DEFAULT_PREFIX = "cohort_"
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a large cohort CSV file")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE)
+    # the templates have a school URN column, which would otherwise keep its
+    # placeholder and make an invalid cohort
+    parser.add_argument("--school-urn", required=True)
+    parser.add_argument("--school-name", default="")
+    parser.add_argument("--org-code", default="")
+    parser.add_argument("--year-group", type=int, default=DEFAULT_YEAR_GROUP)
+    parser.add_argument(
+        "--programme-group",
+        default=Programme.HPV.group,
+        choices=sorted({programme.group for programme in Programme}),
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_STREAM_CHUNK_SIZE)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    school = School(
+        name=args.school_name,
+        urn=args.school_urn,
+        site="",
+        address_line_1="",
+        address_line_2="",
+        address_town="",
+        address_postcode="",
+    )
+
+    file_generator = FileGenerator(
+        organisation=Organisation(ods_code=args.org_code) if args.org_code else None,
+        schools={args.programme_group: [school]},
+        nurse=None,
+        children={},
+        clinics=None,
+        year_groups={args.programme_group: args.year_group},
+    )
+
+    if args.seed is not None:
+        output_path = ChildBatch.generate(
+            args.rows, args.year_group, seed=args.seed
+        ).to_csv(
+            file_generator.working_path / f"{args.prefix}seed_{args.seed}.csv",
+            school_urn=args.school_urn,
+        )
+    else:
+        output_path = file_generator.stream_file_from_template(
+            template_path=Path(args.template),
+            file_name_prefix=args.prefix,
+            row_count=args.rows,
+            programme_group=args.programme_group,
+            chunk_size=args.chunk_size,
+        )
+    log.info("Wrote %d rows to %s", args.rows, output_path)
+
+
+if __name__ == "__main__":
+    main()
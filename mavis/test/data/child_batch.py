@@ -0,0 +1,170 @@
+from collections.abc import Callable, Iterator
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from attr import dataclass
+from faker import Faker
+
+from mavis.test.constants import Relationship
+from mavis.test.data_models import Child, Parent
+from mavis.test.nhs_numbers import NhsNumberPool
+from mavis.test.utils import (
+    get_date_of_birth_range_for_year_group,
+    normalize_postcode,
+)
+
+DEFAULT_VOCABULARY_SIZE = 1_000
+
+
+def _draw_vocabulary(provider: Callable[[], str], size: int) -> np.ndarray:
+    return np.array([provider() for _ in range(size)], dtype=object)
+
+
+def _make_emails(prefix: str, quantity: int) -> np.ndarray:
+    return np.array(
+        [f"{prefix}.{index}@example.com" for index in range(quantity)], dtype=object
+    )
+
+
+@dataclass(eq=False)
+class ChildBatch:
+    """A cohort of children held as one array per field.
+
+    Faker is only called to fill a small vocabulary of names and addresses per
+    field, which is then sampled with NumPy, and dates of birth are drawn as day
+    offsets into the year group's academic year. Indexing or iterating gives
+    ordinary Child objects, built only when asked for.
+    """
+
+    first_names: np.ndarray
+    last_names: np.ndarray
+    nhs_numbers: np.ndarray
+    address_line_1: np.ndarray
+    address_line_2: np.ndarray
+    towns: np.ndarray
+    postcodes: np.ndarray
+    dates_of_birth: np.ndarray
+    year_group: int
+    parent_1_names: np.ndarray
+    parent_1_emails: np.ndarray
+    parent_2_names: np.ndarray
+    parent_2_emails: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.first_names)
+
+    def __getitem__(self, index: int) -> Child:
+        return Child(
+            first_name=self.first_names[index],
+            last_name=self.last_names[index],
+            nhs_number=self.nhs_numbers[index],
+            address=(
+                self.address_line_1[index],
+                self.address_line_2[index],
+                self.towns[index],
+                self.postcodes[index],
+            ),
+            date_of_birth=self.dates_of_birth[index].item(),
+            year_group=self.year_group,
+            parents=(
+                Parent(
+                    full_name=self.parent_1_names[index],
+                    relationship=Relationship.DAD,
+                    email_address=self.parent_1_emails[index],
+                ),
+                Parent(
+                    full_name=self.parent_2_names[index],
+                    relationship=Relationship.MUM,
+                    email_address=self.parent_2_emails[index],
+                ),
+            ),
+        )
+
+    def __iter__(self) -> Iterator[Child]:
+        return (self[index] for index in range(len(self)))
+
+    @classmethod
+    def generate(
+        cls,
+        n: int,
+        year_group: int,
+        *,
+        seed: int | None = None,
+        today: date | None = None,
+        vocabulary_size: int = DEFAULT_VOCABULARY_SIZE,
+    ) -> "ChildBatch":
+        """Generate n children in a year group.
+
+        With a seed the same cohort is produced every time, on any machine, as
+        long as ``today`` is also fixed; NHS numbers then come from a pool seeded
+        the same way rather than from the worker's shared pool.
+        """
+        faker = Faker("en_GB")
+        faker.seed_instance(seed)
+        rng = np.random.default_rng(seed)
+        size = max(1, min(n, vocabulary_size))
+
+        def sample(provider: Callable[[], str]) -> np.ndarray:
+            return _draw_vocabulary(provider, size)[rng.integers(0, size, n)]
+
+        start_date, end_date = get_date_of_birth_range_for_year_group(year_group, today)
+        dates_of_birth = np.datetime64(start_date, "D") + rng.integers(
+            0, (end_date - start_date).days + 1, n
+        ).astype("timedelta64[D]")
+
+        nhs_number_pool = (
+            NhsNumberPool.default()
+            if seed is None
+            else NhsNumberPool(worker_index=0, worker_count=1, seed=seed)
+        )
+        email_prefix = f"cohort.{rng.integers(0, 2**32):08x}"
+
+        return cls(
+            first_names=sample(faker.first_name),
+            last_names=sample(lambda: faker.last_name().upper()),
+            nhs_numbers=np.array(nhs_number_pool.take_many(n), dtype=object),
+            address_line_1=sample(faker.secondary_address),
+            address_line_2=sample(faker.street_name),
+            towns=sample(faker.city),
+            postcodes=sample(lambda: normalize_postcode(faker.postcode())),
+            dates_of_birth=dates_of_birth,
+            year_group=year_group,
+            parent_1_names=sample(faker.name_male),
+            parent_1_emails=_make_emails(f"{email_prefix}.dad", n),
+            parent_2_names=sample(faker.name_female),
+            parent_2_emails=_make_emails(f"{email_prefix}.mum", n),
+        )
+
+    def to_dataframe(self, school_urn: str | None = None) -> pd.DataFrame:
+        """The cohort as a child list, with the column names Mavis imports.
+
+        The arrays are handed to pandas as they are, without copying them first.
+        """
+        columns = {
+            "CHILD_FIRST_NAME": self.first_names,
+            "CHILD_LAST_NAME": self.last_names,
+            "CHILD_DATE_OF_BIRTH": self.dates_of_birth,
+            "CHILD_NHS_NUMBER": self.nhs_numbers,
+            "CHILD_ADDRESS_LINE_1": self.address_line_1,
+            "CHILD_ADDRESS_LINE_2": self.address_line_2,
+            "CHILD_TOWN": self.towns,
+            "CHILD_POSTCODE": self.postcodes,
+            "PARENT_1_NAME": self.parent_1_names,
+            "PARENT_1_RELATIONSHIP": str(Relationship.DAD),
+            "PARENT_1_EMAIL": self.parent_1_emails,
+            "PARENT_2_NAME": self.parent_2_names,
+            "PARENT_2_RELATIONSHIP": str(Relationship.MUM),
+            "PARENT_2_EMAIL": self.parent_2_emails,
+            "CHILD_YEAR_GROUP": self.year_group,
+        }
+        if school_urn is not None:
+            columns["CHILD_SCHOOL_URN"] = school_urn
+        return pd.DataFrame(columns, copy=False)
+
+    def to_csv(self, path: Path, school_urn: str | None = None) -> Path:
+        self.to_dataframe(school_urn).to_csv(
+            path, index=False, lineterminator="\n", date_format="%Y-%m-%d"
+        )
+        return path
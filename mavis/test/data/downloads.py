@@ -0,0 +1,122 @@
+import functools
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO
+
+import pandas as pd
+from playwright.sync_api import Download
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE = timedelta(days=1)
+CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadCache:
+    """
+    Downloaded files, each written once to directory under a hash of its
+    content, so the same report or spreadsheet downloaded twice is one file and
+    is parsed once. Files are evicted, oldest used first, once they're older
+    than max_age or take up more than max_bytes between them. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # parsed views of each file, by its digest
+        self._dataframes: dict[tuple[str, tuple], pd.DataFrame] = {}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def save(self, download: Download) -> Path:
+        """The path of a Playwright download in the cache, once it's finished."""
+        suffix = Path(download.suggested_filename).suffix
+        with Path(download.path()).open("rb") as source:
+            return self._add(source, suffix)
+
+    def add(self, content: bytes, suffix: str) -> Path:
+        """The path of content in the cache, for files read from the page."""
+        return self._add(io.BytesIO(content), suffix)
+
+    def _add(self, source: BinaryIO, suffix: str) -> Path:
+        digest = hashlib.file_digest(source, "blake2b")
+        digest.update(suffix.encode())
+        path = self.directory / f"{digest.hexdigest()[:32]}{suffix}"
+        with self._lock:
+            if path.exists():
+                # mark it as used, so it's evicted last
+                path.touch()
+                logger.info("Downloaded %s again", path.name)
+            else:
+                source.seek(0)
+                with tempfile.NamedTemporaryFile(
+                    dir=self.directory, suffix=".part", delete=False
+                ) as target:
+                    while chunk := source.read(CHUNK_SIZE):
+                        target.write(chunk)
+                Path(target.name).replace(path)
+                logger.info("Downloaded %s", path.name)
+            self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path) -> None:
+        """Remove expired files, then the oldest used until under max_bytes."""
+        oldest_allowed = time.time() - self.max_age.total_seconds()
+        files = sorted(
+            (
+                (stat.st_mtime, stat.st_size, Path(entry.path))
+                for entry in os.scandir(self.directory)
+                if entry.is_file() and not entry.name.endswith(".part")
+                for stat in [entry.stat()]
+            ),
+            reverse=True,
+        )
+        total_bytes = 0
+        for modified, size, path in files:
+            total_bytes += size
+            if path != keep and (
+                modified < oldest_allowed or total_bytes > self.max_bytes
+            ):
+                path.unlink(missing_ok=True)
+                self._forget(path.stem)
+                total_bytes -= size
+
+    def _forget(self, digest: str) -> None:
+        for key in [key for key in self._dataframes if key[0] == digest]:
+            del self._dataframes[key]
+
+    def read_csv(
+        self, path: Path, dtype: dict[str, type] | None = None
+    ) -> pd.DataFrame:
+        """A cached CSV file as a DataFrame, which the caller is free to change."""
+        key = (path.stem, tuple(sorted((dtype or {}).items())))
+        with self._lock:
+            data_frame = self._dataframes.get(key)
+        if data_frame is None:
+            data_frame = pd.read_csv(path, dtype=dtype)
+            with self._lock:
+                self._dataframes[key] = data_frame
+        return data_frame.copy()
+
+
+@functools.cache
+def get_download_cache() -> DownloadCache:
+    """The download cache of this pytest worker."""
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return DownloadCache(Path("working") / f"working_{worker_id}" / "downloads")
@@ -1,15 +1,16 @@
 import csv
 import os
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from pathlib import Path
 
-import nhs_number
 import pandas as pd
 from faker import Faker
 
 from mavis.test.constants import Programme
 from mavis.test.data.file_mappings import FileMapping
+from mavis.test.data.placeholder_engine import get_placeholder_engine
 from mavis.test.data_models import Child, Clinic, Organisation, School, User
+from mavis.test.nhs_numbers import NhsNumberPool
 from mavis.test.utils import (
     get_current_datetime_compact,
     get_current_time_hms_format,
@@ -17,6 +18,31 @@ from mavis.test.utils import (
     get_offset_date_compact_format,
 )
 
+DEFAULT_STREAM_CHUNK_SIZE = 5_000
+DEFAULT_POOL_BATCH_SIZE = 5_000
+
+
+class BatchedValuePool:
+    """Hands out single values from batches drawn by ``draw_batch``.
+
+    Used by the streaming generator so that Faker values are drawn a batch at a
+    time rather than looked up cell by cell.
+    """
+
+    def __init__(
+        self,
+        draw_batch: Callable[[int], list[str]],
+        batch_size: int = DEFAULT_POOL_BATCH_SIZE,
+    ) -> None:
+        self._draw_batch = draw_batch
+        self._batch_size = batch_size
+        self._values: list[str] = []
+
+    def __call__(self) -> str:
+        if not self._values:
+            self._values = self._draw_batch(self._batch_size)
+        return self._values.pop()
+
 
 class FileGenerator:
     template_path = Path(__file__).parent
@@ -69,19 +95,9 @@ class FileGenerator:
 
         if (self.template_path / template_path).stat().st_size > 0:
             template_df = pd.read_csv(self.template_path / template_path, dtype=str)
-            template_df = self.replace_substrings_in_df(
-                template_df,
-                file_replacements,
-            )
-            template_df = template_df.apply(
-                lambda col: col.apply(
-                    lambda x: (
-                        line_replacements[x.strip()]()
-                        if isinstance(x, str) and x.strip() in line_replacements
-                        else x
-                    ),
-                ),
-            )
+            template_df = get_placeholder_engine(
+                self.template_path / template_path
+            ).substitute_df(template_df, file_replacements, line_replacements)
             template_df.to_csv(
                 path_or_buf=output_path,
                 quoting=csv.QUOTE_MINIMAL,
@@ -250,30 +266,137 @@ class FileGenerator:
 
         return line_replacements
 
+    def create_batched_line_replacements_dict(
+        self, programme_group: str, batch_size: int = DEFAULT_POOL_BATCH_SIZE
+    ) -> dict[str, Callable[[], str]]:
+        line_replacements = self.create_line_replacements_dict(programme_group)
+        line_replacements.update(
+            {
+                "<<RANDOM_FNAME>>": BatchedValuePool(
+                    lambda n: [self.faker.first_name() for _ in range(n)],
+                    batch_size,
+                ),
+                "<<RANDOM_LNAME>>": BatchedValuePool(
+                    lambda n: [self.faker.last_name().upper() for _ in range(n)],
+                    batch_size,
+                ),
+                "<<RANDOM_POSTCODE>>": BatchedValuePool(
+                    lambda n: [self.faker.postcode() for _ in range(n)],
+                    batch_size,
+                ),
+            }
+        )
+        return line_replacements
+
+    def stream_file_from_template(  # noqa: PLR0913
+        self,
+        template_path: Path,
+        file_name_prefix: str,
+        row_count: int,
+        session_id: str | None = None,
+        programme_group: str = Programme.HPV.group,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    ) -> Path:
+        """Expand a template into ``row_count`` rows without loading it into pandas.
+
+        Template data rows are repeated in order until ``row_count`` rows have been
+        written, and rows are flushed to disk every ``chunk_size`` rows so memory
+        use does not grow with the size of the cohort.
+        """
+        file_replacements = self.create_file_replacements_dict(
+            programme_group=programme_group, session_id=session_id
+        )
+        line_replacements = self.create_batched_line_replacements_dict(
+            programme_group, batch_size=chunk_size
+        )
+
+        output_filename = f"{file_name_prefix}{get_current_datetime_compact()}.csv"
+        output_path = self.working_path / output_filename
+
+        with (self.template_path / template_path).open(
+            newline="", encoding="utf-8"
+        ) as template_file:
+            reader = csv.reader(template_file)
+            header = next(reader, None)
+            template_rows = [
+                [self._replace_substrings(cell, file_replacements) for cell in row]
+                for row in reader
+            ]
+
+        if header is None:
+            output_path.touch()
+            return output_path
+
+        if not template_rows:
+            msg = f"Template {template_path} has no rows to expand."
+            raise ValueError(msg)
+
+        with output_path.open("w", newline="", encoding="utf-8") as output_file:
+            writer = csv.writer(
+                output_file, quoting=csv.QUOTE_MINIMAL, lineterminator="\n"
+            )
+            writer.writerow(header)
+            for chunk in self._generate_row_chunks(
+                template_rows, line_replacements, row_count, chunk_size
+            ):
+                writer.writerows(chunk)
+
+        return output_path
+
+    @staticmethod
+    def _generate_row_chunks(
+        template_rows: list[list[str]],
+        line_replacements: dict[str, Callable[[], str]],
+        row_count: int,
+        chunk_size: int,
+    ) -> Iterator[list[list[str]]]:
+        # only the cells which hold a line placeholder need touching per row
+        row_plans = [
+            (
+                row,
+                [
+                    (index, line_replacements[cell.strip()])
+                    for index, cell in enumerate(row)
+                    if cell.strip() in line_replacements
+                ],
+            )
+            for row in template_rows
+        ]
+
+        chunk: list[list[str]] = []
+        for row_number in range(row_count):
+            template_row, replacements = row_plans[row_number % len(row_plans)]
+            row = template_row.copy()
+            for index, generate in replacements:
+                row[index] = generate()
+            chunk.append(row)
+
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _replace_substrings(cell: object, replacements: dict[str, str]) -> object:
+        if isinstance(cell, str):
+            for old, new in replacements.items():
+                if old and new:
+                    cell = cell.replace(old, new)
+        return cell
+
     def replace_substrings_in_df(
         self, df: pd.DataFrame, replacements: dict[str, str]
     ) -> pd.DataFrame:
-        def replace_substrings(cell: object) -> object:
-            if isinstance(cell, str):
-                for old, new in replacements.items():
-                    if old and new:
-                        cell = cell.replace(old, new)
-            return cell
-
         for col in df.columns:
-            df[col] = df[col].map(replace_substrings)
+            df[col] = df[col].map(
+                lambda cell: self._replace_substrings(cell, replacements)
+            )
         return df
 
     def get_new_nhs_no(self, *, valid: bool = True) -> str:
-        nhs_numbers = nhs_number.generate(
-            valid=valid,
-            for_region=nhs_number.REGION_SYNTHETIC,
-            quantity=1,
-        )
-        if not nhs_numbers:
-            exception_message = "Failed to generate NHS number."
-            raise ValueError(exception_message)
-        return str(nhs_numbers[0])
+        return NhsNumberPool.default(valid=valid).take()
 
     def get_expected_errors(self, file_path: Path) -> list[str] | None:
         file_content = self.read_file(file_path)
@@ -6,6 +6,7 @@ from pathlib import Path
 import pandas as pd
 
 from mavis.test.constants import DeliverySite, Vaccine
+from mavis.test.data.offline_spreadsheet import OfflineSpreadsheet
 from mavis.test.data_models import Child, School
 from mavis.test.utils import get_current_datetime, normalize_whitespace
 
@@ -49,14 +50,19 @@ def read_child_names_from_file(input_file_path: Path) -> list[tuple[str, str]]:
 
 
 def get_session_id(path: Path) -> str:
-    data_frame = pd.read_excel(path, sheet_name="Vaccinations", dtype=str)
-    session_ids = data_frame["SESSION_ID"].dropna()
-    session_ids = session_ids[session_ids.str.strip() != ""]
+    session_id = next(
+        (
+            session_id
+            for session_id in OfflineSpreadsheet.read(path).column("SESSION_ID")
+            if session_id and session_id.strip()
+        ),
+        None,
+    )
 
-    if session_ids.empty:
+    if session_id is None:
         msg = "No valid SESSION_ID found in the file."
         raise ValueError(msg)
-    return session_ids.iloc[0]
+    return session_id
 
 
 def create_child_list_from_file(
@@ -0,0 +1,346 @@
+import hashlib
+import io
+import posixpath
+import zipfile
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import ClassVar
+from xml.etree.ElementTree import Element
+
+from defusedxml import ElementTree
+from openpyxl.styles.numbers import (
+    builtin_format_code,
+    is_date_format,
+    is_timedelta_format,
+)
+from openpyxl.utils.datetime import (
+    CALENDAR_MAC_1904,
+    CALENDAR_WINDOWS_1900,
+    from_excel,
+    from_ISO8601,
+)
+
+OFFLINE_SHEET = "Vaccinations"
+# workbooks kept parsed, so one downloaded again unchanged isn't parsed again
+CACHE_SIZE = 4
+
+SPREADSHEET = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIPS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+RELATIONSHIP_ID = (
+    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+)
+SHEET_DATA_TAG = f"{SPREADSHEET}sheetData"
+ROW_TAG = f"{SPREADSHEET}row"
+CELL_TAG = f"{SPREADSHEET}c"
+VALUE_TAG = f"{SPREADSHEET}v"
+INLINE_STRING_TAG = f"{SPREADSHEET}is"
+TEXT_TAG = f"{SPREADSHEET}t"
+RUN_TAG = f"{SPREADSHEET}r"
+
+# the text pandas reads as missing by default
+NA_VALUES = frozenset(
+    {
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+        "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+        "nan", "null",
+    }
+)  # fmt: skip
+
+type Cell = str | None
+type Row = dict[str, Cell]
+
+
+def _to_text(value: object) -> Cell:
+    """A cell's value as pandas.read_excel(..., dtype=str) reads it."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value)
+    return None if text in NA_VALUES else text
+
+
+def _relationships(archive: zipfile.ZipFile, part: str) -> dict[str, tuple[str, str]]:
+    """The type and path of each of a part's relationships, by ID."""
+    directory, name = posixpath.split(part)
+    try:
+        root = ElementTree.fromstring(
+            archive.read(posixpath.join(directory, "_rels", f"{name}.rels"))
+        )
+    except KeyError:
+        return {}
+    relationships = {}
+    for relationship in root.iter(f"{RELATIONSHIPS}Relationship"):
+        target = relationship.get("Target", "")
+        path = (
+            target.lstrip("/")
+            if target.startswith("/")
+            else posixpath.normpath(posixpath.join(directory, target))
+        )
+        relationships[relationship.get("Id", "")] = (
+            relationship.get("Type", ""),
+            path,
+        )
+    return relationships
+
+
+def _part_of_type(relationships: dict[str, tuple[str, str]], kind: str) -> str | None:
+    return next(
+        (path for type_, path in relationships.values() if type_.endswith(kind)),
+        None,
+    )
+
+
+def _text(element: Element) -> str:
+    """The text of a string item, without any phonetic runs, as openpyxl has it."""
+    plain = element.findtext(TEXT_TAG) or ""
+    runs = "".join(run.findtext(TEXT_TAG) or "" for run in element.iter(RUN_TAG))
+    return plain + runs
+
+
+_COLUMN_INDEXES: dict[str, int] = {}
+
+
+def _column_index(reference: str) -> int:
+    """The 0-based column of a cell reference such as AB12."""
+    letters = reference.rstrip("0123456789")
+    index = _COLUMN_INDEXES.get(letters)
+    if index is None:
+        index = 0
+        for letter in letters:
+            index = index * 26 + ord(letter) - ord("A") + 1
+        index = _COLUMN_INDEXES[letters] = index - 1
+    return index
+
+
+class _SheetReader:
+    """
+    Reads the cells of one sheet of an XLSX workbook as openpyxl does with
+    data_only=True (as pandas uses it), but streamed straight from the sheet's
+    XML a row at a time rather than through openpyxl's cell objects.
+    """
+
+    def __init__(self, archive: zipfile.ZipFile, sheet_name: str) -> None:
+        self.archive = archive
+        workbook_path = _part_of_type(_relationships(archive, ""), "/officeDocument")
+        if workbook_path is None:
+            msg = "Not an XLSX workbook"
+            raise ValueError(msg)
+        workbook = ElementTree.fromstring(archive.read(workbook_path))
+        relationships = _relationships(archive, workbook_path)
+
+        sheet_id = next(
+            (
+                sheet.get(RELATIONSHIP_ID)
+                for sheet in workbook.iter(f"{SPREADSHEET}sheet")
+                if sheet.get("name") == sheet_name
+            ),
+            None,
+        )
+        if sheet_id not in relationships:
+            msg = f"Worksheet {sheet_name} does not exist."
+            raise KeyError(msg)
+        self.sheet_path = relationships[sheet_id][1]
+
+        properties = workbook.find(f"{SPREADSHEET}workbookPr")
+        self.epoch = (
+            CALENDAR_MAC_1904
+            if properties is not None
+            and properties.get("date1904", "0").lower() in {"1", "true"}
+            else CALENDAR_WINDOWS_1900
+        )
+        self.shared_strings = self._read_shared_strings(
+            _part_of_type(relationships, "/sharedStrings")
+        )
+        self.date_styles, self.timedelta_styles = self._read_date_styles(
+            _part_of_type(relationships, "/styles")
+        )
+
+    def _read_shared_strings(self, path: str | None) -> list[str]:
+        if path is None:
+            return []
+        strings = []
+        with self.archive.open(path) as source:
+            for _, element in ElementTree.iterparse(source):
+                if element.tag == f"{SPREADSHEET}si":
+                    strings.append(_text(element).replace("x005F_", ""))
+                    element.clear()
+        return strings
+
+    def _read_date_styles(self, path: str | None) -> tuple[set[int], set[int]]:
+        """The cell styles whose number formats are dates and times, and durations."""
+        if path is None:
+            return set(), set()
+        styles = ElementTree.fromstring(self.archive.read(path))
+        custom_formats = {
+            int(number_format.get("numFmtId", -1)): number_format.get("formatCode")
+            for number_format in styles.iter(f"{SPREADSHEET}numFmt")
+        }
+        date_styles = set()
+        timedelta_styles = set()
+        cell_styles = styles.find(f"{SPREADSHEET}cellXfs")
+        for index, style in enumerate(
+            cell_styles.iter(f"{SPREADSHEET}xf") if cell_styles is not None else []
+        ):
+            format_id = int(style.get("numFmtId", 0))
+            number_format = custom_formats.get(format_id) or builtin_format_code(
+                format_id
+            )
+            if is_date_format(number_format):
+                date_styles.add(index)
+            if is_timedelta_format(number_format):
+                timedelta_styles.add(index)
+        return date_styles, timedelta_styles
+
+    def _number(self, value: str, style: int) -> object:
+        number = (
+            float(value) if "." in value or "E" in value or "e" in value else int(value)
+        )
+        if style not in self.date_styles:
+            return number
+        try:
+            return from_excel(
+                number, self.epoch, timedelta=style in self.timedelta_styles
+            )
+        except (OverflowError, ValueError):
+            return "#VALUE!"
+
+    def _value(self, cell: Element) -> object:
+        data_type = cell.get("t", "n")
+        if data_type == "inlineStr":
+            inline_string = cell.find(INLINE_STRING_TAG)
+            return _text(inline_string) if inline_string is not None else None
+
+        value = cell.findtext(VALUE_TAG) or None
+        if value is None:
+            return None
+        if data_type == "n":
+            return self._number(value, int(cell.get("s", 0)))
+        if data_type == "s":
+            return self.shared_strings[int(value)]
+        if data_type == "b":
+            return bool(int(value))
+        # dates in ISO 8601, and formula strings and errors as they are
+        return from_ISO8601(value) if data_type == "d" else value
+
+    def rows(self) -> Iterator[list[object]]:
+        """The values of each row, up to its last cell, as the XML is read."""
+        row: list[object] = []
+        sheet_data = None
+        with self.archive.open(self.sheet_path) as source:
+            for event, element in ElementTree.iterparse(
+                source, events=("start", "end")
+            ):
+                if event == "start":
+                    if element.tag == SHEET_DATA_TAG:
+                        sheet_data = element
+                    continue
+                if element.tag == CELL_TAG:
+                    reference = element.get("r")
+                    column = _column_index(reference) if reference else len(row)
+                    value = self._value(element)
+                    if value is not None:
+                        row.extend([None] * (column - len(row)))
+                        row.append(value)
+                elif element.tag == ROW_TAG:
+                    yield row
+                    row = []
+                    if sheet_data is not None:
+                        # drop the rows already read
+                        sheet_data.clear()
+
+
+class OfflineSpreadsheet:
+    """
+    The rows of the Vaccinations sheet of an offline recording spreadsheet,
+    with cells as text, indexed by child and by NHS number as they're read.
+    """
+
+    _cache: ClassVar[OrderedDict[bytes, "OfflineSpreadsheet"]] = OrderedDict()
+
+    def __init__(
+        self, columns: Sequence[str], rows: Iterable[Sequence[object]]
+    ) -> None:
+        self.columns = tuple(columns)
+        width = len(self.columns)
+        positions = {column: index for index, column in enumerate(self.columns)}
+        forename = positions.get("PERSON_FORENAME")
+        surname = positions.get("PERSON_SURNAME")
+        programme = positions.get("PROGRAMME")
+        nhs_number = positions.get("NHS_NUMBER")
+
+        self._rows: list[tuple[Cell, ...]] = []
+        self._by_child: defaultdict[tuple[Cell, Cell], list[int]] = defaultdict(list)
+        self._by_child_programme: defaultdict[tuple[Cell, Cell, Cell], list[int]] = (
+            defaultdict(list)
+        )
+        self._by_nhs_number: defaultdict[Cell, list[int]] = defaultdict(list)
+
+        for values in rows:
+            row = tuple(_to_text(value) for value in values[:width])
+            if not any(row):
+                continue
+            row += (None,) * (width - len(row))
+            position = len(self._rows)
+            self._rows.append(row)
+            if forename is not None and surname is not None:
+                child = (row[forename], row[surname])
+                self._by_child[child].append(position)
+                if programme is not None:
+                    self._by_child_programme[(*child, row[programme])].append(position)
+            if nhs_number is not None:
+                self._by_nhs_number[row[nhs_number]].append(position)
+
+    @classmethod
+    def read(cls, path: Path) -> "OfflineSpreadsheet":
+        """
+        The spreadsheet at path, streamed a row at a time, or as already read
+        if the same workbook was read recently.
+        """
+        content = path.read_bytes()
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        if digest in cls._cache:
+            cls._cache.move_to_end(digest)
+            return cls._cache[digest]
+
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            rows = _SheetReader(archive, OFFLINE_SHEET).rows()
+            columns = [_to_text(column) or "" for column in next(rows, [])]
+            spreadsheet = cls(columns, rows)
+
+        cls._cache[digest] = spreadsheet
+        if len(cls._cache) > CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return spreadsheet
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Row]:
+        for row in self._rows:
+            yield dict(zip(self.columns, row, strict=True))
+
+    def column(self, name: str) -> Iterator[Cell]:
+        position = self.columns.index(name)
+        for row in self._rows:
+            yield row[position]
+
+    def _rows_at(self, positions: list[int]) -> list[Row]:
+        return [
+            dict(zip(self.columns, self._rows[position], strict=True))
+            for position in positions
+        ]
+
+    def rows_for_child(
+        self, first_name: str, last_name: str, programme: str | None = None
+    ) -> list[Row]:
+        """The rows for a child, for one programme (by its offline sheet name)."""
+        if programme is None:
+            return self._rows_at(self._by_child.get((first_name, last_name), []))
+        return self._rows_at(
+            self._by_child_programme.get((first_name, last_name, programme), [])
+        )
+
+    def rows_for_nhs_number(self, nhs_number: str) -> list[Row]:
+        return self._rows_at(self._by_nhs_number.get(nhs_number, []))
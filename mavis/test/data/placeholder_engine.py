@@ -0,0 +1,69 @@
+import functools
+import re
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import pandas as pd
+
+PLACEHOLDER_PATTERN = re.compile(r"<<[A-Z0-9_]+>>")
+
+
+class PlaceholderEngine:
+    """Substitutes every placeholder in a template with a single regex pass.
+
+    File replacements are substituted wherever they appear in a cell, while line
+    replacements are only generated when the placeholder makes up the whole cell,
+    matching the behaviour of FileGenerator.create_file_from_template.
+    """
+
+    def __init__(self, placeholders: Iterable[str]) -> None:
+        self.placeholders = frozenset(placeholders)
+        # longest first, so that e.g. <<CLINIC_0_LOWER>> wins over <<CLINIC_0>>
+        alternation = "|".join(
+            re.escape(placeholder)
+            for placeholder in sorted(self.placeholders, key=len, reverse=True)
+        )
+        self.pattern = (
+            re.compile(rf"^\s*(?P<cell>{alternation})\s*$|(?P<token>{alternation})")
+            if self.placeholders
+            else None
+        )
+
+    def substitute_df(
+        self,
+        df: pd.DataFrame,
+        file_replacements: dict[str, str],
+        line_replacements: dict[str, Callable[[], str]],
+    ) -> pd.DataFrame:
+        if self.pattern is None:
+            return df
+
+        def replace(match: re.Match[str]) -> str:
+            cell_placeholder = match.group("cell")
+            if cell_placeholder is None:
+                return file_replacements.get(match.group("token")) or match.group(0)
+
+            if file_replacements.get(cell_placeholder):
+                return match.group(0).replace(
+                    cell_placeholder, file_replacements[cell_placeholder]
+                )
+            if cell_placeholder in line_replacements:
+                return line_replacements[cell_placeholder]()
+            return match.group(0)
+
+        for col in df.columns:
+            if not pd.api.types.is_string_dtype(df[col]):
+                continue
+            has_placeholder = df[col].str.contains("<<", regex=False, na=False)
+            if has_placeholder.any():
+                df.loc[has_placeholder, col] = df.loc[has_placeholder, col].str.replace(
+                    self.pattern, replace, regex=True
+                )
+        return df
+
+
+@functools.cache
+def get_placeholder_engine(template_path: Path) -> PlaceholderEngine:
+    """Build the engine for a template once and reuse it for every later file."""
+    template = template_path.read_text(encoding="utf-8")
+    return PlaceholderEngine(PLACEHOLDER_PATTERN.findall(template))
@@ -1,10 +1,8 @@
 import random
-import urllib.parse
 from abc import ABC, abstractmethod
 from datetime import date
 
 import httpx
-import nhs_number
 from attr import dataclass
 from faker import Faker
 
@@ -14,6 +12,8 @@ from mavis.test.constants import (
     Programme,
     Relationship,
 )
+from mavis.test.nhs_numbers import NhsNumberPool
+from mavis.test.testing_api import MavisTestingApiClient
 from mavis.test.utils import (
     get_date_of_birth_for_year_group,
     normalize_postcode,
@@ -71,7 +71,6 @@ class School(Location):
         def _get_schools_with_year_groups(
             required_year_groups: list[int],
         ) -> list[School]:
-            url = urllib.parse.urljoin(base_url, "api/testing/locations")
             params = {
                 "type": "gias_school",
                 "status": "open",
@@ -81,7 +80,9 @@ class School(Location):
             }
 
             try:
-                response = httpx.get(url, params=params, timeout=30)
+                response = MavisTestingApiClient.for_base_url(base_url).get(
+                    "locations", params=params
+                )
                 response.raise_for_status()
             except (httpx.ConnectError, httpx.HTTPStatusError):
                 msg = (
@@ -304,9 +305,7 @@ class Child:
         return cls(
             first_name=faker.first_name(),
             last_name=faker.last_name().upper(),
-            nhs_number=nhs_number.generate(
-                for_region=nhs_number.REGION_SYNTHETIC,
-            )[0],
+            nhs_number=NhsNumberPool.default().take(),
             address=(
                 faker.secondary_address(),
                 faker.street_name(),
@@ -26,6 +26,7 @@ from .helpers import (
     log_in_as_medical_secretary,
     log_in_as_nurse,
     log_in_as_prescriber,
+    log_in_session_cache,
     schedule_mmr_session_and_get_consent_url,
     schedule_mmrv_session_and_get_consent_url,
     schedule_session_and_get_consent_url,
@@ -36,7 +37,10 @@ from .helpers import (
     upload_offline_vaccination,
 )
 from .onboarding import (
+    national_reporting_lease,
     national_reporting_onboarding,
+    onboarding_pool,
+    point_of_care_lease,
     point_of_care_onboarding,
     year_groups,
 )
@@ -48,6 +52,7 @@ from .playwright import (
     browser_type,
 )
 from .team_reset import delete_teams_after_tests, reset_before_each_module
+from .testing_api import mavis_testing_api
 
 __all__ = [
     "add_vaccine_batch",
@@ -62,8 +67,11 @@ __all__ = [
     "log_in_as_medical_secretary",
     "log_in_as_nurse",
     "log_in_as_prescriber",
+    "log_in_session_cache",
+    "mavis_testing_api",
     "national_reporting_file_generator",
     "national_reporting_healthcare_assistant",
+    "national_reporting_lease",
     "national_reporting_medical_secretary",
     "national_reporting_nurse",
     "national_reporting_onboarding",
@@ -71,9 +79,11 @@ __all__ = [
     "national_reporting_prescriber",
     "national_reporting_superuser",
     "national_reporting_team",
+    "onboarding_pool",
     "point_of_care_clinics",
     "point_of_care_file_generator",
     "point_of_care_healthcare_assistant",
+    "point_of_care_lease",
     "point_of_care_medical_secretary",
     "point_of_care_nurse",
     "point_of_care_onboarding",
@@ -15,7 +15,7 @@ from mavis.test.pages import (
     FlipperPage,
     ImportRecordsWizardPage,
     ImportsPage,
-    LogInPage,
+    LogInSessionCache,
     SchoolChildrenPage,
     SchoolsSearchPage,
     SessionsOverviewPage,
@@ -26,6 +26,11 @@ from mavis.test.pages.utils import schedule_school_session_if_needed
 from mavis.test.utils import get_current_datetime, get_offset_date
 
 
+@pytest.fixture(scope="session")
+def log_in_session_cache():
+    return LogInSessionCache()
+
+
 @pytest.fixture
 def set_feature_flags(page):
     set_check_feature_flags = os.getenv("SET_FEATURE_FLAGS", "false").lower() == "true"
@@ -57,15 +62,17 @@ def add_vaccine_batch(page):
 
 @pytest.fixture
 def schedule_session_and_get_consent_url(
-    set_feature_flags, point_of_care_nurse, point_of_care_team, page, year_groups
+    set_feature_flags,
+    log_in_session_cache,
+    point_of_care_nurse,
+    point_of_care_team,
+    page,
+    year_groups,
 ):
     def wrapper(school: School, *programmes: Programme):
         year_group = year_groups[programmes[0].group]
 
-        LogInPage(page).navigate()
-        LogInPage(page).log_in_and_choose_team_if_necessary(
-            point_of_care_nurse, point_of_care_team
-        )
+        log_in_session_cache.log_in(page, point_of_care_nurse, point_of_care_team)
 
         schedule_school_session_if_needed(
             page, school, list(programmes), [year_group], date_offset=7
@@ -78,15 +85,17 @@ def schedule_session_and_get_consent_url(
 
 @pytest.fixture
 def schedule_mmr_session_and_get_consent_url(
-    set_feature_flags, point_of_care_nurse, point_of_care_team, page, year_groups
+    set_feature_flags,
+    log_in_session_cache,
+    point_of_care_nurse,
+    point_of_care_team,
+    page,
+    year_groups,
 ):
     def wrapper(school: School, *programmes: Programme):
         year_group = year_groups[programmes[0].group]
 
-        LogInPage(page).navigate()
-        LogInPage(page).log_in_and_choose_team_if_necessary(
-            point_of_care_nurse, point_of_care_team
-        )
+        log_in_session_cache.log_in(page, point_of_care_nurse, point_of_care_team)
         schedule_school_session_if_needed(
             page, school, list(programmes), [year_group], date_offset=7
         )
@@ -98,17 +107,19 @@ def schedule_mmr_session_and_get_consent_url(
 
 @pytest.fixture
 def schedule_mmrv_session_and_get_consent_url(
-    set_feature_flags, point_of_care_nurse, point_of_care_team, page, year_groups
+    set_feature_flags,
+    log_in_session_cache,
+    point_of_care_nurse,
+    point_of_care_team,
+    page,
+    year_groups,
 ):
     """Get consent URL for MMRV-eligible children (uses the MMRV link)."""
 
     def wrapper(school: School, *programmes: Programme):
         year_group = year_groups[programmes[0].group]
 
-        LogInPage(page).navigate()
-        LogInPage(page).log_in_and_choose_team_if_necessary(
-            point_of_care_nurse, point_of_care_team
-        )
+        log_in_session_cache.log_in(page, point_of_care_nurse, point_of_care_team)
         schedule_school_session_if_needed(
             page, school, list(programmes), [year_group], date_offset=7
         )
@@ -123,32 +134,36 @@ def schedule_mmrv_session_and_get_consent_url(
 @pytest.fixture
 def log_in_as_medical_secretary(
     set_feature_flags,
+    log_in_session_cache,
     point_of_care_medical_secretary,
     point_of_care_team,
     page,
 ):
-    LogInPage(page).navigate()
-    LogInPage(page).log_in_and_choose_team_if_necessary(
-        point_of_care_medical_secretary, point_of_care_team
+    log_in_session_cache.log_in(
+        page, point_of_care_medical_secretary, point_of_care_team
     )
 
 
 @pytest.fixture
-def log_in_as_nurse(set_feature_flags, point_of_care_nurse, point_of_care_team, page):
-    LogInPage(page).navigate()
-    LogInPage(page).log_in_and_choose_team_if_necessary(
-        point_of_care_nurse, point_of_care_team
-    )
+def log_in_as_nurse(
+    set_feature_flags,
+    log_in_session_cache,
+    point_of_care_nurse,
+    point_of_care_team,
+    page,
+):
+    log_in_session_cache.log_in(page, point_of_care_nurse, point_of_care_team)
 
 
 @pytest.fixture
 def log_in_as_prescriber(
-    set_feature_flags, point_of_care_prescriber, point_of_care_team, page
+    set_feature_flags,
+    log_in_session_cache,
+    point_of_care_prescriber,
+    point_of_care_team,
+    page,
 ):
-    LogInPage(page).navigate()
-    LogInPage(page).log_in_and_choose_team_if_necessary(
-        point_of_care_prescriber, point_of_care_team
-    )
+    log_in_session_cache.log_in(page, point_of_care_prescriber, point_of_care_team)
 
 
 @pytest.fixture
@@ -290,14 +305,12 @@ def setup_logged_in_session_with_file_upload_for_programme(
 
 @pytest.fixture
 def setup_national_reporting_import(
+    log_in_session_cache,
     page,
     national_reporting_nurse,
     national_reporting_team,
 ):
     """Fixture to set up national reporting import page."""
-    LogInPage(page).navigate()
-    LogInPage(page).log_in_and_choose_team_if_necessary(
-        national_reporting_nurse, national_reporting_team
-    )
+    log_in_session_cache.log_in(page, national_reporting_nurse, national_reporting_team)
     DashboardPage(page).click_imports()
     ImportsPage(page).click_upload_records()
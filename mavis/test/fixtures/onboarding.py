@@ -1,60 +1,74 @@
+import functools
 import random
-import urllib.parse
 
-import httpx
 import pytest
 
 from mavis.test.constants import Programme
-from mavis.test.fixtures.data_models import logger
+from mavis.test.fixtures.team_reset import _reset_team, _return_leased_team
 from mavis.test.onboarding import (
     NationalReportingOnboarding,
-    Onboarding,
     PointOfCareOnboarding,
+    create_onboarding_with_retry,
 )
-from mavis.test.utils import deliberate_sleep
+from mavis.test.onboarding_pool import OnboardingPool, PooledTeam
 
 
 @pytest.fixture(scope="session")
-def year_groups() -> dict[str, int]:
+def onboarding_pool() -> OnboardingPool | None:
+    return OnboardingPool.from_environment()
+
+
+@pytest.fixture(scope="session")
+def point_of_care_lease(base_url, mavis_testing_api, onboarding_pool):
+    lease = onboarding_pool and onboarding_pool.lease(
+        PooledTeam.POINT_OF_CARE,
+        base_url,
+        reset=functools.partial(_reset_team, mavis_testing_api),
+    )
+    yield lease
+    if lease:
+        _return_leased_team(mavis_testing_api, onboarding_pool, lease)
+
+
+@pytest.fixture(scope="session")
+def national_reporting_lease(base_url, mavis_testing_api, onboarding_pool):
+    lease = onboarding_pool and onboarding_pool.lease(
+        PooledTeam.NATIONAL_REPORTING,
+        base_url,
+        reset=functools.partial(_reset_team, mavis_testing_api),
+    )
+    yield lease
+    if lease:
+        _return_leased_team(mavis_testing_api, onboarding_pool, lease)
+
+
+@pytest.fixture(scope="session")
+def year_groups(point_of_care_lease) -> dict[str, int]:
+    if point_of_care_lease:
+        return point_of_care_lease.year_groups()
     return {
         programme.group: random.choice(programme.year_groups) for programme in Programme
     }
 
 
 @pytest.fixture(scope="session")
-def point_of_care_onboarding(base_url, year_groups) -> PointOfCareOnboarding:
+def point_of_care_onboarding(
+    base_url, mavis_testing_api, year_groups, point_of_care_lease
+) -> PointOfCareOnboarding:
+    if point_of_care_lease:
+        return point_of_care_lease.onboarding
     onboarding_data = PointOfCareOnboarding.get_onboarding_data_for_tests(
         base_url=base_url,
         year_groups={k: [v] for k, v in year_groups.items()},
     )
-    return _create_onboarding_with_retry(base_url, onboarding_data)
+    return create_onboarding_with_retry(mavis_testing_api, onboarding_data)
 
 
 @pytest.fixture(scope="session")
-def national_reporting_onboarding(base_url) -> NationalReportingOnboarding:
+def national_reporting_onboarding(
+    mavis_testing_api, national_reporting_lease
+) -> NationalReportingOnboarding:
+    if national_reporting_lease:
+        return national_reporting_lease.onboarding
     onboarding_data = NationalReportingOnboarding.get_onboarding_data_for_tests()
-    return _create_onboarding_with_retry(base_url, onboarding_data)
-
-
-def _create_onboarding_with_retry[T: Onboarding](
-    base_url: str, onboarding_data: T, max_attempts: int = 3
-) -> T:
-    onboarding_url = urllib.parse.urljoin(base_url, "api/testing/onboard")
-
-    for attempt in range(1, max_attempts + 1):
-        response = httpx.post(
-            onboarding_url, json=onboarding_data.to_dict(), timeout=30
-        )
-        if response.is_success:
-            return onboarding_data
-
-        logger.warning(
-            "Onboarding request failed (attempt %s): %s", attempt, response.content
-        )
-        if attempt < max_attempts:
-            deliberate_sleep(1, "retry backoff for onboarding API")
-        else:
-            response.raise_for_status()
-
-    msg = "Failed to create onboarding data for tests"
-    raise RuntimeError(msg)
+    return create_onboarding_with_retry(mavis_testing_api, onboarding_data)
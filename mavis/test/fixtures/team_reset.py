@@ -1,31 +1,37 @@
 import logging
-import urllib.parse
 
-import httpx
 import pytest
 
 from mavis.test.data_models import Team
+from mavis.test.onboarding_pool import OnboardingLease, OnboardingPool
+from mavis.test.testing_api import MavisTestingApiClient
 
 logger = logging.getLogger(__name__)
 
 
 @pytest.fixture(scope="session", autouse=True)
-def delete_teams_after_tests(base_url, point_of_care_team, national_reporting_team):
+def delete_teams_after_tests(
+    mavis_testing_api,
+    point_of_care_team,
+    national_reporting_team,
+    point_of_care_lease,
+    national_reporting_lease,
+):
     yield
 
-    _delete_team(base_url, point_of_care_team)
-    _delete_team(base_url, national_reporting_team)
+    # leased teams are reset and returned to the pool instead
+    if point_of_care_lease is None:
+        _delete_team(mavis_testing_api, point_of_care_team)
+    if national_reporting_lease is None:
+        _delete_team(mavis_testing_api, national_reporting_team)
 
 
 @pytest.fixture(scope="module", autouse=True)
 def reset_before_each_module(
-    base_url, point_of_care_team, national_reporting_team
+    mavis_testing_api, point_of_care_team, national_reporting_team
 ) -> None:
-    _delete_team(base_url, point_of_care_team, keep_itself=True)
-    _delete_team_locations(base_url, point_of_care_team, keep_base_locations=True)
-
-    _delete_team(base_url, national_reporting_team, keep_itself=True)
-    _delete_team_locations(base_url, national_reporting_team, keep_base_locations=True)
+    _reset_team(mavis_testing_api, point_of_care_team)
+    _reset_team(mavis_testing_api, national_reporting_team)
 
 
 def _check_response_status(response) -> None:
@@ -34,19 +40,37 @@ def _check_response_status(response) -> None:
     response.raise_for_status()
 
 
-def _delete_team(base_url: str, team: Team, *, keep_itself: bool = False) -> None:
-    url = urllib.parse.urljoin(base_url, f"api/testing/teams/{team.workgroup}")
+def _delete_team(
+    testing_api: MavisTestingApiClient, team: Team, *, keep_itself: bool = False
+) -> None:
     params = {"keep_itself": "true"} if keep_itself else {}
-    response = httpx.delete(url, params=params, timeout=30)
+    response = testing_api.delete(f"teams/{team.workgroup}", params=params)
     _check_response_status(response)
 
 
+def _reset_team(testing_api: MavisTestingApiClient, team: Team) -> None:
+    """Delete everything the tests added to a team, leaving it as onboarded."""
+    _delete_team(testing_api, team, keep_itself=True)
+    _delete_team_locations(testing_api, team, keep_base_locations=True)
+
+
+def _return_leased_team(
+    testing_api: MavisTestingApiClient, pool: OnboardingPool, lease: OnboardingLease
+) -> None:
+    try:
+        _reset_team(testing_api, lease.onboarding.team)
+    except Exception:
+        pool.discard(lease)
+        raise
+    pool.release(lease)
+
+
 def _delete_team_locations(
-    base_url: str, team: Team, *, keep_base_locations: bool = False
+    testing_api: MavisTestingApiClient,
+    team: Team,
+    *,
+    keep_base_locations: bool = False,
 ) -> None:
-    url = urllib.parse.urljoin(
-        base_url, f"api/testing/teams/{team.workgroup}/locations"
-    )
     params = {"keep_base_locations": "true"} if keep_base_locations else {}
-    response = httpx.delete(url, params=params, timeout=30)
+    response = testing_api.delete(f"teams/{team.workgroup}/locations", params=params)
     _check_response_status(response)
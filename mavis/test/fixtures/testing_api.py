@@ -0,0 +1,12 @@
+import pytest
+
+from mavis.test.testing_api import MavisTestingApiClient
+
+
+@pytest.fixture(scope="session")
+def mavis_testing_api(base_url):
+    testing_api = MavisTestingApiClient.for_base_url(base_url)
+    yield testing_api
+
+    testing_api.close()
+    MavisTestingApiClient.for_base_url.cache_clear()
@@ -1,4 +1,7 @@
+import asyncio
+import time
 import uuid
+from collections.abc import Callable, Sequence
 from datetime import datetime
 from typing import NamedTuple
 
@@ -9,7 +12,7 @@ from mavis.test.constants import DeliverySite, ImmsEndpoints, Vaccine
 from mavis.test.data.file_utils import create_fhir_immunization_payload
 from mavis.test.data_models import Child, School
 from mavis.test.fixtures.fhir_api import AuthToken
-from mavis.test.utils import deliberate_sleep
+from mavis.test.utils import deliberate_sleep, run_coroutine
 
 
 class ImmsApiVaccinationRecord(NamedTuple):
@@ -65,6 +68,34 @@ class ImmsApiVaccinationRecord(NamedTuple):
         )
 
 
+def _get_search_params(programme: str, nhs_number: str) -> dict[str, str]:
+    return {
+        "_include": "Immunization:patient",
+        "-immunization.target": programme.upper(),
+        "patient.identifier": f"https://fhir.nhs.uk/Id/nhs-number|{nhs_number}",
+    }
+
+
+def _get_vaccine_for_imms_api_code(vaccine_code: str) -> Vaccine:
+    for vaccine in Vaccine:
+        try:
+            if vaccine.imms_api_code == vaccine_code:
+                return vaccine
+        except KeyError:
+            continue
+    msg = f"No vaccine has IMMS API code {vaccine_code}"
+    raise ValueError(msg)
+
+
+def _is_transient(error: httpx.HTTPError) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return (
+            error.response.status_code == httpx.codes.TOO_MANY_REQUESTS
+            or error.response.is_server_error
+        )
+    return True
+
+
 class ImmsApiHelper:
     def __init__(self, auth_token: AuthToken) -> None:
         self.headers = {
@@ -177,16 +208,10 @@ class ImmsApiHelper:
     def get_raw_api_response_for_child(
         self, vaccine: Vaccine, child: Child
     ) -> httpx.Response:
-        _params = {
-            "_include": "Immunization:patient",
-            "-immunization.target": vaccine.programme.upper(),
-            "patient.identifier": f"https://fhir.nhs.uk/Id/nhs-number|{child.nhs_number}",
-        }
-
         response = httpx.get(
             url=ImmsEndpoints.READ.to_url,
             headers=self.headers,
-            params=_params,
+            params=_get_search_params(vaccine.programme, child.nhs_number),
             timeout=30,
         )
         response.raise_for_status()
@@ -260,3 +285,140 @@ class ImmsApiHelper:
                 delivery_site=delivery_site,
                 vaccination_time=vaccination_time,
             )
+
+
+class AsyncImmsApiHelper(ImmsApiHelper):
+    """
+    Verifies many IMMS API records at once.
+
+    Every record still waiting is looked up concurrently, at most
+    ``max_concurrency`` at a time, and then all of them wait out one shared
+    backoff before the next round. A record stops being polled as soon as it
+    matches, so the total time is set by the slowest record rather than by the
+    number of records.
+    """
+
+    def __init__(
+        self,
+        auth_token: AuthToken,
+        *,
+        max_concurrency: int = 20,
+        initial_interval_seconds: float = 1,
+        max_interval_seconds: float = 10,
+    ) -> None:
+        super().__init__(auth_token)
+        self.max_concurrency = max_concurrency
+        self.initial_interval_seconds = initial_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+
+    def check_records_in_imms_api(
+        self, expected_records: Sequence[ImmsApiVaccinationRecord], seconds: int = 60
+    ) -> None:
+        run_coroutine(self.check_records_in_imms_api_async(expected_records, seconds))
+
+    def check_records_are_not_in_imms_api(
+        self, expected_records: Sequence[ImmsApiVaccinationRecord], seconds: int = 15
+    ) -> None:
+        run_coroutine(
+            self.check_records_are_not_in_imms_api_async(expected_records, seconds)
+        )
+
+    async def check_records_in_imms_api_async(
+        self, expected_records: Sequence[ImmsApiVaccinationRecord], seconds: int = 60
+    ) -> None:
+        def check(
+            expected_record: ImmsApiVaccinationRecord,
+            actual_record: ImmsApiVaccinationRecord | None,
+        ) -> None:
+            self.check_expected_and_actual_records_match(expected_record, actual_record)
+
+        await self._poll_until(expected_records, check, seconds)
+
+    async def check_records_are_not_in_imms_api_async(
+        self, expected_records: Sequence[ImmsApiVaccinationRecord], seconds: int = 15
+    ) -> None:
+        def check(
+            expected_record: ImmsApiVaccinationRecord,
+            actual_record: ImmsApiVaccinationRecord | None,
+        ) -> None:
+            if actual_record is not None:
+                msg = (
+                    "Immunization record still found for "
+                    f"{expected_record.patient_nhs_number}"
+                )
+                raise AssertionError(msg)
+
+        await self._poll_until(expected_records, check, seconds)
+
+    async def _poll_until(
+        self,
+        expected_records: Sequence[ImmsApiVaccinationRecord],
+        check: Callable[
+            [ImmsApiVaccinationRecord, ImmsApiVaccinationRecord | None], None
+        ],
+        seconds: int,
+    ) -> None:
+        deadline = time.monotonic() + seconds
+        interval = self.initial_interval_seconds
+        pending = list(expected_records)
+        failures: dict[ImmsApiVaccinationRecord, str] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency)
+
+        async with httpx.AsyncClient(
+            headers=self.headers, limits=limits, timeout=30
+        ) as client:
+
+            async def poll(expected_record: ImmsApiVaccinationRecord) -> bool:
+                async with semaphore:
+                    try:
+                        actual_record = await self._get_imms_api_record_async(
+                            client, expected_record
+                        )
+                    except (httpx.TransportError, httpx.HTTPStatusError) as error:
+                        if not _is_transient(error):
+                            raise
+                        failures[expected_record] = str(error)
+                        return False
+                try:
+                    check(expected_record, actual_record)
+                except AssertionError as error:
+                    failures[expected_record] = str(error)
+                    return False
+                failures.pop(expected_record, None)
+                return True
+
+            while True:
+                results = await asyncio.gather(*(poll(r) for r in pending))
+                pending = [
+                    r for r, done in zip(pending, results, strict=True) if not done
+                ]
+                remaining = deadline - time.monotonic()
+                if not pending or remaining <= 0:
+                    break
+                # the last round waits only until the deadline, so a record is
+                # always checked once more at the end of the window
+                await asyncio.sleep(min(interval, remaining))
+                interval = min(interval * 2, self.max_interval_seconds)
+
+        if pending:
+            details = "\n".join(
+                f"{record.patient_nhs_number}: {failures[record]}" for record in pending
+            )
+            msg = (
+                f"{len(pending)} of {len(expected_records)} records failed:\n{details}"
+            )
+            raise AssertionError(msg)
+
+    async def _get_imms_api_record_async(
+        self, client: httpx.AsyncClient, expected_record: ImmsApiVaccinationRecord
+    ) -> ImmsApiVaccinationRecord | None:
+        vaccine = _get_vaccine_for_imms_api_code(expected_record.vaccine_code)
+        response = await client.get(
+            ImmsEndpoints.READ.to_url,
+            params=_get_search_params(
+                vaccine.programme, expected_record.patient_nhs_number
+            ),
+        )
+        response.raise_for_status()
+        return ImmsApiVaccinationRecord.from_response(response)
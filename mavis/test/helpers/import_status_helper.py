@@ -0,0 +1,111 @@
+import functools
+import logging
+import re
+import time
+
+import httpx
+
+from mavis.test.testing_api import MavisTestingApiClient
+from mavis.test.utils import deliberate_sleep
+
+logger = logging.getLogger(__name__)
+
+IMPORT_PATH_PATTERN = re.compile(
+    r"/(?P<import_type>(?:class|cohort|immunisation)-imports)/(?P<import_id>\d+)"
+)
+PENDING_IMPORT_STATUSES = frozenset(
+    {"pending_import", "calculating_re_review", "committing"}
+)
+
+POLL_INITIAL_INTERVAL_SECONDS = 0.1
+POLL_MAX_INTERVAL_SECONDS = 1.0
+
+
+class ImportStatusClient:
+    """
+    Polls the testing API for the status of an import.
+
+    Requests go through the worker's shared MavisTestingApiClient. If the status
+    endpoint is not there (Mavis answers 404, or something other than a status,
+    before the endpoint has ever answered) the client stops asking, and callers
+    fall back to waiting in the UI. Any other failure, or a 404 once the
+    endpoint is known to be there, only falls back for that one wait.
+    """
+
+    def __init__(self, testing_api: MavisTestingApiClient) -> None:
+        self.testing_api = testing_api
+        self.available = True
+        self.answered = False
+
+    @classmethod
+    @functools.cache
+    def for_base_url(cls, base_url: str) -> "ImportStatusClient":
+        return cls(MavisTestingApiClient.for_base_url(base_url))
+
+    def get_status(self, import_type: str, import_id: str) -> str | None:
+        if not self.available:
+            return None
+
+        try:
+            response = self.testing_api.get(f"{import_type}/{import_id}")
+        except httpx.TransportError:
+            logger.warning("Import status API unreachable, waiting in the UI")
+            return None
+
+        if response.status_code == httpx.codes.NOT_FOUND:
+            self._not_found(f"{import_type}/{import_id} returned 404")
+            return None
+
+        if not response.is_success:
+            logger.warning(
+                "Import status API returned %s, waiting in the UI",
+                response.status_code,
+            )
+            return None
+
+        try:
+            status = response.json()["status"]
+        except (ValueError, KeyError, TypeError):
+            status = None
+        if not isinstance(status, str):
+            self._not_found(f"{import_type}/{import_id} returned no status")
+            return None
+
+        self.answered = True
+        return status
+
+    def _not_found(self, reason: str) -> None:
+        # until the endpoint has answered, this means Mavis doesn't have it;
+        # after, it's an import the API can't see yet
+        if self.answered:
+            logger.warning("Import status API: %s, waiting in the UI", reason)
+        else:
+            logger.info("No import status API (%s), falling back to the UI", reason)
+            self.available = False
+
+    def wait_until_finished(self, import_path: str, seconds: float) -> bool:
+        """
+        Wait for the import at import_path (e.g. /class-imports/123) to finish.
+
+        Returns False if the import could not be identified, the status is not
+        available, or it has not finished in time, so that the caller can wait
+        in the UI instead.
+        """
+        match = IMPORT_PATH_PATTERN.search(import_path)
+        if not match:
+            return False
+
+        deadline = time.monotonic() + seconds
+        interval = POLL_INITIAL_INTERVAL_SECONDS
+
+        while time.monotonic() < deadline:
+            status = self.get_status(match["import_type"], match["import_id"])
+            if status is None:
+                return False
+            if status not in PENDING_IMPORT_STATUSES:
+                return True
+
+            deliberate_sleep(interval, "polling the import status API")
+            interval = min(interval * 2, POLL_MAX_INTERVAL_SECONDS)
+
+        return False
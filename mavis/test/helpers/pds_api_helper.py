@@ -1,7 +1,13 @@
+import asyncio
 import csv
+import json
+import logging
 import random
+import tempfile
+import time
 import uuid
-from datetime import date, datetime
+from collections import Counter, deque
+from datetime import UTC, date, datetime, timedelta
 from pathlib import Path
 from typing import NamedTuple
 from zoneinfo import ZoneInfo
@@ -13,7 +19,16 @@ from dateutil.relativedelta import relativedelta
 from mavis.test.constants import PdsEndpoints, Relationship
 from mavis.test.data_models import Child, Parent
 from mavis.test.fixtures.fhir_api import AuthToken
-from mavis.test.utils import deliberate_sleep, get_todays_date
+from mavis.test.utils import get_todays_date, run_coroutine
+
+logger = logging.getLogger(__name__)
+
+# the PDS FHIR API's rate limit for an application
+PDS_REQUESTS_PER_SECOND = 5
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "mavis" / "pds_validation.json"
+DEFAULT_CACHE_TTL = timedelta(days=7)
+# times a child is looked up when PDS is rate limiting or failing
+MAX_ATTEMPTS = 3
 
 
 class Patient(NamedTuple):
@@ -78,8 +93,175 @@ class Patient(NamedTuple):
         )
 
 
+def _patient_from_pds_data(data: dict) -> Patient:
+    patient_id = data["id"]
+    name_data = data["name"][0]
+    given_name = name_data["given"][0]
+    family_name = name_data["family"]
+    date_of_birth = dateutil.parser.parse(data["birthDate"]).date()
+    date_of_death = (
+        dateutil.parser.parse(data["deceasedDateTime"]).date()
+        if "deceasedDateTime" in data
+        else None
+    )
+
+    if "address" not in data:
+        msg = "No address in patient data"
+        raise ValueError(msg)
+    address = None
+    for addr in data["address"]:
+        if addr.get("use") == "home":
+            address = addr
+            break
+    if address is None:
+        address = data["address"][0]
+
+    address_lines = address["line"]
+    if "postalCode" not in address:
+        msg = "No postal code in patient address"
+        raise ValueError(msg)
+    postal_code = address["postalCode"]
+
+    required_address_lines = 3
+    while len(address_lines) < required_address_lines:
+        address_lines.append("")
+
+    return Patient(
+        nhs_number=patient_id,
+        date_of_birth=date_of_birth,
+        family_name=family_name,
+        given_name=given_name,
+        address_line_1=address_lines[0],
+        address_line_2=address_lines[1],
+        address_town=address_lines[2],
+        address_postcode=postal_code,
+        date_of_death=date_of_death,
+    )
+
+
+def _search_params(patient: Patient) -> dict[str, str]:
+    return {
+        "family": patient.family_name,
+        "given": patient.given_name,
+        "birthdate": f"eq{patient.date_of_birth.isoformat()}",
+        "address-postcode": patient.address_postcode.replace(" ", ""),
+    }
+
+
+def _is_found_by_search(data: dict, patient: Patient) -> bool:
+    return (
+        "issues" not in data
+        and "entry" in data
+        and data["entry"][0]["resource"]["id"] == patient.nhs_number
+    )
+
+
+def _is_transient(error: httpx.HTTPError) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return (
+            error.response.status_code == httpx.codes.TOO_MANY_REQUESTS
+            or error.response.is_server_error
+        )
+    return True
+
+
+class TokenBucket:
+    """
+    Spaces out requests to average ``rate`` a second, allowing bursts of up to
+    ``capacity``. Each request reserves a token, waiting for it if the bucket
+    has run dry, so concurrent callers are let through in the order they ask.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class PdsValidationCache:
+    """
+    Whether each patient in pds.csv was found to match PDS, kept in a JSON
+    file for ``ttl`` so later runs can skip NHS numbers known to be outdated
+    and try those known to be valid first. Outcomes are kept per PDS
+    environment, and merged with any saved by other runs in the meantime.
+    """
+
+    def __init__(self, path: Path, ttl: timedelta, environment: str) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.environment = environment
+        self._updated: dict[str, dict] = {}
+        self._outcomes = self._load().get(environment, {})
+
+    def _load(self) -> dict[str, dict[str, dict]]:
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable PDS validation cache %s", self.path)
+            return {}
+
+    def is_valid(self, nhs_number: str) -> bool | None:
+        """The cached outcome for nhs_number, or None if unknown or expired."""
+        outcome = self._outcomes.get(nhs_number)
+        if outcome is None:
+            return None
+        checked_at = datetime.fromisoformat(outcome["checked_at"])
+        if datetime.now(tz=UTC) - checked_at > self.ttl:
+            return None
+        return outcome["valid"]
+
+    def set(self, nhs_number: str, *, valid: bool) -> None:
+        outcome = {"valid": valid, "checked_at": datetime.now(tz=UTC).isoformat()}
+        self._outcomes[nhs_number] = outcome
+        self._updated[nhs_number] = outcome
+
+    def save(self) -> None:
+        if not self._updated:
+            return
+        cache = self._load()
+        cache.setdefault(self.environment, {}).update(self._updated)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file and moved into place, so parallel test
+        # workers never read a partly written cache
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path.parent, suffix=".tmp", delete=False
+        ) as file:
+            json.dump(cache, file)
+        Path(file.name).replace(self.path)
+        self._updated.clear()
+
+
 class PdsApiHelper:
-    def __init__(self, auth_token: AuthToken) -> None:
+    """
+    Looks up patients in PDS, and picks children from the pds.csv export that
+    still match it.
+
+    Candidates are checked concurrently by ``max_concurrency`` workers, with
+    requests held to ``requests_per_second`` by a shared token bucket, and the
+    outcome for each is cached at ``cache_path`` (if not None) for
+    ``cache_ttl``.
+    """
+
+    def __init__(
+        self,
+        auth_token: AuthToken,
+        *,
+        max_concurrency: int = 4,
+        requests_per_second: float = PDS_REQUESTS_PER_SECOND,
+        cache_path: Path | None = DEFAULT_CACHE_PATH,
+        cache_ttl: timedelta = DEFAULT_CACHE_TTL,
+    ) -> None:
         self.headers = {
             "accept": "application/fhir+json",
             "content-type": "application/x-www-form-urlencoded",
@@ -87,6 +269,10 @@ class PdsApiHelper:
             "x-request-id": str(uuid.uuid4()),
             "Authorization": f"Bearer {auth_token.token}",
         }
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
         self._load_patients()
 
     def _load_patients(self) -> None:
@@ -97,23 +283,9 @@ class PdsApiHelper:
             self.patients = [Patient.from_csv_row(row) for row in reader]
 
     def get_random_child_patient_without_date_of_death(self) -> Child:
-        child_patients = self._get_eligible_child_patients()
-        checked_nhs_numbers = set()
-
-        while True:
-            if len(checked_nhs_numbers) == len(child_patients):
-                msg = "All patients in PDS export are outdated"
-                raise RuntimeError(msg)
-
-            child = random.choice(child_patients)
-            if child.nhs_number in checked_nhs_numbers:
-                continue
-
-            checked_nhs_numbers.add(child.nhs_number)
-
-            if self._is_valid_child_patient(child):
-                deliberate_sleep(0.5, "rate limiting between PDS API calls")
-                break
+        child = run_coroutine(
+            self._find_valid_child_patient(self._get_eligible_child_patients())
+        )
 
         return Child(
             child.given_name,
@@ -136,11 +308,91 @@ class PdsApiHelper:
             if patient.date_of_birth >= cutoff_date
         ]
 
-    def _is_valid_child_patient(self, child: Patient) -> bool:
+    async def _find_valid_child_patient(self, child_patients: list[Patient]) -> Patient:
+        cache = (
+            PdsValidationCache(
+                self.cache_path,
+                self.cache_ttl,
+                PdsEndpoints.GET_PATIENT_DETAILS.to_url,
+            )
+            if self.cache_path
+            else None
+        )
+        outcomes = {
+            child.nhs_number: cache.is_valid(child.nhs_number) if cache else None
+            for child in child_patients
+        }
+        candidates = [
+            child for child in child_patients if outcomes[child.nhs_number] is not False
+        ]
+        random.shuffle(candidates)
+        # children found valid before are most likely still valid
+        candidates.sort(key=lambda child: outcomes[child.nhs_number] is not True)
+        remaining = deque(candidates)
+        attempts: Counter[str] = Counter()
+        found: list[Patient] = []
+
+        bucket = TokenBucket(self.requests_per_second)
+        limits = httpx.Limits(max_connections=self.max_concurrency)
+        async with httpx.AsyncClient(
+            headers=self.headers, limits=limits, timeout=30
+        ) as client:
+
+            async def worker() -> None:
+                while remaining and not found:
+                    child = remaining.popleft()
+                    attempts[child.nhs_number] += 1
+                    valid = await self._check_child_patient(client, bucket, child)
+                    if valid is None:
+                        if attempts[child.nhs_number] < MAX_ATTEMPTS:
+                            remaining.append(child)
+                    elif cache:
+                        cache.set(child.nhs_number, valid=valid)
+                    if valid:
+                        found.append(child)
+
+            try:
+                async with asyncio.TaskGroup() as workers:
+                    for _ in range(self.max_concurrency):
+                        workers.create_task(worker())
+            finally:
+                if cache:
+                    cache.save()
+
+        logger.info(
+            "Checked %d of %d children in the PDS export, skipping %d known to "
+            "be outdated",
+            len(attempts),
+            len(child_patients),
+            len(child_patients) - len(candidates),
+        )
+        if not found:
+            msg = "All patients in PDS export are outdated"
+            raise RuntimeError(msg)
+        return found[0]
+
+    async def _check_child_patient(
+        self, client: httpx.AsyncClient, bucket: TokenBucket, child: Patient
+    ) -> bool | None:
+        """
+        Whether child matches PDS and can be found by searching for them, or
+        None if PDS couldn't be asked for now.
+        """
         try:
-            child_in_pds = self.get_patient_by_nhs_number(child.nhs_number)
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code in {404, 429}:
+            await bucket.acquire()
+            response = await client.get(
+                PdsEndpoints.GET_PATIENT_DETAILS.to_url_with_suffix(child.nhs_number)
+            )
+            response.raise_for_status()
+            child_in_pds = _patient_from_pds_data(response.json())
+        except httpx.HTTPError as error:
+            if _is_transient(error):
+                logger.debug("Couldn't look up %s: %s", child.nhs_number, error)
+                return None
+            if (
+                isinstance(error, httpx.HTTPStatusError)
+                and error.response.status_code == httpx.codes.NOT_FOUND
+            ):
                 return False
             raise
         except ValueError:
@@ -149,13 +401,26 @@ class PdsApiHelper:
         if not child.matches_key_attributes(child_in_pds):
             return False
 
+        return await self._can_be_found_by_search(client, bucket, child)
+
+    async def _can_be_found_by_search(
+        self, client: httpx.AsyncClient, bucket: TokenBucket, patient: Patient
+    ) -> bool | None:
         try:
-            return self._confirm_patient_can_be_found_by_search(child)
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code in {404, 429}:
-                return False
+            await bucket.acquire()
+            # as params, since joining SEARCH_FOR_PATIENT's URL drops its "?"
+            response = await client.get(
+                PdsEndpoints.SEARCH_FOR_PATIENT.to_url, params=_search_params(patient)
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as error:
+            if _is_transient(error):
+                logger.debug("Couldn't search for %s: %s", patient.nhs_number, error)
+                return None
             return False
 
+        return _is_found_by_search(response.json(), patient)
+
     def get_patient_by_nhs_number(self, nhs_number: str) -> Patient:
         response = httpx.get(
             url=PdsEndpoints.GET_PATIENT_DETAILS.to_url_with_suffix(nhs_number),
@@ -163,69 +428,4 @@ class PdsApiHelper:
             timeout=30,
         )
         response.raise_for_status()
-
-        data = response.json()
-
-        patient_id = data["id"]
-        name_data = data["name"][0]
-        given_name = name_data["given"][0]
-        family_name = name_data["family"]
-        date_of_birth = dateutil.parser.parse(data["birthDate"]).date()
-        date_of_death = (
-            dateutil.parser.parse(data["deceasedDateTime"]).date()
-            if "deceasedDateTime" in data
-            else None
-        )
-
-        if "address" not in data:
-            msg = "No address in patient data"
-            raise ValueError(msg)
-        address = None
-        for addr in data["address"]:
-            if addr.get("use") == "home":
-                address = addr
-                break
-        if address is None:
-            address = data["address"][0]
-
-        address_lines = address["line"]
-        if "postalCode" not in address:
-            msg = "No postal code in patient address"
-            raise ValueError(msg)
-        postal_code = address["postalCode"]
-
-        required_address_lines = 3
-        while len(address_lines) < required_address_lines:
-            address_lines.append("")
-
-        return Patient(
-            nhs_number=patient_id,
-            date_of_birth=date_of_birth,
-            family_name=family_name,
-            given_name=given_name,
-            address_line_1=address_lines[0],
-            address_line_2=address_lines[1],
-            address_town=address_lines[2],
-            address_postcode=postal_code,
-            date_of_death=date_of_death,
-        )
-
-    def _confirm_patient_can_be_found_by_search(self, patient: Patient) -> bool:
-        response = httpx.get(
-            url=PdsEndpoints.SEARCH_FOR_PATIENT.to_url_with_suffix(
-                f"family={patient.family_name}"
-                f"&given={patient.given_name}"
-                f"&birthdate=eq{patient.date_of_birth.isoformat()}"
-                f"&address-postcode={patient.address_postcode.replace(' ', '')}"
-            ),
-            headers=self.headers,
-            timeout=30,
-        )
-        response.raise_for_status()
-
-        data = response.json()
-        return (
-            "issues" not in data
-            and "entry" in data
-            and data["entry"][0]["resource"]["id"] == patient.nhs_number
-        )
+        return _patient_from_pds_data(response.json())
@@ -0,0 +1,26 @@
+from .analysis import JtlSummary, Slo, analyse_jtl, find_regressions
+from .consent_journey import ConsentJourney
+from .nurse_journey import NurseJourney
+from .runner import (
+    JourneyError,
+    LoadProfile,
+    LoadRunner,
+    NoMoreDataError,
+    SampleRecorder,
+    VirtualUser,
+)
+
+__all__ = [
+    "ConsentJourney",
+    "JourneyError",
+    "JtlSummary",
+    "LoadProfile",
+    "LoadRunner",
+    "NoMoreDataError",
+    "NurseJourney",
+    "SampleRecorder",
+    "Slo",
+    "VirtualUser",
+    "analyse_jtl",
+    "find_regressions",
+]
@@ -0,0 +1,258 @@
+"""
+Entry point for running the load test journeys without JMeter or a browser.
+
+Usage:
+    python -m mavis.test.load nurse --user nurse@example.com
+      [--base-url https://qa.mavistesting.com] [--users 10] [--ramp-up 60]
+      [--duration 600] [--loops -1] [--think-time-scale 1]
+      [--programme flu --programme hpv] [--jtl output/nurse/samples.jtl]
+    python -m mavis.test.load consent --user nurse@example.com
+      [--programme flu|hpv|mmr|doubles] [--flu-consent nasal|injection|either]
+      [--mmr-consent gelatine|without-gelatine|either] [--histograms] [...]
+    python -m mavis.test.load analyse output/nurse/samples.jtl
+      [--baseline baseline.json] [--json summary.json]
+      [--allure-results allure-results] [--percentile p95]
+      [--max-regression 0.2] [--max-error-rate 0.01] [--max-ms 5000]
+
+--users, --ramp-up and --duration default to the THREADS, RAMP_UP and
+DURATION environment variables that performance-tests/entrypoint.sh takes.
+Basic auth is read from BASIC_AUTH_TOKEN, or BASIC_AUTH_USERNAME and
+BASIC_AUTH_PASSWORD, as for the tests. Samples are written in JMeter's JTL
+format, so the same reports can be built from either.
+
+The consent journey uses the nurse only to find children without a consent
+response; each consent is then submitted anonymously, as a parent would. To
+model the evening spike after a reminder is sent, give it many users and a
+short --ramp-up.
+
+analyse reads a JTL file from either driver in one pass and reports
+percentiles, throughput and error rates per label. It exits with status 1 if
+any label breaks the SLO, either absolutely or compared with a baseline; the
+--json summary of a good run can be used as the baseline for the next.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+
+import httpx
+
+from mavis.test.constants import ConsentOption, Programme
+from mavis.test.data_models import User
+from mavis.test.load.analysis import (
+    DEFAULT_SAMPLE_FILTER,
+    DEFAULT_WINDOW_SECONDS,
+    PERCENTILES,
+    Slo,
+    analyse_jtl,
+    find_regressions,
+    log_report,
+    write_allure_result,
+)
+from mavis.test.load.consent_journey import DEFAULT_CONSENT_OPTIONS, ConsentJourney
+from mavis.test.load.nurse_journey import NurseJourney
+from mavis.test.load.runner import (
+    Journey,
+    LoadProfile,
+    LoadRunner,
+    NoMoreDataError,
+)
+
+DEFAULT_USERS = 10
+DEFAULT_RAMP_UP_SECONDS = 60
+DEFAULT_DURATION_SECONDS = 600
+
+FLU_CONSENT_OPTIONS = {
+    "nasal": ConsentOption.NASAL_SPRAY,
+    "injection": ConsentOption.INJECTION,
+    "either": ConsentOption.NASAL_SPRAY_OR_INJECTION,
+}
+MMR_CONSENT_OPTIONS = {
+    "gelatine": ConsentOption.INJECTION,
+    "without-gelatine": ConsentOption.MMR_WITHOUT_GELATINE,
+    "either": ConsentOption.MMR_EITHER,
+}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logging.getLogger("httpx").setLevel(logging.WARNING)
+log = logging.getLogger(__name__)
+
+
+def _basic_auth() -> tuple[dict[str, str], httpx.Auth | None]:
+    if token := os.environ.get("BASIC_AUTH_TOKEN"):
+        return {"Authorization": f"Basic {token}"}, None
+    username = os.environ.get("BASIC_AUTH_USERNAME")
+    password = os.environ.get("BASIC_AUTH_PASSWORD")
+    if username and password:
+        return {}, httpx.BasicAuth(username, password)
+    return {}, None
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--base-url", default=os.environ.get("BASE_URL"))
+    parser.add_argument(
+        "--users", type=int, default=int(os.environ.get("THREADS", DEFAULT_USERS))
+    )
+    parser.add_argument(
+        "--ramp-up",
+        type=float,
+        default=float(os.environ.get("RAMP_UP", DEFAULT_RAMP_UP_SECONDS)),
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=float(os.environ.get("DURATION", DEFAULT_DURATION_SECONDS)),
+    )
+    parser.add_argument("--loops", type=int, default=-1)
+    parser.add_argument("--think-time-scale", type=float, default=1.0)
+    parser.add_argument("--jtl", type=Path)
+    parser.add_argument(
+        "--histograms", action="store_true", help="log latency histograms per step"
+    )
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", help="defaults to the user's email address")
+
+
+def _nurse(args: argparse.Namespace) -> User:
+    return User(username=args.user, password=args.password or args.user, role="nurse")
+
+
+def _nurse_journey(args: argparse.Namespace) -> Journey:
+    programmes = {programme.programme_type: programme for programme in Programme}
+    return NurseJourney(
+        nurse=_nurse(args),
+        programmes=[programmes[name] for name in args.programme or programmes],
+    )
+
+
+def _consent_journey(args: argparse.Namespace) -> Journey:
+    programmes = {
+        "flu": [Programme.FLU],
+        "hpv": [Programme.HPV],
+        "mmr": [Programme.MMR_MMRV],
+        "doubles": [Programme.MENACWY, Programme.TD_IPV],
+    }
+    return ConsentJourney(
+        nurse=_nurse(args),
+        programmes=[
+            programme
+            for name in args.programme or programmes
+            for programme in programmes[name]
+        ],
+        consent_options={
+            **DEFAULT_CONSENT_OPTIONS,
+            Programme.FLU: FLU_CONSENT_OPTIONS[args.flu_consent],
+            Programme.MMR_MMRV: MMR_CONSENT_OPTIONS[args.mmr_consent],
+        },
+    )
+
+
+def _run_journey(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if not args.base_url:
+        parser.error("--base-url or BASE_URL is required")
+
+    headers, auth = _basic_auth()
+    runner = LoadRunner(
+        args.base_url,
+        LoadProfile(
+            users=args.users,
+            ramp_up_seconds=args.ramp_up,
+            duration_seconds=args.duration,
+            loops=args.loops,
+            think_time_scale=args.think_time_scale,
+        ),
+        headers=headers,
+        auth=auth,
+        jtl_path=args.jtl,
+    )
+    try:
+        recorder = asyncio.run(runner.run(args.create_journey(args)))
+    except NoMoreDataError as exc:
+        parser.exit(1, f"{exc}\n")
+    if args.histograms:
+        recorder.log_histograms()
+
+
+def _analyse(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    try:
+        summary = analyse_jtl(
+            args.jtl, window_seconds=args.window, sample_filter=args.sample_filter
+        ).to_dict()
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"{exc}\n")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    regressions = find_regressions(
+        summary,
+        baseline,
+        Slo(
+            percentile=args.percentile,
+            max_regression=args.max_regression,
+            max_error_rate=args.max_error_rate,
+            max_ms=args.max_ms,
+            min_samples=args.min_samples,
+        ),
+    )
+    summary["regressions"] = [str(regression) for regression in regressions]
+    log_report(summary, regressions)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(summary, indent=2))
+    if args.allure_results:
+        write_allure_result(
+            args.allure_results, args.jtl.resolve().parent.name, summary, regressions
+        )
+    if regressions:
+        parser.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run or analyse a Mavis load test")
+    journeys = parser.add_subparsers(dest="command", required=True)
+
+    nurse = journeys.add_parser("nurse", help="nurse-journey.jmx")
+    _add_common_arguments(nurse)
+    nurse.add_argument(
+        "--programme",
+        action="append",
+        choices=[programme.programme_type for programme in Programme],
+    )
+    nurse.set_defaults(create_journey=_nurse_journey, run=_run_journey)
+
+    consent = journeys.add_parser("consent", help="consent-journey.jmx")
+    _add_common_arguments(consent)
+    consent.add_argument(
+        "--programme", action="append", choices=["flu", "hpv", "mmr", "doubles"]
+    )
+    consent.add_argument(
+        "--flu-consent", default="nasal", choices=list(FLU_CONSENT_OPTIONS)
+    )
+    consent.add_argument(
+        "--mmr-consent", default="gelatine", choices=list(MMR_CONSENT_OPTIONS)
+    )
+    consent.set_defaults(create_journey=_consent_journey, run=_run_journey)
+
+    analyse = journeys.add_parser("analyse", help="summarise and check a JTL file")
+    analyse.add_argument("jtl", type=Path)
+    analyse.add_argument("--baseline", type=Path, help="a --json summary to compare")
+    analyse.add_argument("--json", type=Path, help="write the summary here")
+    analyse.add_argument("--allure-results", type=Path)
+    analyse.add_argument("--window", type=int, default=DEFAULT_WINDOW_SECONDS)
+    analyse.add_argument("--sample-filter", default=DEFAULT_SAMPLE_FILTER)
+    analyse.add_argument("--percentile", default=Slo.percentile, choices=PERCENTILES)
+    analyse.add_argument("--max-regression", type=float, default=Slo.max_regression)
+    analyse.add_argument("--max-error-rate", type=float, default=Slo.max_error_rate)
+    analyse.add_argument("--max-ms", type=int)
+    analyse.add_argument("--min-samples", type=int, default=Slo.min_samples)
+    analyse.set_defaults(run=_analyse)
+
+    args = parser.parse_args()
+    args.run(parser, args)
+
+
+if __name__ == "__main__":
+    main()
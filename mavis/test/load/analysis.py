@@ -0,0 +1,313 @@
+import csv
+import json
+import logging
+import math
+import re
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from allure_commons.logger import AllureFileLogger
+from allure_commons.model2 import (
+    ATTACHMENT_PATTERN,
+    Attachment,
+    Label,
+    Status,
+    StatusDetails,
+    TestResult,
+)
+from allure_commons.types import AttachmentType
+
+log = logging.getLogger(__name__)
+
+PERCENTILES = {"p50": 0.50, "p90": 0.90, "p95": 0.95, "p99": 0.99}
+DEFAULT_WINDOW_SECONDS = 60
+
+# the sample filter entrypoint.sh gives JMeter's report generator, which leaves
+# out the numbered sub-samples of redirected requests
+DEFAULT_SAMPLE_FILTER = r"^.*[^0-9]$"
+
+
+@dataclass
+class TransactionStats:
+    """
+    Counts and a latency histogram for one label.
+
+    Elapsed times are counted per whole millisecond, as JMeter records them,
+    so memory depends on the spread of response times rather than the number
+    of samples and the percentiles are exact.
+    """
+
+    samples: int = 0
+    errors: int = 0
+    bytes_received: int = 0
+    total_elapsed_ms: int = 0
+    elapsed_ms: Counter[int] = field(default_factory=Counter)
+
+    def add(self, elapsed_ms: int, *, success: bool, bytes_received: int) -> None:
+        self.samples += 1
+        self.errors += not success
+        self.bytes_received += bytes_received
+        self.total_elapsed_ms += elapsed_ms
+        self.elapsed_ms[elapsed_ms] += 1
+
+    def percentile(self, fraction: float) -> int:
+        """The nearest-rank percentile of the elapsed times, in milliseconds."""
+        rank = max(1, math.ceil(fraction * self.samples))
+        seen = 0
+        for elapsed_ms in sorted(self.elapsed_ms):
+            seen += self.elapsed_ms[elapsed_ms]
+            if seen >= rank:
+                return elapsed_ms
+        return 0
+
+    def to_dict(self, duration_seconds: float) -> dict[str, float]:
+        return {
+            "samples": self.samples,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.samples, 4) if self.samples else 0,
+            "throughput": round(self.samples / duration_seconds, 3)
+            if duration_seconds
+            else 0,
+            "mean_ms": round(self.total_elapsed_ms / self.samples)
+            if self.samples
+            else 0,
+            **{
+                f"{name}_ms": self.percentile(fraction)
+                for name, fraction in PERCENTILES.items()
+            },
+            "max_ms": max(self.elapsed_ms, default=0),
+            "bytes_received": self.bytes_received,
+        }
+
+
+@dataclass
+class Window:
+    samples: int = 0
+    errors: int = 0
+
+
+@dataclass
+class JtlSummary:
+    """Per-label statistics and per-window throughput for one JTL file."""
+
+    window_seconds: int = DEFAULT_WINDOW_SECONDS
+    first_timestamp_ms: int | None = None
+    last_timestamp_ms: int | None = None
+    transactions: dict[str, TransactionStats] = field(default_factory=dict)
+    windows: dict[int, Window] = field(default_factory=dict)
+
+    @property
+    def duration_seconds(self) -> float:
+        if self.first_timestamp_ms is None or self.last_timestamp_ms is None:
+            return 0
+        return (self.last_timestamp_ms - self.first_timestamp_ms) / 1000
+
+    def add(
+        self,
+        label: str,
+        timestamp_ms: int,
+        elapsed_ms: int,
+        *,
+        success: bool,
+        bytes_received: int,
+    ) -> None:
+        if self.first_timestamp_ms is None or timestamp_ms < self.first_timestamp_ms:
+            self.first_timestamp_ms = timestamp_ms
+        self.last_timestamp_ms = max(
+            self.last_timestamp_ms or 0, timestamp_ms + elapsed_ms
+        )
+        if (stats := self.transactions.get(label)) is None:
+            stats = self.transactions[label] = TransactionStats()
+        stats.add(elapsed_ms, success=success, bytes_received=bytes_received)
+
+        window_index = timestamp_ms // (self.window_seconds * 1000)
+        if (window := self.windows.get(window_index)) is None:
+            window = self.windows[window_index] = Window()
+        window.samples += 1
+        window.errors += not success
+
+    def to_dict(self) -> dict:
+        duration = self.duration_seconds
+        return {
+            "duration_seconds": round(duration, 3),
+            "window_seconds": self.window_seconds,
+            "transactions": {
+                label: stats.to_dict(duration)
+                for label, stats in sorted(self.transactions.items())
+            },
+            "windows": [
+                {
+                    "start_ms": index * self.window_seconds * 1000,
+                    "samples": window.samples,
+                    "errors": window.errors,
+                    "throughput": round(window.samples / self.window_seconds, 3),
+                    "error_rate": round(window.errors / window.samples, 4),
+                }
+                for index, window in sorted(self.windows.items())
+            ],
+        }
+
+
+def analyse_jtl(
+    path: Path,
+    *,
+    window_seconds: int = DEFAULT_WINDOW_SECONDS,
+    sample_filter: str = DEFAULT_SAMPLE_FILTER,
+) -> JtlSummary:
+    """
+    Summarise a CSV JTL file written by JMeter or mavis.test.load.
+
+    The file is read one row at a time, so results files of any size can be
+    analysed in constant memory.
+    """
+    include = re.compile(sample_filter)
+    summary = JtlSummary(window_seconds=window_seconds)
+    with path.open(newline="", encoding="utf-8") as jtl_file:
+        rows = csv.reader(jtl_file)
+        columns = {name: index for index, name in enumerate(next(rows, []))}
+        try:
+            label = columns["label"]
+            timestamp = columns["timeStamp"]
+            elapsed = columns["elapsed"]
+            success = columns["success"]
+        except KeyError as exc:
+            msg = f"{path} is not a CSV JTL file with a header row: missing {exc}"
+            raise ValueError(msg) from None
+        received = columns.get("bytes")
+
+        for row in rows:
+            if not row or not include.match(row[label]):
+                continue
+            summary.add(
+                row[label],
+                int(row[timestamp]),
+                int(row[elapsed]),
+                success=row[success] == "true",
+                bytes_received=int(row[received] or 0) if received is not None else 0,
+            )
+    return summary
+
+
+@dataclass
+class Slo:
+    """
+    Thresholds a run must meet to pass.
+
+    A label regresses if its percentile is more than max_regression (as a
+    fraction) above the baseline's or above max_ms, or if its error rate is
+    above both max_error_rate and the baseline's. Labels with fewer than
+    min_samples samples are too noisy to judge.
+    """
+
+    percentile: str = "p95"
+    max_regression: float = 0.2
+    max_error_rate: float = 0.01
+    max_ms: int | None = None
+    min_samples: int = 20
+
+
+@dataclass(frozen=True)
+class Regression:
+    label: str
+    metric: str
+    current: float
+    limit: float
+
+    def __str__(self) -> str:
+        return f"{self.label}: {self.metric} {self.current} exceeds {self.limit}"
+
+
+def find_regressions(
+    current: dict, baseline: dict | None, slo: Slo
+) -> list[Regression]:
+    """Labels in current, a JtlSummary.to_dict(), that break the SLO."""
+    metric = f"{slo.percentile}_ms"
+    baseline_transactions = (baseline or {}).get("transactions", {})
+    regressions = []
+    for label, stats in current["transactions"].items():
+        if stats["samples"] < slo.min_samples:
+            continue
+        previous = baseline_transactions.get(label)
+
+        limits = []
+        if slo.max_ms is not None:
+            limits.append(slo.max_ms)
+        if previous and previous["samples"] >= slo.min_samples:
+            limits.append(round(previous[metric] * (1 + slo.max_regression)))
+        if limits and stats[metric] > min(limits):
+            regressions.append(Regression(label, metric, stats[metric], min(limits)))
+
+        error_limit = max(slo.max_error_rate, previous["error_rate"] if previous else 0)
+        if stats["error_rate"] > error_limit:
+            regressions.append(
+                Regression(label, "error_rate", stats["error_rate"], error_limit)
+            )
+    return regressions
+
+
+def log_report(summary: dict, regressions: list[Regression]) -> None:
+    log.info(
+        "%-40s %7s %7s %8s %8s %8s %8s %8s",
+        "label",
+        "count",
+        "errors",
+        "per sec",
+        *(f"{name} ms" for name in PERCENTILES),
+    )
+    for label, stats in summary["transactions"].items():
+        log.info(
+            "%-40s %7d %7d %8.1f %8d %8d %8d %8d",
+            label,
+            stats["samples"],
+            stats["errors"],
+            stats["throughput"],
+            *(stats[f"{name}_ms"] for name in PERCENTILES),
+        )
+    for regression in regressions:
+        log.error("Regression: %s", regression)
+
+
+def write_allure_result(
+    results_dir: Path, name: str, summary: dict, regressions: list[Regression]
+) -> None:
+    """
+    Write the summary as an Allure test result, so it shows up in the same
+    report as the functional tests.
+    """
+    allure_logger = AllureFileLogger(results_dir)
+    attachments = []
+    for attachment_name, body, attachment_type in [
+        ("Performance summary", json.dumps(summary, indent=2), AttachmentType.JSON),
+        (
+            "Regressions",
+            "\n".join(map(str, regressions)) or "None",
+            AttachmentType.TEXT,
+        ),
+    ]:
+        source = ATTACHMENT_PATTERN.format(
+            prefix=uuid.uuid4(), ext=attachment_type.extension
+        )
+        allure_logger.report_attached_data(body, source)
+        attachments.append(
+            Attachment(
+                name=attachment_name, source=source, type=attachment_type.mime_type
+            )
+        )
+
+    allure_logger.report_result(
+        TestResult(
+            uuid=str(uuid.uuid4()),
+            historyId=name,
+            name=name,
+            fullName=f"performance.{name}",
+            status=Status.FAILED if regressions else Status.PASSED,
+            statusDetails=StatusDetails(message="\n".join(map(str, regressions)))
+            if regressions
+            else None,
+            stage="finished",
+            attachments=attachments,
+            labels=[Label(name="suite", value="Performance")],
+        )
+    )
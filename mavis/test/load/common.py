@@ -0,0 +1,77 @@
+import io
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from mavis.test.constants import Programme
+from mavis.test.data_models import User
+from mavis.test.load.runner import VirtualUser, extract, extract_all
+
+SIGN_IN_FORM = r'/users/sign-in"[\s\S]*?authenticity_token" value="(.*?)"'
+SELECT_TEAM_FORM = r'/users/teams"[\s\S]*?authenticity_token" value="(.*?)"'
+TEAM_ID = r'class="nhsuk-radios__input" type="radio" value="(.*?)"'
+SESSION_IDS = r'sessions/(.{10})"'
+
+OFFLINE_SHEET = "Vaccinations"
+PROGRAMMES_BY_OFFLINE_SHEET_NAME = {
+    programme.offline_sheet_name: programme for programme in Programme
+}
+
+
+async def log_in(user: VirtualUser, nurse: User) -> str:
+    """Log in as nurse, choosing the first team if asked, and open the sessions."""
+    async with user.transaction("1.0 Login"):
+        await user.get("1.1 Homepage", "start")
+        response = await user.get("1.2 Sign-in page", "users/sign-in")
+        await user.think(3, 5)
+
+        response = await user.post(
+            "1.3 Sign-in",
+            "users/sign-in",
+            data={
+                "user[email]": nurse.username,
+                "user[password]": nurse.password,
+                "authenticity_token": extract(
+                    SIGN_IN_FORM, response.text, "the sign in token"
+                ),
+            },
+        )
+        await user.think(3, 5)
+
+        if response.url.path.endswith("/users/teams"):
+            await user.post(
+                "1.3.1 Select team",
+                "users/teams",
+                data={
+                    "select_team_form[team_id]": extract(
+                        TEAM_ID, response.text, "a team"
+                    ),
+                    "authenticity_token": extract(
+                        SELECT_TEAM_FORM, response.text, "the select team token"
+                    ),
+                },
+            )
+
+        response = await user.get("1.4 Open Sessions list", "sessions")
+        await user.think(3, 5)
+    return response.text
+
+
+async def find_scheduled_sessions(user: VirtualUser) -> list[str]:
+    response = await user.get(
+        "Search for all scheduled sessions",
+        "sessions",
+        params={"q": "", "status": "scheduled", "type": "gias_school"},
+    )
+    return list(dict.fromkeys(extract_all(SESSION_IDS, response.text)))
+
+
+def read_offline_spreadsheet(content: bytes) -> list[dict[str, str | datetime]]:
+    """The rows of an offline spreadsheet, keyed by column name."""
+    workbook = load_workbook(io.BytesIO(content), read_only=True)
+    try:
+        rows = workbook[OFFLINE_SHEET].iter_rows(values_only=True)
+        columns = next(rows, ())
+        return [dict(zip(columns, row, strict=False)) for row in rows]
+    finally:
+        workbook.close()
@@ -0,0 +1,432 @@
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+import httpx
+
+from mavis.test.constants import (
+    MMRV_ELIGIBILITY_CUTOFF_DOB,
+    ConsentOption,
+    Programme,
+    Relationship,
+)
+from mavis.test.data_models import Child, Parent, User
+from mavis.test.load.common import (
+    PROGRAMMES_BY_OFFLINE_SHEET_NAME,
+    find_scheduled_sessions,
+    log_in,
+    read_offline_spreadsheet,
+)
+from mavis.test.load.runner import (
+    JourneyError,
+    NoMoreDataError,
+    VirtualUser,
+    extract,
+)
+
+log = logging.getLogger(__name__)
+
+START_FORM = r'/consents"[\s\S]*?authenticity_token" value="(.*?)"'
+SESSION_SLUG = r'id="session_slug_or_team_location_id" value="(.*?)"'
+PROGRAMME_TYPES = r'id="programme_types" value="(.*?)"'
+CONSENT_ID = r"/consents/([^/]+)/edit/"
+CONFIRM_FORM = r'Confirm[\s\S]*?authenticity_token" value="(.*?)"'
+
+# a consent form asking more questions than this has gone wrong
+MAX_HEALTH_QUESTIONS = 20
+
+RELATIONSHIP_TYPES = {
+    Relationship.DAD: "father",
+    Relationship.MUM: "mother",
+    Relationship.GUARDIAN: "guardian",
+    Relationship.CARER: "other",
+    Relationship.OTHER: "other",
+}
+
+DEFAULT_CONSENT_OPTIONS = {
+    Programme.FLU: ConsentOption.NASAL_SPRAY,
+    Programme.HPV: ConsentOption.INJECTION,
+    Programme.MENACWY: ConsentOption.INJECTION,
+    Programme.MMR_MMRV: ConsentOption.INJECTION,
+    Programme.TD_IPV: ConsentOption.INJECTION,
+}
+
+
+def _form_for_step(step: str) -> str:
+    return rf'{re.escape(step)}"[\s\S]*?authenticity_token" value="(.*?)"'
+
+
+def _step(response: httpx.Response) -> str:
+    return response.url.path.rpartition("/")[2]
+
+
+@dataclass(frozen=True)
+class ConsentRequest:
+    """A child in a session whose parent has not yet responded."""
+
+    session_id: str
+    programmes: tuple[Programme, ...]
+    child: Child
+
+    @property
+    def name(self) -> str:
+        """How the journey's samples and logs refer to this programme."""
+        return "doubles" if len(self.programmes) > 1 else str(self.programmes[0])
+
+    @property
+    def consent_url_programmes(self) -> str:
+        return "-".join(programme.programme_type for programme in self.programmes)
+
+    @property
+    def response_step(self) -> str:
+        programme = self.programmes[0]
+        if programme.group == "doubles":
+            return "response-doubles"
+        return f"response-{programme.programme_type}"
+
+
+def _child_from_row(row: dict[str, str | datetime]) -> Child:
+    date_of_birth = row["PERSON_DOB"]
+    if isinstance(date_of_birth, datetime):
+        date_of_birth = date_of_birth.date()
+    else:
+        date_of_birth = date.fromisoformat(str(date_of_birth)[:10])
+    return Child(
+        first_name=str(row["PERSON_FORENAME"]),
+        last_name=str(row["PERSON_SURNAME"]),
+        nhs_number=str(row.get("NHS_NUMBER") or ""),
+        address=(
+            str(row.get("PERSON_ADDRESS_LINE_1") or ""),
+            "",
+            "",
+            str(row.get("PERSON_POSTCODE") or ""),
+        ),
+        date_of_birth=date_of_birth,
+        year_group=int(row.get("YEAR_GROUP") or 0),
+        parents=(Parent.get(Relationship.DAD), Parent.get(Relationship.MUM)),
+    )
+
+
+def read_consent_requests(session_id: str, content: bytes) -> list[ConsentRequest]:
+    """
+    Children in an offline spreadsheet without a consent response, one request
+    per consent form: MenACWY and Td/IPV share a form, so a child due both is
+    asked about both at once.
+    """
+    programmes_by_child: dict[tuple[str, str], list[Programme]] = {}
+    children: dict[tuple[str, str], Child] = {}
+
+    for row in read_offline_spreadsheet(content):
+        programme = PROGRAMMES_BY_OFFLINE_SHEET_NAME.get(str(row["PROGRAMME"]))
+        if programme is None or row["CONSENT_DETAILS"] or row["VACCINATED"]:
+            continue
+        child = _child_from_row(row)
+        key = (programme.group, child.nhs_number or f"{child!s} {child.date_of_birth}")
+        children.setdefault(key, child)
+        programmes_by_child.setdefault(key, []).append(programme)
+
+    return [
+        ConsentRequest(
+            session_id=session_id,
+            programmes=tuple(sorted(set(programmes), key=list(Programme).index)),
+            child=children[key],
+        )
+        for key, programmes in programmes_by_child.items()
+    ]
+
+
+@dataclass
+class ConsentJourney:
+    """
+    The parent online consent journey from consent-journey.jmx, over HTTP.
+
+    Setup logs in as a nurse, finds the scheduled school sessions and reads
+    each session's offline spreadsheet for children without a consent
+    response. Each iteration a virtual user takes the next child and submits
+    a complete consent form as a parent would, giving consent with the
+    ConsentOption for the programme and answering no to each health question.
+    Virtual users stop when there are no children left.
+
+    The number of health questions asked is checked against
+    Programme.health_questions, so a change to the consent form shows up as
+    errors rather than as faster responses.
+    """
+
+    nurse: User
+    programmes: list[Programme] = field(default_factory=lambda: list(Programme))
+    consent_options: dict[Programme, ConsentOption] = field(
+        default_factory=lambda: dict(DEFAULT_CONSENT_OPTIONS)
+    )
+    requests: deque[ConsentRequest] = field(default_factory=deque, init=False)
+
+    async def setup(self, user: VirtualUser) -> None:
+        await log_in(user, self.nurse)
+        session_ids = await find_scheduled_sessions(user)
+
+        for session_id in session_ids:
+            response = await user.get("Get offline file", f"sessions/{session_id}.xlsx")
+            self.requests.extend(
+                request
+                for request in read_consent_requests(session_id, response.content)
+                if set(request.programmes) <= set(self.programmes)
+            )
+
+        log.info(
+            "Found %d consent requests in %d sessions",
+            len(self.requests),
+            len(session_ids),
+        )
+        if not self.requests:
+            msg = "No children without a consent response in any scheduled session"
+            raise NoMoreDataError(msg)
+
+    async def run_iteration(self, user: VirtualUser) -> None:
+        try:
+            request = self.requests.popleft()
+        except IndexError:
+            msg = "No more children without a consent response"
+            raise NoMoreDataError(msg) from None
+
+        # each parent starts without cookies
+        user.client.cookies.clear()
+        parent = request.child.parents[0]
+        prefix = request.name.upper()
+
+        async with user.transaction(f"{prefix} Homepage"):
+            response = await user.get(
+                "consents/start",
+                f"consents/{request.session_id}/{request.consent_url_programmes}/start",
+            )
+            await user.think(3, 5)
+
+        async with user.transaction(f"{prefix} ChildsData"):
+            response = await user.post(
+                "consents",
+                "consents",
+                data={
+                    "programme_types": extract(
+                        PROGRAMME_TYPES, response.text, "the programmes"
+                    ),
+                    "session_slug_or_team_location_id": extract(
+                        SESSION_SLUG, response.text, "the session"
+                    ),
+                    "authenticity_token": extract(
+                        START_FORM, response.text, "the start token"
+                    ),
+                },
+            )
+            consent_id = extract(CONSENT_ID, str(response.url), "the consent form")
+
+            child = request.child
+            response = await self._put(
+                user,
+                consent_id,
+                response,
+                "name",
+                {
+                    "consent_form[given_name]": child.first_name,
+                    "consent_form[family_name]": child.last_name,
+                    "consent_form[use_preferred_name]": "false",
+                },
+            )
+            response = await self._put(
+                user,
+                consent_id,
+                response,
+                "date-of-birth",
+                {
+                    "consent_form[date_of_birth(3i)]": str(child.date_of_birth.day),
+                    "consent_form[date_of_birth(2i)]": str(child.date_of_birth.month),
+                    "consent_form[date_of_birth(1i)]": str(child.date_of_birth.year),
+                },
+            )
+            response = await self._put(
+                user,
+                consent_id,
+                response,
+                "confirm-school",
+                {"consent_form[school_confirmed]": "true"},
+            )
+            response = await self._put(
+                user,
+                consent_id,
+                response,
+                "parent",
+                self._parent_details(parent),
+            )
+            response = await self._give_consent(user, consent_id, response, request)
+
+        async with user.transaction(f"{prefix} HomeAddress"):
+            response = await self._put(
+                user,
+                consent_id,
+                response,
+                "address",
+                {
+                    "consent_form[address_line_1]": child.address[0] or "1 Any Street",
+                    "consent_form[address_line_2]": child.address[1],
+                    "consent_form[address_town]": child.address[2] or "MyTown",
+                    "consent_form[address_postcode]": child.address[3],
+                },
+            )
+
+        async with user.transaction(f"{prefix} MedicalQuestions"):
+            response = await self._answer_health_questions(
+                user, consent_id, response, request
+            )
+
+        async with user.transaction(f"{prefix} Submit"):
+            await user.post(
+                "consents/record",
+                f"consents/{consent_id}/record",
+                data={
+                    "_method": "put",
+                    "authenticity_token": extract(
+                        CONFIRM_FORM, response.text, "the confirm token"
+                    ),
+                },
+            )
+
+    async def _put(  # noqa: PLR0913
+        self,
+        user: VirtualUser,
+        consent_id: str,
+        page: httpx.Response,
+        step: str,
+        fields: dict[str, str],
+        *,
+        think_seconds: tuple[float, float] = (4, 8),
+    ) -> httpx.Response:
+        response = await user.post(
+            f"consents/edit/{step}",
+            f"consents/{consent_id}/edit/{step}",
+            data={
+                "_method": "put",
+                "authenticity_token": extract(
+                    _form_for_step(step), page.text, f"the {step} token"
+                ),
+                **fields,
+            },
+        )
+        await user.think(*think_seconds)
+        return response
+
+    def _parent_details(self, parent: Parent) -> dict[str, str]:
+        relationship_type = RELATIONSHIP_TYPES[parent.relationship]
+        other = relationship_type == "other"
+        return {
+            "consent_form[parent_full_name]": parent.full_name,
+            "consent_form[parent_relationship_type]": relationship_type,
+            "consent_form[parent_relationship_other_name]": (
+                str(parent.relationship) if other else ""
+            ),
+            "consent_form[parental_responsibility]": "yes" if other else "",
+            "consent_form[parent_email]": parent.email_address,
+            "consent_form[parent_phone]": "",
+            "consent_form[parent_phone_receive_updates]": "0",
+        }
+
+    async def _give_consent(
+        self,
+        user: VirtualUser,
+        consent_id: str,
+        page: httpx.Response,
+        request: ConsentRequest,
+    ) -> httpx.Response:
+        programme = request.programmes[0]
+        consent_option = self.consent_options[programme]
+
+        if programme is Programme.FLU:
+            response = "given_injection"
+            if consent_option is not ConsentOption.INJECTION:
+                response = "given_nasal"
+        else:
+            response = "given"
+
+        page = await self._put(
+            user,
+            consent_id,
+            page,
+            request.response_step,
+            {"consent_form[response]": response},
+        )
+
+        if _step(page) == "injection-alternative":
+            page = await self._put(
+                user,
+                consent_id,
+                page,
+                "injection-alternative",
+                {
+                    "consent_form[injection_alternative]": str(
+                        consent_option is ConsentOption.NASAL_SPRAY_OR_INJECTION
+                    ).lower()
+                },
+            )
+        if _step(page) == "without-gelatine":
+            page = await self._put(
+                user,
+                consent_id,
+                page,
+                "without-gelatine",
+                {
+                    "consent_form[without_gelatine]": str(
+                        consent_option is ConsentOption.MMR_WITHOUT_GELATINE
+                    ).lower()
+                },
+            )
+        return page
+
+    def _expected_health_questions(self, request: ConsentRequest) -> int:
+        mmrv_eligibility = request.child.date_of_birth >= MMRV_ELIGIBILITY_CUTOFF_DOB
+        return len(
+            {
+                question
+                for programme in request.programmes
+                for question in programme.health_questions(
+                    self.consent_options[programme],
+                    mmrv_eligibility=mmrv_eligibility,
+                )
+            }
+        )
+
+    async def _answer_health_questions(
+        self,
+        user: VirtualUser,
+        consent_id: str,
+        page: httpx.Response,
+        request: ConsentRequest,
+    ) -> httpx.Response:
+        # answering no to asthma skips its two follow-up questions
+        skips_asthma_follow_ups = (
+            request.programmes[0] is Programme.FLU
+            and self.consent_options[Programme.FLU] is not ConsentOption.INJECTION
+        )
+        question_number = 0
+        answered = 0
+        while _step(page) == "health-question" and answered < MAX_HEALTH_QUESTIONS:
+            page = await self._put(
+                user,
+                consent_id,
+                page,
+                "health-question",
+                {
+                    "question_number": str(question_number),
+                    "health_answer[response]": "no",
+                    "health_answer[notes]": "",
+                },
+                think_seconds=(2, 4),
+            )
+            answered += 1
+            question_number += 3 if skips_asthma_follow_ups and answered == 1 else 1
+
+        expected = self._expected_health_questions(request)
+        if answered != expected:
+            msg = (
+                f"{request.name} consent form asked {answered} health questions,"
+                f" expected {expected}"
+            )
+            raise JourneyError(msg)
+        return page
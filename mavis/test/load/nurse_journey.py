@@ -0,0 +1,269 @@
+import html
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+
+from mavis.test.constants import Programme
+from mavis.test.data_models import User
+from mavis.test.load.common import (
+    PROGRAMMES_BY_OFFLINE_SHEET_NAME,
+    find_scheduled_sessions,
+    log_in,
+    read_offline_spreadsheet,
+)
+from mavis.test.load.runner import (
+    JourneyError,
+    NoMoreDataError,
+    VirtualUser,
+    extract,
+    extract_all,
+)
+from mavis.test.utils import generate_random_string
+
+log = logging.getLogger(__name__)
+
+LOG_OUT_FORM = (
+    r'Log out</button><input type="hidden" name="authenticity_token" value="(.*?)"'
+)
+ATTENDING_FORM = (
+    r'type="submit">Attending</button>'
+    r'<input type="hidden" name="authenticity_token" value="(.*?)"'
+)
+PATIENT_LINKS = r'href="/sessions/.*?/patients/(.*?)/(.*?)\?return_to=patients">(.*?)<'
+REGISTRATION_STATUSES = (
+    r'Registration status</dt><dd class="nhsuk-summary-list__value">'
+    r'<strong class="nhsuk-tag .*?">(.*?)</strong'
+)
+PROGRAMME_ID = (
+    r'<input value="(.*?)" autocomplete="off" type="hidden" '
+    r'name="vaccinate_form\[programme_id\]"'
+)
+VACCINATE_FORM = r'vaccinations.*?authenticity_token" value="(.*?)"'
+BATCH_FORM = (
+    r'<form action="/draft-vaccination-record/batch" .*? '
+    r'name="authenticity_token" value="(.*?)"'
+)
+BATCH_ID = r'<input id="draft-vaccination-record-batch-id-(\d+)-field"'
+CONFIRM_FORM = (
+    r'/draft-vaccination-record/confirm"[\s\S]*?authenticity_token" value="(.*?)"'
+)
+
+ATTENDING = "Attending session"
+NOTES_LENGTH = 64
+
+
+@dataclass(frozen=True)
+class SessionPatient:
+    session_id: str
+    programme: Programme
+    first_name: str
+    last_name: str
+
+    @property
+    def register_name(self) -> str:
+        return f"{self.last_name}, {self.first_name}".upper()
+
+
+def read_patients_due_vaccination(
+    session_id: str, content: bytes
+) -> list[SessionPatient]:
+    """
+    Patients in an offline spreadsheet who have consent but no vaccination yet.
+    """
+    return [
+        SessionPatient(
+            session_id=session_id,
+            programme=PROGRAMMES_BY_OFFLINE_SHEET_NAME[row["PROGRAMME"]],
+            first_name=str(row["PERSON_FORENAME"]),
+            last_name=str(row["PERSON_SURNAME"]),
+        )
+        for row in read_offline_spreadsheet(content)
+        if row["CONSENT_DETAILS"]
+        and not row["VACCINATED"]
+        and row["PROGRAMME"] in PROGRAMMES_BY_OFFLINE_SHEET_NAME
+    ]
+
+
+@dataclass
+class NurseJourney:
+    """
+    The nurse journey from nurse-journey.jmx, over HTTP rather than in JMeter.
+
+    Setup logs in once, finds the scheduled school sessions and downloads
+    each session's offline spreadsheet to find the patients who have consent
+    but have not been vaccinated. Each virtual user then sticks with one
+    programme and, every iteration, takes the next such patient, registers
+    their attendance and records a vaccination. Virtual users log out and in
+    again every iterations_per_log_in iterations, and stop when there are no
+    patients left for their programme.
+    """
+
+    nurse: User
+    programmes: list[Programme] = field(default_factory=lambda: list(Programme))
+    iterations_per_log_in: int = 20
+    patients: dict[Programme, deque[SessionPatient]] = field(
+        default_factory=dict, init=False
+    )
+
+    async def setup(self, user: VirtualUser) -> None:
+        await log_in(user, self.nurse)
+        session_ids = await find_scheduled_sessions(user)
+
+        self.patients = {programme: deque() for programme in self.programmes}
+        for session_id in session_ids:
+            response = await user.get("Get offline file", f"sessions/{session_id}.xlsx")
+            for patient in read_patients_due_vaccination(session_id, response.content):
+                if patient.programme in self.patients:
+                    self.patients[patient.programme].append(patient)
+
+        self.programmes = [
+            programme for programme in self.programmes if self.patients[programme]
+        ]
+        log.info(
+            "Found patients due vaccination in %d sessions: %s",
+            len(session_ids),
+            ", ".join(
+                f"{programme} {len(patients)}"
+                for programme, patients in self.patients.items()
+            ),
+        )
+        if not self.programmes:
+            msg = "No patients due vaccination in any scheduled session"
+            raise NoMoreDataError(msg)
+
+    async def run_iteration(self, user: VirtualUser) -> None:
+        if "log_out_token" not in user.state:
+            page = await log_in(user, self.nurse)
+            user.state["log_out_token"] = extract(LOG_OUT_FORM, page, "log out")
+
+        programme = self.programmes[user.index % len(self.programmes)]
+        try:
+            patient = self.patients[programme].popleft()
+        except IndexError:
+            msg = f"No more patients due {programme} vaccination"
+            raise NoMoreDataError(msg) from None
+
+        patient_id = await self._register_attendance(user, patient)
+        await self._vaccinate(user, patient, patient_id)
+
+        if (user.iteration + 1) % self.iterations_per_log_in == 0:
+            await user.post(
+                "6.1 Logout",
+                "logout",
+                data={
+                    "_method": "delete",
+                    "authenticity_token": user.state.pop("log_out_token"),
+                },
+            )
+
+    async def _register_attendance(
+        self, user: VirtualUser, patient: SessionPatient
+    ) -> str:
+        session_url = f"sessions/{patient.session_id}"
+        async with user.transaction("2.0 Register attendance"):
+            await user.get("2.1 Open session", session_url)
+            await user.think(3, 5)
+            await user.get("2.2 Session register", f"{session_url}/patients")
+            await user.think(3, 5)
+            response = await user.get(
+                "2.3 Search by first/last name",
+                f"{session_url}/patients",
+                params={"q": f"{patient.first_name} {patient.last_name}"},
+            )
+            await user.think(3, 5)
+
+            links = extract_all(PATIENT_LINKS, response.text)
+            statuses = extract_all(REGISTRATION_STATUSES, response.text)
+            register = zip(links, statuses, strict=False)
+            patient_id, status = next(
+                (
+                    (patient_id, status)
+                    for (patient_id, _, name), status in register
+                    if html.unescape(name).upper() == patient.register_name
+                ),
+                (None, None),
+            )
+            if patient_id is None:
+                msg = f"Could not find {patient.register_name} in the register"
+                raise JourneyError(msg)
+
+            if status != ATTENDING:
+                await user.post(
+                    "2.4 Patient attending session",
+                    f"{session_url}/patients/{patient_id}/register/present",
+                    data={
+                        "authenticity_token": extract(
+                            ATTENDING_FORM, response.text, "the attending token"
+                        )
+                    },
+                )
+                await user.think(10, 15)
+        return patient_id
+
+    async def _vaccinate(
+        self, user: VirtualUser, patient: SessionPatient, patient_id: str
+    ) -> None:
+        programme_type = patient.programme.programme_type
+        patient_url = f"sessions/{patient.session_id}/patients/{patient_id}"
+        response = await user.get(
+            "2.5 Select patient",
+            f"{patient_url}/{programme_type}",
+            params={"return_to": "consent"},
+        )
+        await user.think(7, 13)
+
+        nasal = patient.programme is Programme.FLU
+        async with user.transaction(f"4.0 Vaccination for {programme_type}"):
+            response = await user.post(
+                "4.1 Vaccination questions",
+                f"{patient_url}/{programme_type}/vaccinations",
+                data={
+                    "authenticity_token": extract(
+                        VACCINATE_FORM, response.text, "the vaccinate token"
+                    ),
+                    "vaccinate_form[identity_check_confirmed_by_patient]": "true",
+                    "vaccinate_form[pre_screening_confirmed]": "1",
+                    "vaccinate_form[pre_screening_notes]": generate_random_string(
+                        NOTES_LENGTH
+                    ),
+                    "vaccinate_form[vaccine_method]": "nasal" if nasal else "injection",
+                    "vaccinate_form[delivery_site]": (
+                        "nose" if nasal else "right_arm_upper_position"
+                    ),
+                    "vaccinate_form[dose_sequence]": "1",
+                    "vaccinate_form[programme_id]": extract(
+                        PROGRAMME_ID, response.text, "the programme"
+                    ),
+                },
+            )
+            await user.think(35, 48)
+
+            response = await user.post(
+                "4.2 Vaccination batch",
+                "draft-vaccination-record/batch",
+                data={
+                    "_method": "put",
+                    "draft_vaccination_record[batch_id]": extract(
+                        BATCH_ID, response.text, "a batch"
+                    ),
+                    "authenticity_token": extract(
+                        BATCH_FORM, response.text, "the batch token"
+                    ),
+                },
+            )
+            await user.think(5, 8)
+
+            await user.post(
+                "4.3 Vaccination confirm",
+                "draft-vaccination-record/confirm",
+                data={
+                    "_method": "put",
+                    "draft_vaccination_record[notes]": generate_random_string(
+                        NOTES_LENGTH
+                    ),
+                    "authenticity_token": extract(
+                        CONFIRM_FORM, response.text, "the confirm token"
+                    ),
+                },
+            )
+            await user.think(35, 48)
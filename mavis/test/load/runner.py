@@ -0,0 +1,441 @@
+import asyncio
+import bisect
+import contextlib
+import csv
+import logging
+import random
+import re
+import statistics
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Protocol, TextIO
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = 60
+DEFAULT_MAX_CONNECTIONS = 1000
+
+# upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# the columns JMeter writes to samples.jtl by default, so the same reports and
+# tooling work on the output of either driver
+JTL_COLUMNS = [
+    "timeStamp",
+    "elapsed",
+    "label",
+    "responseCode",
+    "responseMessage",
+    "threadName",
+    "dataType",
+    "success",
+    "failureMessage",
+    "bytes",
+    "sentBytes",
+    "grpThreads",
+    "allThreads",
+    "URL",
+    "Latency",
+    "IdleTime",
+    "Connect",
+]
+
+
+class JourneyError(Exception):
+    """A step of a journey failed, so the rest of the iteration is skipped."""
+
+
+class NoMoreDataError(JourneyError):
+    """The journey has run out of test data, so the virtual user stops."""
+
+
+@dataclass
+class LoadProfile:
+    """
+    How many virtual users to run and for how long.
+
+    These match the THREADS, RAMP_UP and DURATION knobs of the JMeter plans:
+    users start evenly spread over ramp_up_seconds, and each keeps running
+    iterations until duration_seconds have passed since the test started or
+    it has run loops iterations (-1 for no limit). think_time_scale multiplies
+    every think time, so 0 runs the journey flat out.
+    """
+
+    users: int
+    ramp_up_seconds: float
+    duration_seconds: float
+    loops: int = -1
+    think_time_scale: float = 1.0
+
+
+@dataclass
+class Sample:
+    timestamp: float
+    elapsed: float
+    label: str
+    response_code: str
+    response_message: str
+    thread_name: str
+    success: bool
+    failure_message: str = ""
+    bytes_received: int = 0
+    bytes_sent: int = 0
+    url: str = ""
+
+    def to_jtl_row(self, active_users: int) -> list[str | int]:
+        return [
+            int(self.timestamp * 1000),
+            int(self.elapsed * 1000),
+            self.label,
+            self.response_code,
+            self.response_message,
+            self.thread_name,
+            "text",
+            str(self.success).lower(),
+            self.failure_message,
+            self.bytes_received,
+            self.bytes_sent,
+            active_users,
+            active_users,
+            self.url,
+            int(self.elapsed * 1000),
+            0,
+            0,
+        ]
+
+
+@dataclass
+class SampleRecorder:
+    """
+    Collects samples, writing them to a JTL file as they arrive if one is given.
+
+    Only the elapsed times are kept in memory, to report percentiles per label
+    at the end of the run.
+    """
+
+    jtl_file: TextIO | None = None
+    active_users: int = 0
+    elapsed_by_label: defaultdict[str, list[float]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    errors_by_label: defaultdict[str, int] = field(
+        default_factory=lambda: defaultdict(int)
+    )
+
+    def __post_init__(self) -> None:
+        self._writer = csv.writer(self.jtl_file) if self.jtl_file else None
+        if self._writer:
+            self._writer.writerow(JTL_COLUMNS)
+
+    def record(self, sample: Sample) -> None:
+        self.elapsed_by_label[sample.label].append(sample.elapsed)
+        if not sample.success:
+            self.errors_by_label[sample.label] += 1
+        if self._writer:
+            self._writer.writerow(sample.to_jtl_row(self.active_users))
+
+    def log_summary(self, elapsed: float) -> None:
+        log.info(
+            "%-40s %7s %7s %8s %8s %8s %8s",
+            "label",
+            "count",
+            "errors",
+            "per sec",
+            "p50 ms",
+            "p95 ms",
+            "p99 ms",
+        )
+        for label, timings in sorted(self.elapsed_by_label.items()):
+            percentiles = (
+                statistics.quantiles(timings, n=100) if len(timings) > 1 else timings
+            )
+            log.info(
+                "%-40s %7d %7d %8.1f %8.0f %8.0f %8.0f",
+                label,
+                len(timings),
+                self.errors_by_label[label],
+                len(timings) / elapsed,
+                percentiles[min(49, len(percentiles) - 1)] * 1000,
+                percentiles[min(94, len(percentiles) - 1)] * 1000,
+                percentiles[min(98, len(percentiles) - 1)] * 1000,
+            )
+
+    def histogram(self, label: str) -> list[int]:
+        """Counts of label's samples in each of HISTOGRAM_BUCKETS_MS, then over."""
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for elapsed in self.elapsed_by_label[label]:
+            counts[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, elapsed * 1000)] += 1
+        return counts
+
+    def log_histograms(self) -> None:
+        buckets = [f"<{bound}" for bound in HISTOGRAM_BUCKETS_MS]
+        log.info(
+            "%-40s %s",
+            "label (ms)",
+            " ".join(f"{bucket:>7}" for bucket in [*buckets, "more"]),
+        )
+        for label in sorted(self.elapsed_by_label):
+            log.info(
+                "%-40s %s",
+                label,
+                " ".join(f"{count:>7}" for count in self.histogram(label)),
+            )
+
+
+class VirtualUser:
+    """
+    One simulated user, with its own cookies, driving Mavis over plain HTTP.
+
+    All virtual users share the runner's connection pool, so hundreds of them
+    can run in one event loop without a browser each.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        client: httpx.AsyncClient,
+        recorder: SampleRecorder,
+        profile: LoadProfile,
+    ) -> None:
+        self.index = index
+        self.name = f"virtual user {index + 1}"
+        self.client = client
+        self.recorder = recorder
+        self.profile = profile
+        self.iteration = 0
+        self.think_time = 0.0
+        self.state: dict[str, str] = {}
+
+    async def request(
+        self,
+        label: str,
+        method: str,
+        url: str,
+        *,
+        expected_status: int = httpx.codes.OK,
+        **kwargs,  # noqa: ANN003
+    ) -> httpx.Response:
+        start = time.time()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.recorder.record(
+                Sample(
+                    timestamp=start,
+                    elapsed=time.time() - start,
+                    label=label,
+                    response_code=type(exc).__name__,
+                    response_message=str(exc),
+                    thread_name=self.name,
+                    success=False,
+                    failure_message=str(exc),
+                    url=url,
+                )
+            )
+            msg = f"{label} failed: {exc}"
+            raise JourneyError(msg) from exc
+
+        success = response.status_code == expected_status
+        failure_message = (
+            "" if success else f"Expected {expected_status}, got {response.status_code}"
+        )
+        self.recorder.record(
+            Sample(
+                timestamp=start,
+                elapsed=time.time() - start,
+                label=label,
+                response_code=str(response.status_code),
+                response_message=response.reason_phrase,
+                thread_name=self.name,
+                success=success,
+                failure_message=failure_message,
+                bytes_received=len(response.content),
+                bytes_sent=len(response.request.content),
+                url=str(response.url),
+            )
+        )
+        if not success:
+            msg = f"{label}: {failure_message}"
+            raise JourneyError(msg)
+        return response
+
+    async def get(self, label: str, url: str, **kwargs) -> httpx.Response:  # noqa: ANN003
+        return await self.request(label, "GET", url, **kwargs)
+
+    async def post(self, label: str, url: str, **kwargs) -> httpx.Response:  # noqa: ANN003
+        return await self.request(label, "POST", url, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, label: str) -> AsyncIterator[None]:
+        """
+        Record the whole block as one sample, as a JMeter transaction does.
+
+        Think time inside the block is left out of the elapsed time.
+        """
+        start = time.time()
+        think_time_at_start = self.think_time
+
+        def record(*, success: bool) -> None:
+            self.recorder.record(
+                Sample(
+                    timestamp=start,
+                    elapsed=time.time()
+                    - start
+                    - (self.think_time - think_time_at_start),
+                    label=label,
+                    response_code="200" if success else "500",
+                    response_message="",
+                    thread_name=self.name,
+                    success=success,
+                )
+            )
+
+        try:
+            yield
+        except JourneyError:
+            record(success=False)
+            raise
+        record(success=True)
+
+    async def think(self, min_seconds: float, max_seconds: float) -> None:
+        delay = random.uniform(min_seconds, max_seconds) * self.profile.think_time_scale
+        if delay > 0:
+            self.think_time += delay
+            await asyncio.sleep(delay)
+
+
+def extract(pattern: str | re.Pattern[str], text: str, description: str) -> str:
+    """The first group of the first match of pattern in text."""
+    match = re.search(pattern, text)
+    if not match:
+        msg = f"Could not find {description} in the response"
+        raise JourneyError(msg)
+    return match.group(1)
+
+
+def extract_all(pattern: str | re.Pattern[str], text: str) -> list[str]:
+    return re.findall(pattern, text)
+
+
+class Journey(Protocol):
+    async def setup(self, user: VirtualUser) -> None:
+        """Prepare shared test data once, before any virtual user starts."""
+
+    async def run_iteration(self, user: VirtualUser) -> None:
+        """Run one pass of the journey as user."""
+
+
+class LoadRunner:
+    """Runs a journey with the virtual users described by a LoadProfile."""
+
+    def __init__(
+        self,
+        base_url: str,
+        profile: LoadProfile,
+        *,
+        headers: dict[str, str] | None = None,
+        auth: httpx.Auth | None = None,
+        jtl_path: Path | None = None,
+    ) -> None:
+        self.base_url = base_url
+        self.profile = profile
+        self.headers = headers or {}
+        self.auth = auth
+        self.jtl_path = jtl_path
+
+    def _create_client(self, transport: httpx.AsyncHTTPTransport) -> httpx.AsyncClient:
+        # each client has its own cookie jar; the transport (and so the
+        # connection pool) is shared and closed by the runner
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            transport=transport,
+            headers=self.headers,
+            auth=self.auth,
+            timeout=DEFAULT_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        )
+
+    async def _run_user(
+        self, journey: Journey, user: VirtualUser, start_delay: float
+    ) -> None:
+        await asyncio.sleep(start_delay)
+        user.recorder.active_users += 1
+        try:
+            while user.iteration != self.profile.loops:
+                try:
+                    await journey.run_iteration(user)
+                except NoMoreDataError as exc:
+                    log.info("%s stopping: %s", user.name, exc)
+                    return
+                except JourneyError as exc:
+                    log.warning("%s: %s", user.name, exc)
+                user.iteration += 1
+        finally:
+            user.recorder.active_users -= 1
+
+    async def run(self, journey: Journey) -> SampleRecorder:
+        with contextlib.ExitStack() as stack:
+            jtl_file = None
+            if self.jtl_path:
+                self.jtl_path.parent.mkdir(parents=True, exist_ok=True)
+                jtl_file = stack.enter_context(
+                    self.jtl_path.open("w", newline="", encoding="utf-8")
+                )
+            recorder = SampleRecorder(jtl_file)
+
+            limits = httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_CONNECTIONS,
+            )
+            async with httpx.AsyncHTTPTransport(limits=limits) as transport:
+                setup_user = VirtualUser(
+                    -1, self._create_client(transport), recorder, self.profile
+                )
+                setup_user.name = "setup"
+                await journey.setup(setup_user)
+
+                users = [
+                    VirtualUser(
+                        index, self._create_client(transport), recorder, self.profile
+                    )
+                    for index in range(self.profile.users)
+                ]
+                ramp_up_interval = self.profile.ramp_up_seconds / max(len(users), 1)
+                log.info(
+                    "Starting %d virtual users over %ss for %ss",
+                    len(users),
+                    self.profile.ramp_up_seconds,
+                    self.profile.duration_seconds,
+                )
+                start = time.monotonic()
+                tasks = [
+                    asyncio.create_task(
+                        self._run_user(journey, user, user.index * ramp_up_interval)
+                    )
+                    for user in users
+                ]
+                # like JMeter, stop users part way through an iteration once
+                # the duration is up
+                finished, running = (
+                    await asyncio.wait(tasks, timeout=self.profile.duration_seconds)
+                    if tasks
+                    else (set(), set())
+                )
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                recorder.log_summary(time.monotonic() - start)
+
+        # a user that stopped on anything but a JourneyError has a bug in its
+        # journey, so the run must not pass for a clean one
+        crashed = [task for task in finished if task.exception()]
+        for task in crashed:
+            log.error("A virtual user crashed", exc_info=task.exception())
+        if crashed:
+            crashed[0].result()
+        return recorder
@@ -1,24 +1,63 @@
 """Minimal mock SOAP service implementing the SCHImmsService / InsertImmsRecord
 endpoint described in the CarePlus WSDL.
+
+Given a RecordStore, the rows of accepted payloads are kept, and can be
+queried as JSON at GET /records and forgotten with DELETE /records. Metrics
+of the requests handled are served for Prometheus at GET /metrics.
 """
 
 import csv
+import hashlib
+import json
 import logging
-from http.server import BaseHTTPRequestHandler
-from io import StringIO
-from typing import TypedDict
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, nullcontext
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import BinaryIO, TypedDict
+from urllib.parse import parse_qs, urlsplit
 
 from defusedxml import ElementTree
 
+from mavis.test.mocks.careplus.faults import (
+    FaultInjector,
+    FaultProfile,
+    Outcome,
+    RequestTiming,
+)
+from mavis.test.mocks.careplus.metrics import CONTENT_TYPE, Metrics, RequestOutcome
+from mavis.test.mocks.careplus.store import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Query,
+    RecordStore,
+)
+
 log = logging.getLogger(__name__)
 
 CAREPLUS_BASE_URL = "http://careplus.syhapp.thirdparty.nhs.uk"
+RECORDS_PATH = "/records"
+FAULTS_PATH = "/admin/faults"
+REQUESTS_PATH = "/admin/requests"
+METRICS_PATH = "/metrics"
+DEFAULT_MAX_REQUEST_BYTES = 256 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+
+INSERT_IMMS_RECORD_TAG = f"{{{CAREPLUS_BASE_URL}}}InsertImmsRecord"
+FIELD_TAGS = {
+    f"{{{CAREPLUS_BASE_URL}}}{name}": name
+    for name in ("strUserId", "strPwd", "strPayload")
+}
 
 
 class Config(TypedDict):
     host: str
     port: int
     path: str
+    max_request_bytes: int
 
 
 def build_service_path(site_namespace: str) -> str:
@@ -122,16 +161,42 @@ class InsertImmsRecordError(Exception):
     pass
 
 
-def _validate_csv_payload(payload: str) -> None:
+def _injected_response(
+    outcome: Outcome, profile: FaultProfile
+) -> tuple[int | None, bytes | None]:
+    """
+    The status and SOAP envelope sent for an injected fault, with no envelope
+    for a 5xx from in front of the service and no status for a timeout.
+    """
+    if outcome == "soap_fault":
+        return 500, _soap_fault("soap:Server", "Injected fault")
+    if outcome == "server_error":
+        return profile.server_error_status, None
+    return None, None
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """The lines of text, with their endings, without copying the whole of it."""
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start) + 1 or len(text)
+        yield text[start:end]
+        start = end
+
+
+def _iter_csv_rows(payload: str) -> Iterator[tuple[int, list[str]]]:
+    """The rows of a CSV payload with their row numbers, parsed as they're read."""
     try:
-        rows = list(csv.reader(StringIO(payload)))
+        yield from enumerate(csv.reader(_iter_lines(payload)), start=1)
     except csv.Error as exc:
         reason = f"Invalid CSV with error: {exc}"
         raise InsertImmsRecordError(reason) from exc
 
+
+def _validate_csv_payload(payload: str) -> None:
     expected_entries = None
     non_empty_row_count = 0
-    for row_number, row in enumerate(rows, start=1):
+    for row_number, row in _iter_csv_rows(payload):
         if not any(cell.strip() for cell in row):
             continue
 
@@ -153,6 +218,141 @@ def _validate_csv_payload(payload: str) -> None:
         raise InsertImmsRecordError(reason)
 
 
+def _count_csv_records(payload: str) -> int:
+    """The number of non-empty rows of a CSV payload after its header row."""
+    try:
+        rows = sum(
+            any(cell.strip() for cell in row) for _, row in _iter_csv_rows(payload)
+        )
+    except InsertImmsRecordError:
+        # a custom handle_insert_imms_record can accept any payload
+        return 0
+    return max(rows - 1, 0)
+
+
+def _csv_records(payload: str) -> Iterator[dict[str, str]]:
+    """The non-empty rows of a valid CSV payload, keyed by its header row."""
+    header = None
+    for _, row in _iter_csv_rows(payload):
+        if not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            header = row
+        else:
+            yield dict(zip(header, row, strict=True))
+
+
+class _RecordsQueryError(Exception):
+    pass
+
+
+def _parse_time(value: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        msg = f"Invalid ISO 8601 time {value!r}"
+        raise _RecordsQueryError(msg) from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC)
+
+
+def _parse_int(value: str, name: str, minimum: int, maximum: int | None) -> int:
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = minimum - 1
+    if parsed < minimum or (maximum is not None and parsed > maximum):
+        bounds = (
+            f"from {minimum} to {maximum}"
+            if maximum is not None
+            else f"of at least {minimum}"
+        )
+        msg = f"{name} must be a whole number {bounds}"
+        raise _RecordsQueryError(msg)
+    return parsed
+
+
+def _parse_records_query(query_string: str) -> Query:
+    """
+    A Query from the parameters nhs_number, venue_code, since and until (ISO
+    8601 times, taken as UTC without an offset), offset and limit.
+    """
+    parameters = {name: values[0] for name, values in parse_qs(query_string).items()}
+    since = parameters.pop("since", None)
+    until = parameters.pop("until", None)
+    query = Query(
+        nhs_number=parameters.pop("nhs_number", None),
+        venue_code=parameters.pop("venue_code", None),
+        since=_parse_time(since) if since else None,
+        until=_parse_time(until) if until else None,
+        offset=_parse_int(parameters.pop("offset", "0"), "offset", 0, None),
+        limit=_parse_int(
+            parameters.pop("limit", str(DEFAULT_PAGE_SIZE)), "limit", 1, MAX_PAGE_SIZE
+        ),
+    )
+    if parameters:
+        msg = f"Unknown parameters {', '.join(sorted(parameters))}"
+        raise _RecordsQueryError(msg)
+    return query
+
+
+class _RequestBody:
+    """
+    The Content-Length bytes of a request body, read from rfile on demand,
+    and a digest of those read so far.
+    """
+
+    def __init__(self, rfile: BinaryIO, length: int) -> None:
+        self.rfile = rfile
+        self.length = length
+        self.remaining = length
+        self.digest = hashlib.blake2b(digest_size=8)
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.rfile.read(size)
+        self.remaining -= len(data)
+        self.digest.update(data)
+        return data
+
+    def drain(self) -> None:
+        while self.remaining and self.read(READ_CHUNK_BYTES):
+            pass
+
+
+def _read_insert_imms_record(body: _RequestBody) -> dict[str, str] | None:
+    """
+    The fields of the first InsertImmsRecord element in a SOAP envelope, or
+    None if there isn't one. The envelope is parsed as it's read and each
+    element is discarded once ended, so only the field values are kept.
+
+    Raises:
+        ElementTree.ParseError: If the envelope isn't well-formed XML.
+    """
+    fields: dict[str, str] | None = None
+    depth = 0
+    # the depth of the InsertImmsRecord element while it's being read
+    insert_depth = -1
+    for event, element in ElementTree.iterparse(body, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if element.tag == INSERT_IMMS_RECORD_TAG and fields is None:
+                fields = {}
+                insert_depth = depth
+            continue
+
+        if fields is not None and depth == insert_depth + 1:
+            if element.tag in FIELD_TAGS:
+                fields.setdefault(FIELD_TAGS[element.tag], element.text or "")
+        elif depth == insert_depth:
+            insert_depth = -1
+        element.clear()
+        depth -= 1
+    return fields
+
+
 def handle_insert_imms_record(user_id: str, pwd: str, payload: str) -> str:
     """
     Called for every valid InsertImmsRecord request.
@@ -182,12 +382,61 @@ def handle_insert_imms_record(user_id: str, pwd: str, payload: str) -> str:
     return "1"
 
 
+class CarePlusServer(ThreadingHTTPServer):
+    """
+    Serves each connection on its own thread. Given workers, at most that many
+    InsertImmsRecord requests are processed at once, the rest waiting for a
+    free worker; idle kept-alive connections don't take up a worker.
+    """
+
+    # the default backlog of 5 resets connections under load
+    request_queue_size = 1024
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        handler_class: type["SOAPHandler"],
+        *,
+        workers: int | None = None,
+    ) -> None:
+        super().__init__(server_address, handler_class)
+        self.workers: AbstractContextManager = (
+            threading.BoundedSemaphore(workers) if workers else nullcontext()
+        )
+
+
 class SOAPHandler(BaseHTTPRequestHandler):
+    # keep connections alive, as CarePlus does, and send headers and body
+    # without waiting for delayed ACKs
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
     config: Config
+    # where accepted records are kept, if anywhere
+    store: RecordStore | None = None
+    # the latency and faults InsertImmsRecord requests are given, if any
+    faults: FaultInjector | None = None
+    metrics: Metrics
 
     @classmethod
-    def make_handler(cls, config: Config) -> type["SOAPHandler"]:
-        return type(cls.__name__, (cls,), {"config": config})
+    def make_handler(
+        cls,
+        config: Config,
+        store: RecordStore | None = None,
+        faults: FaultInjector | None = None,
+        metrics: Metrics | None = None,
+    ) -> type["SOAPHandler"]:
+        return type(
+            cls.__name__,
+            (cls,),
+            {
+                "config": config,
+                "store": store,
+                "faults": faults,
+                "metrics": metrics or Metrics(),
+            },
+        )
 
     def log_message(self, format: str, *args: object) -> None:  # noqa: A002
         log.info("HTTP %s", format % args)
@@ -197,7 +446,7 @@ class SOAPHandler(BaseHTTPRequestHandler):
         return request_path == self.config["path"]
 
     # ------------------------------------------------------------------
-    # GET — serve the WSDL
+    # GET — serve the WSDL, the accepted records and metrics
     # ------------------------------------------------------------------
     def do_GET(self) -> None:
         request_path, query = _split_request_target(self.path)
@@ -210,9 +459,29 @@ class SOAPHandler(BaseHTTPRequestHandler):
             self.wfile.write(body)
             return
 
-        if request_path != self.config["path"]:
-            self.send_response(404)
+        if request_path == METRICS_PATH and not query:
+            body = self.metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
             self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if request_path == RECORDS_PATH and self.store is not None:
+            self._get_records(self.store)
+            return
+
+        if request_path == FAULTS_PATH and self.faults is not None:
+            self._send_json(200, self.faults.profile.to_dict())
+            return
+
+        if request_path == REQUESTS_PATH and self.faults is not None:
+            self._get_requests(self.faults)
+            return
+
+        if request_path != self.config["path"]:
+            self._send_empty(404)
             return
 
         if query == "wsdl":
@@ -224,50 +493,206 @@ class SOAPHandler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(body)
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._send_empty(404)
+
+    def _get_records(self, store: RecordStore) -> None:
+        try:
+            query = _parse_records_query(urlsplit(self.path).query)
+        except _RecordsQueryError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+
+        total, records = store.query(query)
+        self._send_json(
+            200,
+            {
+                "total": total,
+                "offset": query.offset,
+                "limit": query.limit,
+                "records": [record.to_dict() for record in records],
+            },
+        )
+
+    def _get_requests(self, faults: FaultInjector) -> None:
+        parameters = parse_qs(urlsplit(self.path).query)
+        try:
+            since = (
+                _parse_time(parameters["since"][0]) if "since" in parameters else None
+            )
+        except _RecordsQueryError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+
+        timings = faults.timings(since)
+        self._send_json(
+            200,
+            {
+                "outcomes": Counter(timing.outcome for timing in timings),
+                "requests": [timing.to_dict() for timing in timings],
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # PUT — change the fault profile
+    # ------------------------------------------------------------------
+    def do_PUT(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        request_path, query = _split_request_target(self.path)
+        if request_path != FAULTS_PATH or query or self.faults is None:
+            self._send_empty(404)
+            return
+
+        try:
+            profile = FaultProfile.from_dict(json.loads(body), self.faults.profile)
+        except ValueError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+
+        self.faults.profile = profile
+        log.info("Fault profile is now %s", profile)
+        self._send_json(200, profile.to_dict())
+
+    # ------------------------------------------------------------------
+    # DELETE — forget the accepted records or request timings
+    # ------------------------------------------------------------------
+    def do_DELETE(self) -> None:
+        request_path, query = _split_request_target(self.path)
+        if request_path == RECORDS_PATH and not query and self.store is not None:
+            self.store.clear()
+            self._send_empty(204)
+        elif request_path == REQUESTS_PATH and not query and self.faults is not None:
+            self.faults.clear_timings()
+            self._send_empty(204)
+        else:
+            self._send_empty(404)
 
     # ------------------------------------------------------------------
     # POST — handle SOAP requests
     # ------------------------------------------------------------------
     def do_POST(self) -> None:
+        start = time.perf_counter()
+        length = int(self.headers.get("Content-Length", 0))
+        max_request_bytes = self.config["max_request_bytes"]
+        if length > max_request_bytes:
+            # the body is left unread, so the connection can't be reused
+            self.close_connection = True
+            reason = (
+                f"Request body of {length} bytes is larger than the limit of "
+                f"{max_request_bytes} bytes"
+            )
+            self._send_xml(413, _soap_fault("soap:Client", reason))
+            self.metrics.observe("too_large", length, time.perf_counter() - start)
+            return
+
         if not self._is_configured_path():
-            self.send_response(404)
-            self.end_headers()
+            # read the body, so it isn't taken for the next request on a
+            # kept-alive connection
+            self.rfile.read(length)
+            self._send_empty(404)
             return
 
-        length = int(self.headers.get("Content-Length", 0))
-        body = self.rfile.read(length)
+        body = _RequestBody(self.rfile, length)
+        received_at = datetime.now(tz=UTC)
+        faults = self.faults
+        outcome: Outcome = "ok"
+        delay = 0.0
+        status: int | None
+        response: bytes | None
+        rows: int | None = None
+        # the handler can also be served by a plain HTTPServer
+        with getattr(self.server, "workers", nullcontext()):
+            if faults is not None:
+                outcome, delay = faults.draw()
+                # mocks run without mavis.test installed, so deliberate_sleep
+                # isn't available here
+                time.sleep(delay)  # noqa: TID251
+            if faults is None or outcome == "ok":
+                status, response, rows = self._insert_imms_record(body)
+            else:
+                body.drain()
+                status, response = _injected_response(outcome, faults.profile)
+
+        if body.remaining:
+            # a malformed envelope isn't read to the end
+            self.close_connection = True
+        if status is None:
+            # a timed out request is dropped without a response
+            self.close_connection = True
+        elif response is None:
+            self.send_error(status)
+        else:
+            self._send_xml(status, response)
 
+        elapsed = time.perf_counter() - start
+        metrics_outcome: RequestOutcome
+        if outcome != "ok":
+            metrics_outcome = outcome
+        else:
+            metrics_outcome = "accepted" if rows is not None else "rejected"
+        self.metrics.observe(metrics_outcome, body.length, elapsed, rows)
+        if faults is not None:
+            faults.record(
+                RequestTiming(
+                    received_at=received_at,
+                    outcome=outcome,
+                    status=status,
+                    injected_delay_ms=delay * 1000,
+                    elapsed_ms=elapsed * 1000,
+                    request_bytes=body.length,
+                    body_digest=body.digest.hexdigest(),
+                )
+            )
+
+    def _insert_imms_record(self, body: _RequestBody) -> tuple[int, bytes, int | None]:
+        """
+        The status and envelope to respond with, and the number of records if
+        the request was accepted.
+        """
         try:
-            root = ElementTree.fromstring(body)
+            fields = _read_insert_imms_record(body)
         except ElementTree.ParseError as exc:
-            self._send_xml(400, _soap_fault("soap:Client", f"Malformed XML: {exc}"))
-            return
-
-        insert_el = root.find(f".//{{{CAREPLUS_BASE_URL}}}InsertImmsRecord")
-        if insert_el is None:
-            self._send_xml(
-                400,
-                _soap_fault("soap:Client", "InsertImmsRecord element not found"),
-            )
-            return
+            return 400, _soap_fault("soap:Client", f"Malformed XML: {exc}"), None
 
-        user_id = insert_el.findtext(f"{{{CAREPLUS_BASE_URL}}}strUserId") or ""
-        pwd = insert_el.findtext(f"{{{CAREPLUS_BASE_URL}}}strPwd") or ""
-        payload = insert_el.findtext(f"{{{CAREPLUS_BASE_URL}}}strPayload") or ""
+        if fields is None:
+            reason = "InsertImmsRecord element not found"
+            return 400, _soap_fault("soap:Client", reason), None
 
+        user_id = fields.get("strUserId", "")
+        payload = fields.get("strPayload", "")
         try:
-            result = handle_insert_imms_record(user_id, pwd, payload)
+            result = handle_insert_imms_record(
+                user_id, fields.get("strPwd", ""), payload
+            )
         except InsertImmsRecordError as exc:
             log.warning("InsertImmsRecord rejected for user=%r: %s", user_id, exc)
-            self._send_xml(400, _soap_fault("soap:Client", str(exc)))
-            return
+            return 400, _soap_fault("soap:Client", str(exc)), None
+
+        # the records are counted while they're stored, when there's a store
+        if self.store is not None:
+            rows = self.store.add(user_id, _csv_records(payload))
+            log.debug("Recorded %d records for user=%r", rows, user_id)
+        else:
+            rows = _count_csv_records(payload)
+
+        return 200, _soap_response(result), rows
 
-        self._send_xml(200, _soap_response(result))
+    def _send_empty(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_json(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def _send_xml(self, status: int, body: bytes) -> None:
         self.send_response(status)
+        if self.close_connection:
+            self.send_header("Connection", "close")
         self.send_header("Content-Type", "text/xml; charset=utf-8")
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
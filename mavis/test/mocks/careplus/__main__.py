@@ -3,51 +3,165 @@ Entry point for running the CarePlus mock SOAP service.
 
 Usage:
     python -m mavis.test.mocks.careplus [--host 127.0.0.1] [--port 8080]
-      [--site-namespace MOCK]
+      [--site-namespace MOCK] [--workers N] [--max-request-bytes N]
+      [--record-store none|memory|sqlite] [--record-db careplus-records.sqlite3]
+      [--fault-profile healthy|slow|flaky|outage|hanging] [--latency-ms 0]
+      [--latency-jitter-ms 0] [--latency-distribution uniform|exponential|lognormal]
+      [--soap-fault-percent 0] [--server-error-percent 0]
+      [--server-error-status 503] [--timeout-percent 0] [--timeout-seconds 60]
+      [--seed 1]
 
-WSDL is served at:  GET <path>?wsdl
-Endpoint is at:     POST <path>
-Healthcheck is at:  GET /health
+WSDL is served at:      GET <path>?wsdl
+Endpoint is at:         POST <path>
+Healthcheck is at:      GET /health
+Records are at:         GET /records?nhs_number=&venue_code=&since=&until=
+                          &offset=0&limit=100, cleared with DELETE /records,
+                          with --record-store memory or sqlite
+Fault profile is at:    GET|PUT /admin/faults
+Request timings are at: GET /admin/requests?since=, cleared with
+                          DELETE /admin/requests
+Metrics are at:         GET /metrics, for Prometheus
+
+Connections are kept alive, each on its own thread. With --workers, at most
+that many InsertImmsRecord requests are processed at once. Envelopes are
+parsed as they're read and CSV payloads validated a row at a time; larger
+requests than --max-request-bytes are rejected.
+
+Accepted records aren't kept by default, as the deployed mock runs for a long
+time. --record-store memory keeps them in memory, until DELETE /records, and
+--record-store sqlite in the SQLite database --record-db.
+
+InsertImmsRecord requests are delayed and failed as set by --fault-profile,
+with any of its fields overridden by the options after it. PUT a JSON object
+of fields, optionally with a "profile" to start from, to /admin/faults to
+change it while running, for example:
+
+    curl -X PUT http://127.0.0.1:8080/admin/faults \
+      -d '{"profile": "flaky", "timeout_percent": 10}'
 """
 
 import argparse
 import logging
-from http.server import HTTPServer
+import typing
+from typing import Literal
 
 from mavis.test.mocks.careplus import (
+    DEFAULT_MAX_REQUEST_BYTES,
+    CarePlusServer,
     Config,
     SOAPHandler,
     build_service_path,
 )
+from mavis.test.mocks.careplus.faults import (
+    PROFILES,
+    FaultInjector,
+    FaultProfile,
+    LatencyDistribution,
+)
+from mavis.test.mocks.careplus.store import (
+    MemoryRecordStore,
+    RecordStore,
+    SQLiteRecordStore,
+)
 
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 8080
 DEFAULT_SITE_NAMESPACE = "MOCK"
+DEFAULT_RECORD_DB = "careplus-records.sqlite3"
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 log = logging.getLogger(__name__)
 
 
+def _record_store(
+    kind: Literal["memory", "sqlite", "none"], db_path: str
+) -> RecordStore | None:
+    if kind == "memory":
+        return MemoryRecordStore()
+    if kind == "sqlite":
+        return SQLiteRecordStore(db_path)
+    return None
+
+
+def _fault_profile(args: argparse.Namespace) -> FaultProfile:
+    overrides = {
+        "latency_seconds": args.latency_ms / 1000
+        if args.latency_ms is not None
+        else None,
+        "latency_jitter_seconds": args.latency_jitter_ms / 1000
+        if args.latency_jitter_ms is not None
+        else None,
+        "latency_distribution": args.latency_distribution,
+        "soap_fault_percent": args.soap_fault_percent,
+        "server_error_percent": args.server_error_percent,
+        "server_error_status": args.server_error_status,
+        "timeout_percent": args.timeout_percent,
+        "timeout_seconds": args.timeout_seconds,
+    }
+    return FaultProfile.from_dict(
+        {name: value for name, value in overrides.items() if value is not None},
+        PROFILES[args.fault_profile],
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Mock SCHImmsService SOAP server")
     parser.add_argument("--host", default=DEFAULT_HOST)
     parser.add_argument("--port", type=int, default=DEFAULT_PORT)
     parser.add_argument("--site-namespace", default=DEFAULT_SITE_NAMESPACE)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="process at most this many InsertImmsRecord requests at once",
+    )
+    parser.add_argument(
+        "--max-request-bytes", type=int, default=DEFAULT_MAX_REQUEST_BYTES
+    )
+    parser.add_argument(
+        "--record-store", choices=["none", "memory", "sqlite"], default="none"
+    )
+    parser.add_argument("--record-db", default=DEFAULT_RECORD_DB)
+    parser.add_argument("--fault-profile", choices=list(PROFILES), default="healthy")
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-jitter-ms", type=float)
+    parser.add_argument(
+        "--latency-distribution",
+        choices=typing.get_args(LatencyDistribution.__value__),
+    )
+    parser.add_argument("--soap-fault-percent", type=float)
+    parser.add_argument("--server-error-percent", type=float)
+    parser.add_argument("--server-error-status", type=int)
+    parser.add_argument("--timeout-percent", type=float)
+    parser.add_argument("--timeout-seconds", type=float)
+    parser.add_argument("--seed", type=int)
     args = parser.parse_args()
 
+    try:
+        faults = FaultInjector(_fault_profile(args), seed=args.seed)
+    except ValueError as exc:
+        parser.error(str(exc))
+
     path = build_service_path(args.site_namespace)
 
     config: Config = {
         "host": args.host,
         "port": args.port,
         "path": path,
+        "max_request_bytes": args.max_request_bytes,
     }
 
-    server = HTTPServer((args.host, args.port), SOAPHandler.make_handler(config))
+    server = CarePlusServer(
+        (args.host, args.port),
+        SOAPHandler.make_handler(
+            config, _record_store(args.record_store, args.record_db), faults
+        ),
+        workers=args.workers,
+    )
     log.info(
         "SOAP mock service listening on http://%s:%d%s", args.host, args.port, path
     )
     log.info("WSDL at http://%s:%d%s?wsdl", args.host, args.port, path)
+    log.info("Fault profile %s", faults.profile)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
@@ -0,0 +1,199 @@
+"""Latency and fault injection for the CarePlus mock's InsertImmsRecord requests.
+
+A FaultProfile delays every request and fails a percentage of them, with a
+SOAP fault, a 5xx response from in front of the service, or no response at
+all. The profile can be swapped while the mock is running, and the timing
+and outcome of each request is kept so that Mavis' retries can be matched up
+with the faults it was given.
+"""
+
+import random
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime
+from typing import Literal, get_args
+
+type LatencyDistribution = Literal["uniform", "exponential", "lognormal"]
+type Outcome = Literal["ok", "soap_fault", "server_error", "timeout"]
+
+DEFAULT_MAX_TIMINGS = 10_000
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    # every request takes latency_seconds plus a random delay, uniform up to
+    # latency_jitter_seconds, or with that mean (exponential) or median
+    # (lognormal, for a long tail)
+    latency_seconds: float = 0
+    latency_jitter_seconds: float = 0
+    latency_distribution: LatencyDistribution = "uniform"
+    # percentages of requests answered with a soap:Server fault, with
+    # server_error_status and no SOAP envelope, or not answered for
+    # timeout_seconds and then dropped
+    soap_fault_percent: float = 0
+    server_error_percent: float = 0
+    server_error_status: int = 503
+    timeout_percent: float = 0
+    timeout_seconds: float = 60
+
+    def __post_init__(self) -> None:
+        if self.latency_distribution not in get_args(LatencyDistribution.__value__):
+            msg = f"Unknown latency distribution {self.latency_distribution!r}"
+            raise ValueError(msg)
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if field.name != "latency_distribution" and (
+                isinstance(value, bool) or not isinstance(value, int | float)
+            ):
+                msg = f"{field.name} must be a number"
+                raise ValueError(msg)
+        if (
+            min(self.latency_seconds, self.latency_jitter_seconds, self.timeout_seconds)
+            < 0
+        ):
+            msg = "Latencies and timeouts can't be negative"
+            raise ValueError(msg)
+        percentages = (
+            self.soap_fault_percent,
+            self.server_error_percent,
+            self.timeout_percent,
+        )
+        if min(percentages) < 0 or sum(percentages) > 100:  # noqa: PLR2004
+            msg = "Fault percentages can't be negative or add up to more than 100"
+            raise ValueError(msg)
+        if isinstance(self.server_error_status, bool) or not isinstance(
+            self.server_error_status, int
+        ):
+            msg = "server_error_status must be a whole number"
+            raise ValueError(msg)  # noqa: TRY004
+        if not 500 <= self.server_error_status <= 599:  # noqa: PLR2004
+            msg = f"{self.server_error_status} is not a 5xx status"
+            raise ValueError(msg)
+
+    @classmethod
+    def from_dict(cls, data: object, base: "FaultProfile") -> "FaultProfile":
+        """
+        base with the fields in data, a JSON object, replaced. data can name
+        one of PROFILES as "profile" to start from that instead.
+
+        Raises:
+            ValueError: If a field or profile is unknown or a value is invalid.
+        """
+        if not isinstance(data, dict):
+            msg = "Expected a JSON object"
+            raise ValueError(msg)  # noqa: TRY004
+        data = dict(data)
+        if "profile" in data:
+            name = data.pop("profile")
+            if not isinstance(name, str) or name not in PROFILES:
+                msg = f"Unknown fault profile {name!r}"
+                raise ValueError(msg)
+            base = PROFILES[name]
+        unknown = data.keys() - {field.name for field in fields(cls)}
+        if unknown:
+            msg = f"Unknown fault profile fields {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        return replace(base, **data)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+PROFILES = {
+    "healthy": FaultProfile(),
+    "slow": FaultProfile(
+        latency_seconds=1, latency_jitter_seconds=2, latency_distribution="lognormal"
+    ),
+    "flaky": FaultProfile(
+        latency_seconds=0.2,
+        latency_jitter_seconds=0.3,
+        latency_distribution="exponential",
+        soap_fault_percent=5,
+        server_error_percent=5,
+        timeout_percent=2,
+    ),
+    "outage": FaultProfile(server_error_percent=100),
+    "hanging": FaultProfile(timeout_percent=100),
+}
+
+
+@dataclass(frozen=True)
+class RequestTiming:
+    received_at: datetime
+    outcome: Outcome
+    # None when no response was sent
+    status: int | None
+    injected_delay_ms: float
+    elapsed_ms: float
+    request_bytes: int
+    # the same for every retry of a request
+    body_digest: str
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "received_at": self.received_at.isoformat()}
+
+
+class FaultInjector:
+    """
+    The current FaultProfile, and the timings of the latest max_timings
+    requests. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        profile: FaultProfile,
+        *,
+        max_timings: int = DEFAULT_MAX_TIMINGS,
+        seed: int | None = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        self.profile = profile
+        self._random = random.Random(seed)
+        self._timings: deque[RequestTiming] = deque(maxlen=max_timings)
+
+    def draw(self) -> tuple[Outcome, float]:
+        """The outcome of the next request, and how long to delay it."""
+        profile = self.profile
+        with self._lock:
+            roll = self._random.uniform(0, 100)
+            jitter = self._random_delay(
+                profile.latency_distribution, profile.latency_jitter_seconds
+            )
+        delay = profile.latency_seconds + jitter
+        for outcome, percent in (
+            ("timeout", profile.timeout_percent),
+            ("server_error", profile.server_error_percent),
+            ("soap_fault", profile.soap_fault_percent),
+        ):
+            if roll < percent:
+                if outcome == "timeout":
+                    delay = profile.timeout_seconds
+                return outcome, delay
+            roll -= percent
+        return "ok", delay
+
+    def _random_delay(self, distribution: LatencyDistribution, scale: float) -> float:
+        if scale <= 0:
+            return 0
+        if distribution == "exponential":
+            return self._random.expovariate(1 / scale)
+        if distribution == "lognormal":
+            return self._random.lognormvariate(0, 1) * scale
+        return self._random.uniform(0, scale)
+
+    def record(self, timing: RequestTiming) -> None:
+        with self._lock:
+            self._timings.append(timing)
+
+    def timings(self, since: datetime | None = None) -> list[RequestTiming]:
+        with self._lock:
+            return [
+                timing
+                for timing in self._timings
+                if since is None or timing.received_at >= since
+            ]
+
+    def clear_timings(self) -> None:
+        with self._lock:
+            self._timings.clear()
@@ -0,0 +1,138 @@
+"""Prometheus metrics for the CarePlus mock's InsertImmsRecord requests.
+
+Counts requests by outcome, with histograms of their size, the number of
+records in accepted payloads and how long they took to handle, served in the
+Prometheus text format at GET /metrics. Each request takes the lock once and
+bumps a handful of counters, so recording them costs next to nothing.
+"""
+
+import threading
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from typing import Literal, get_args
+
+type RequestOutcome = Literal[
+    "accepted", "rejected", "too_large", "soap_fault", "server_error", "timeout"
+]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# powers of 4 from 1 KB to the default request size limit of 256 MB
+REQUEST_BYTES_BUCKETS = tuple(1024 * 4**power for power in range(10))
+PAYLOAD_ROWS_BUCKETS = (1, 10, 30, 100, 300, 1_000, 3_000, 10_000, 30_000, 100_000)
+DURATION_SECONDS_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+class _Histogram:
+    """
+    Counts of observations in each bucket, with their sum. Not thread-safe;
+    Metrics guards it.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        # the last is for observations above every bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: dict[str, str]) -> Iterator[str]:
+        cumulative = 0
+        for bound, count in zip(
+            [*map(_format_value, self.buckets), "+Inf"], self.counts, strict=True
+        ):
+            cumulative += count
+            bucket_labels = _format_labels({**labels, "le": bound})
+            yield f"{name}_bucket{bucket_labels} {cumulative}"
+        yield f"{name}_sum{_format_labels(labels)} {_format_value(self.sum)}"
+        yield f"{name}_count{_format_labels(labels)} {cumulative}"
+
+
+class Metrics:
+    """The metrics of the InsertImmsRecord requests a mock has handled. Thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        outcomes = get_args(RequestOutcome.__value__)
+        self._requests = dict.fromkeys(outcomes, 0)
+        self._request_bytes = _Histogram(REQUEST_BYTES_BUCKETS)
+        self._payload_rows = _Histogram(PAYLOAD_ROWS_BUCKETS)
+        self._durations = {
+            outcome: _Histogram(DURATION_SECONDS_BUCKETS) for outcome in outcomes
+        }
+
+    def observe(
+        self,
+        outcome: RequestOutcome,
+        request_bytes: int,
+        duration_seconds: float,
+        rows: int | None = None,
+    ) -> None:
+        """Record a request, with the number of records if it was accepted."""
+        with self._lock:
+            self._requests[outcome] += 1
+            self._request_bytes.observe(request_bytes)
+            self._durations[outcome].observe(duration_seconds)
+            if rows is not None:
+                self._payload_rows.observe(rows)
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP careplus_requests_total InsertImmsRecord requests by outcome.",
+            "# TYPE careplus_requests_total counter",
+        ]
+        with self._lock:
+            lines.extend(
+                f'careplus_requests_total{{outcome="{outcome}"}} {count}'
+                for outcome, count in self._requests.items()
+            )
+            lines += [
+                "# HELP careplus_request_bytes Sizes of InsertImmsRecord requests.",
+                "# TYPE careplus_request_bytes histogram",
+                *self._request_bytes.samples("careplus_request_bytes", {}),
+                "# HELP careplus_payload_rows Records in accepted CSV payloads.",
+                "# TYPE careplus_payload_rows histogram",
+                *self._payload_rows.samples("careplus_payload_rows", {}),
+                "# HELP careplus_request_duration_seconds Time taken to handle"
+                " InsertImmsRecord requests, including waiting for a worker and"
+                " any injected latency, by outcome.",
+                "# TYPE careplus_request_duration_seconds histogram",
+            ]
+            for outcome, histogram in self._durations.items():
+                lines.extend(
+                    histogram.samples(
+                        "careplus_request_duration_seconds", {"outcome": outcome}
+                    )
+                )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,234 @@
+"""Stores of the vaccination records the CarePlus mock has accepted.
+
+Each non-empty row of an accepted payload is kept as a record, with the CSV
+columns as its fields, and can be queried by NHS number, venue code and the
+time it was received. Records are kept in memory, or in SQLite to keep them
+across restarts.
+"""
+
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+NHS_NUMBER_COLUMN = "NHS Number"
+VENUE_CODE_COLUMN = "Venue Code"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Record:
+    id: int
+    received_at: datetime
+    user_id: str
+    fields: dict[str, str]
+
+    @property
+    def nhs_number(self) -> str:
+        return self.fields.get(NHS_NUMBER_COLUMN, "")
+
+    @property
+    def venue_code(self) -> str:
+        return self.fields.get(VENUE_CODE_COLUMN, "")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "received_at": self.received_at.isoformat(),
+            "user_id": self.user_id,
+            "fields": self.fields,
+        }
+
+
+@dataclass(frozen=True)
+class Query:
+    """
+    Records matching all of the given filters, received in [since, until),
+    paged in the order they were received.
+    """
+
+    nhs_number: str | None = None
+    venue_code: str | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+    offset: int = 0
+    limit: int = DEFAULT_PAGE_SIZE
+
+
+def _matches(record: Record, query: Query) -> bool:
+    return (query.nhs_number is None or record.nhs_number == query.nhs_number) and (
+        query.venue_code is None or record.venue_code == query.venue_code
+    )
+
+
+class RecordStore(ABC):
+    @abstractmethod
+    def add(self, user_id: str, rows: Iterable[dict[str, str]]) -> int:
+        """Store the rows of one accepted payload, returning how many there were."""
+
+    @abstractmethod
+    def query(self, query: Query) -> tuple[int, list[Record]]:
+        """The total number of matching records and the requested page of them."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class MemoryRecordStore(RecordStore):
+    """
+    Thread-safe in-memory store. Records are held in the order they were
+    received, with the positions of each NHS number's and venue code's records
+    kept in sorted lists, so queries only look at the records that can match.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._records: list[Record] = []
+        self._received: list[datetime] = []
+        self._by_nhs_number: defaultdict[str, list[int]] = defaultdict(list)
+        self._by_venue_code: defaultdict[str, list[int]] = defaultdict(list)
+
+    def add(self, user_id: str, rows: Iterable[dict[str, str]]) -> int:
+        count = 0
+        with self._lock:
+            # taken under the lock, so records are held in the order received
+            received_at = datetime.now(tz=UTC)
+            for fields in rows:
+                position = len(self._records)
+                record = Record(position + 1, received_at, user_id, fields)
+                self._records.append(record)
+                self._received.append(received_at)
+                self._by_nhs_number[record.nhs_number].append(position)
+                self._by_venue_code[record.venue_code].append(position)
+                count += 1
+        return count
+
+    def query(self, query: Query) -> tuple[int, list[Record]]:
+        with self._lock:
+            start = bisect_left(self._received, query.since) if query.since else 0
+            end = (
+                bisect_left(self._received, query.until)
+                if query.until
+                else len(self._records)
+            )
+            candidates: Sequence[int] = range(start, end)
+            for key, index in (
+                (query.nhs_number, self._by_nhs_number),
+                (query.venue_code, self._by_venue_code),
+            ):
+                if key is not None:
+                    positions = index.get(key, [])
+                    positions = positions[
+                        bisect_left(positions, start) : bisect_left(positions, end)
+                    ]
+                    if len(positions) < len(candidates):
+                        candidates = positions
+            records = [
+                self._records[position]
+                for position in candidates
+                if _matches(self._records[position], query)
+            ]
+        return len(records), records[query.offset : query.offset + query.limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._received.clear()
+            self._by_nhs_number.clear()
+            self._by_venue_code.clear()
+
+
+class SQLiteRecordStore(RecordStore):
+    """Store in a SQLite database, indexed by NHS number, venue code and time."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                received_at TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                nhs_number TEXT NOT NULL,
+                venue_code TEXT NOT NULL,
+                fields TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_nhs_number
+                ON records (nhs_number, received_at);
+            CREATE INDEX IF NOT EXISTS records_venue_code
+                ON records (venue_code, received_at);
+            CREATE INDEX IF NOT EXISTS records_received_at ON records (received_at);
+            """
+        )
+
+    def add(self, user_id: str, rows: Iterable[dict[str, str]]) -> int:
+        with self._lock, self._connection:
+            # ISO 8601 with a fixed number of digits, so it sorts as text
+            received_at = datetime.now(tz=UTC).isoformat(timespec="microseconds")
+            cursor = self._connection.executemany(
+                "INSERT INTO records"
+                " (received_at, user_id, nhs_number, venue_code, fields)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        received_at,
+                        user_id,
+                        fields.get(NHS_NUMBER_COLUMN, ""),
+                        fields.get(VENUE_CODE_COLUMN, ""),
+                        json.dumps(fields),
+                    )
+                    for fields in rows
+                ),
+            )
+        return cursor.rowcount
+
+    def query(self, query: Query) -> tuple[int, list[Record]]:
+        conditions = []
+        parameters: list[object] = []
+        for column, value in (
+            ("nhs_number", query.nhs_number),
+            ("venue_code", query.venue_code),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if query.since:
+            conditions.append("received_at >= ?")
+            parameters.append(query.since.isoformat(timespec="microseconds"))
+        if query.until:
+            conditions.append("received_at < ?")
+            parameters.append(query.until.isoformat(timespec="microseconds"))
+        # only the conditions are built up, from the fixed strings above
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            (total,) = self._connection.execute(
+                f"SELECT COUNT(*) FROM records{where}",  # noqa: S608
+                parameters,
+            ).fetchone()
+            rows = self._connection.execute(
+                f"SELECT id, received_at, user_id, fields FROM records{where}"  # noqa: S608
+                " ORDER BY id LIMIT ? OFFSET ?",
+                [*parameters, query.limit, query.offset],
+            ).fetchall()
+        return total, [
+            Record(
+                record_id,
+                datetime.fromisoformat(received_at),
+                user_id,
+                json.loads(fields),
+            )
+            for record_id, received_at, user_id, fields in rows
+        ]
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM records")
@@ -0,0 +1,304 @@
+"""Minimal mock of the IMMS FHIR API, covering the OAuth token endpoint and the
+Immunization create and search endpoints used by ImmsApiHelper.
+
+Records are kept in memory, indexed by NHS number and target disease, so
+searches stay fast however many records have been created.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TypedDict
+from urllib.parse import parse_qs, urlsplit
+
+log = logging.getLogger(__name__)
+
+TOKEN_PATH = "/oauth2-mock/token"  # noqa: S105
+IMMUNIZATION_PATH = "/immunisation-fhir-api/FHIR/R4/Immunization"
+
+NHS_NUMBER_SYSTEM = "https://fhir.nhs.uk/Id/nhs-number"
+TOKEN_EXPIRY_SECONDS = 599
+
+# SNOMED target disease codes and the names the API searches them by
+TARGET_DISEASES = {
+    "6142004": "FLU",
+    "240532009": "HPV",
+    "14189004": "MMR",
+    "23511006": "MENACWY",
+    "76902006": "3IN1",
+}
+
+
+class Config(TypedDict):
+    host: str
+    port: int
+    latency_seconds: float
+    latency_jitter_seconds: float
+
+
+class ImmunizationError(Exception):
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def _operation_outcome(code: str, message: str) -> bytes:
+    return json.dumps(
+        {
+            "resourceType": "OperationOutcome",
+            "issue": [{"severity": "error", "code": code, "diagnostics": message}],
+        }
+    ).encode()
+
+
+def _get_nhs_number(immunization: dict) -> str:
+    for resource in immunization.get("contained", []):
+        if resource.get("resourceType") != "Patient":
+            continue
+        for identifier in resource.get("identifier", []):
+            if identifier.get("system") == NHS_NUMBER_SYSTEM:
+                return identifier["value"]
+    msg = "Immunization has no contained Patient with an NHS number"
+    raise ImmunizationError(400, "invalid", msg)
+
+
+def _get_targets(immunization: dict) -> set[str]:
+    codes = {
+        coding["code"]
+        for protocol in immunization.get("protocolApplied", [])
+        for disease in protocol.get("targetDisease", [])
+        for coding in disease.get("coding", [])
+    }
+    if not codes:
+        msg = "Immunization has no protocolApplied target disease"
+        raise ImmunizationError(400, "invalid", msg)
+    return {TARGET_DISEASES.get(code, code) for code in codes}
+
+
+class ImmunizationStore:
+    """Thread-safe in-memory store of Immunization resources."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_patient_and_target: defaultdict[tuple[str, str], list[dict]] = (
+            defaultdict(list)
+        )
+        self._identifiers: set[tuple[str, str]] = set()
+
+    def create(self, immunization: dict) -> str:
+        if immunization.get("resourceType") != "Immunization":
+            msg = "Resource is not an Immunization"
+            raise ImmunizationError(400, "invalid", msg)
+
+        nhs_number = _get_nhs_number(immunization)
+        targets = _get_targets(immunization)
+        identifiers = {
+            (identifier.get("system", ""), identifier.get("value", ""))
+            for identifier in immunization.get("identifier", [])
+        }
+
+        immunization_id = str(uuid.uuid4())
+        patient_id = str(uuid.uuid4())
+        stored = {
+            **immunization,
+            "id": immunization_id,
+            "patient": {
+                "reference": f"urn:uuid:{patient_id}",
+                "type": "Patient",
+                "identifier": {"system": NHS_NUMBER_SYSTEM, "value": nhs_number},
+            },
+        }
+        stored.pop("contained", None)
+
+        with self._lock:
+            if identifiers & self._identifiers:
+                msg = "Immunization with this identifier already exists"
+                raise ImmunizationError(422, "duplicate", msg)
+            self._identifiers |= identifiers
+            for target in targets:
+                self._by_patient_and_target[nhs_number, target].append(stored)
+
+        return immunization_id
+
+    def search(self, nhs_number: str, targets: list[str]) -> list[dict]:
+        with self._lock:
+            return [
+                immunization
+                for target in targets
+                for immunization in self._by_patient_and_target.get(
+                    (nhs_number, target), []
+                )
+            ]
+
+
+def _search_bundle(nhs_number: str, immunizations: list[dict]) -> dict:
+    entries: list[dict] = [
+        {"resource": immunization, "search": {"mode": "match"}}
+        for immunization in immunizations
+    ]
+    if immunizations:
+        entries.append(
+            {
+                "resource": {
+                    "resourceType": "Patient",
+                    "identifier": [{"system": NHS_NUMBER_SYSTEM, "value": nhs_number}],
+                },
+                "search": {"mode": "include"},
+            }
+        )
+    return {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "total": len(immunizations),
+        "entry": entries,
+    }
+
+
+class IMMSServer(ThreadingHTTPServer):
+    # the default backlog of 5 resets connections under load
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class IMMSHandler(BaseHTTPRequestHandler):
+    # keep connections alive, as the real API does, and send headers and body
+    # without waiting for delayed ACKs
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    config: Config
+    store: ImmunizationStore
+    tokens: set[str]
+
+    @classmethod
+    def make_handler(
+        cls, config: Config, store: ImmunizationStore | None = None
+    ) -> type["IMMSHandler"]:
+        return type(
+            cls.__name__,
+            (cls,),
+            {
+                "config": config,
+                "store": store or ImmunizationStore(),
+                "tokens": set(),
+            },
+        )
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        log.debug("HTTP %s", format % args)
+
+    def _simulate_latency(self) -> None:
+        latency = self.config["latency_seconds"] + random.uniform(
+            0, self.config["latency_jitter_seconds"]
+        )
+        if latency > 0:
+            # mocks run without mavis.test installed, so deliberate_sleep isn't
+            # available here
+            time.sleep(latency)  # noqa: TID251
+
+    def _is_authorised(self) -> bool:
+        authorization = self.headers.get("Authorization", "")
+        return authorization.removeprefix("Bearer ") in self.tokens
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length)
+
+    def do_GET(self) -> None:
+        self._simulate_latency()
+        url = urlsplit(self.path)
+
+        if url.path == "/health":
+            self._send(200, b"ok", "text/plain; charset=utf-8")
+            return
+
+        if url.path != IMMUNIZATION_PATH:
+            self._send_error(404, "not-found", f"No route for {url.path}")
+            return
+
+        if not self._is_authorised():
+            self._send_error(401, "forbidden", "Missing or unknown access token")
+            return
+
+        query = parse_qs(url.query)
+        patient_identifier = query.get("patient.identifier", [""])[0]
+        system, _, nhs_number = patient_identifier.rpartition("|")
+        targets = query.get("-immunization.target", [""])[0].upper().split(",")
+        if system != NHS_NUMBER_SYSTEM or not nhs_number or not targets[0]:
+            self._send_error(
+                400,
+                "invalid",
+                "patient.identifier and -immunization.target are required",
+            )
+            return
+
+        bundle = _search_bundle(nhs_number, self.store.search(nhs_number, targets))
+        self._send(200, json.dumps(bundle).encode(), "application/fhir+json")
+
+    def do_POST(self) -> None:
+        self._simulate_latency()
+        path = urlsplit(self.path).path
+        # read the body even if it goes unused, so the connection can be reused
+        body = self._read_body()
+
+        if path == TOKEN_PATH:
+            self._issue_token(body)
+            return
+
+        if path != IMMUNIZATION_PATH:
+            self._send_error(404, "not-found", f"No route for {path}")
+            return
+
+        if not self._is_authorised():
+            self._send_error(401, "forbidden", "Missing or unknown access token")
+            return
+
+        try:
+            immunization_id = self.store.create(json.loads(body))
+        except json.JSONDecodeError as exc:
+            self._send_error(400, "invalid", f"Malformed JSON: {exc}")
+            return
+        except ImmunizationError as exc:
+            self._send_error(exc.status, exc.code, str(exc))
+            return
+
+        self.send_response(201)
+        self.send_header("Location", f"{IMMUNIZATION_PATH}/{immunization_id}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _issue_token(self, body: bytes) -> None:
+        form = parse_qs(body.decode())
+        if form.get("grant_type") != ["client_credentials"]:
+            self._send(
+                400,
+                json.dumps({"error": "unsupported_grant_type"}).encode(),
+                "application/json",
+            )
+            return
+
+        token = uuid.uuid4().hex
+        self.tokens.add(token)
+        body = {
+            "access_token": token,
+            "expires_in": str(TOKEN_EXPIRY_SECONDS),
+            "token_type": "Bearer",
+            "issued_at": str(int(time.time() * 1000)),
+        }
+        self._send(200, json.dumps(body).encode(), "application/json")
+
+    def _send_error(self, status: int, code: str, message: str) -> None:
+        self._send(status, _operation_outcome(code, message), "application/fhir+json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,51 @@
+"""
+Entry point for running the IMMS FHIR API mock.
+
+Usage:
+    python -m mavis.test.mocks.imms [--host 127.0.0.1] [--port 8081]
+      [--latency-ms 0] [--latency-jitter-ms 0]
+
+Token endpoint is at:    POST /oauth2-mock/token
+Immunization is at:      GET|POST /immunisation-fhir-api/FHIR/R4/Immunization
+Healthcheck is at:       GET /health
+
+Point IMMS_BASE_URL at http://<host>:<port>/ to use it from the tests.
+"""
+
+import argparse
+import logging
+
+from mavis.test.mocks.imms import Config, IMMSHandler, IMMSServer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8081
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock IMMS FHIR API server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    config: Config = {
+        "host": args.host,
+        "port": args.port,
+        "latency_seconds": args.latency_ms / 1000,
+        "latency_jitter_seconds": args.latency_jitter_ms / 1000,
+    }
+
+    server = IMMSServer((args.host, args.port), IMMSHandler.make_handler(config))
+    log.info("IMMS mock listening on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("Shutting down")
+
+
+if __name__ == "__main__":
+    main()
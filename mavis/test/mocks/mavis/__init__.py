@@ -0,0 +1,651 @@
+"""Minimal stand-in for Mavis, for exercising the test helpers and load drivers
+offline.
+
+Serves the pages the load test journeys visit, with CSRF tokens tied to a
+session cookie as Rails does: signing in and choosing a team, the sessions
+list, each session's register and offline spreadsheet, recording a
+vaccination and the parent consent form. The school sessions and patients are
+generated at startup.
+
+Also serves the parts of the testing API the tests use. Each import reports
+``pending_import`` at GET /api/testing/<import type>/<import id> for a
+configurable number of polls and then its final status (or 404, like a Mavis
+without that endpoint, if import_status_available is off), and teams can be
+onboarded, reset and given schools from /api/testing/locations.
+
+Every response except /health is delayed by a configurable latency.
+"""
+
+import json
+import logging
+import random
+import re
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Literal, TypedDict
+from urllib.parse import parse_qs, urlsplit
+
+from mavis.test.mocks.mavis import pages
+from mavis.test.mocks.mavis.spreadsheet import XLSX_CONTENT_TYPE, write_workbook
+from mavis.test.mocks.mavis.store import (
+    OFFLINE_COLUMNS,
+    OFFLINE_SHEET,
+    PROGRAMMES,
+    BrowserSession,
+    ConsentForm,
+    MavisStore,
+    Patient,
+    Session,
+    StubError,
+)
+
+log = logging.getLogger(__name__)
+
+IMPORT_STATUS_PATH_PATTERN = re.compile(
+    r"^/api/testing/(?P<import_type>(?:class|cohort|immunisation)-imports)"
+    r"/(?P<import_id>\d+)$"
+)
+SESSION_COOKIE = "_mavis_session"
+
+# the same team is offered to every user, so the team step of signing in is
+# always exercised
+TEAMS = [("1", "SAIS Organisation 1")]
+
+type LatencyDistribution = Literal["uniform", "exponential", "lognormal"]
+
+ROUTES: list[tuple[str, re.Pattern[str], str]] = [
+    (method, re.compile(f"^{pattern}$"), handler)
+    for method, pattern, handler in [
+        ("GET", r"/(?:start|dashboard)?", "_get_start"),
+        ("GET", r"/users/sign-in", "_get_sign_in"),
+        ("POST", r"/users/sign-in", "_post_sign_in"),
+        ("GET", r"/users/teams", "_get_teams"),
+        ("POST", r"/users/teams", "_post_teams"),
+        ("POST", r"/logout", "_post_logout"),
+        ("GET", r"/sessions", "_get_sessions"),
+        ("GET", r"/sessions/(?P<session_id>\w+)\.xlsx", "_get_offline_spreadsheet"),
+        ("GET", r"/sessions/(?P<session_id>\w+)", "_get_session"),
+        ("GET", r"/sessions/(?P<session_id>\w+)/patients", "_get_register"),
+        (
+            "POST",
+            r"/sessions/(?P<session_id>\w+)/patients/(?P<patient_id>\d+)"
+            r"/register/present",
+            "_post_attending",
+        ),
+        (
+            "GET",
+            r"/sessions/(?P<session_id>\w+)/patients/(?P<patient_id>\d+)"
+            r"/(?P<programme_type>\w+)",
+            "_get_patient_session",
+        ),
+        (
+            "POST",
+            r"/sessions/(?P<session_id>\w+)/patients/(?P<patient_id>\d+)"
+            r"/(?P<programme_type>\w+)/vaccinations",
+            "_post_vaccinate",
+        ),
+        ("GET", r"/draft-vaccination-record/batch", "_get_batch"),
+        ("POST", r"/draft-vaccination-record/batch", "_post_batch"),
+        ("GET", r"/draft-vaccination-record/confirm", "_get_vaccination_confirm"),
+        ("POST", r"/draft-vaccination-record/confirm", "_post_vaccination_confirm"),
+        (
+            "GET",
+            r"/consents/(?P<session_id>\w+)/(?P<programme_types>[\w-]+)/start",
+            "_get_consent_start",
+        ),
+        ("POST", r"/consents", "_post_consent_start"),
+        (
+            "GET",
+            r"/consents/(?P<consent_id>\w+)/edit/(?P<step>[\w-]+)",
+            "_get_consent_step",
+        ),
+        (
+            "POST",
+            r"/consents/(?P<consent_id>\w+)/edit/(?P<step>[\w-]+)",
+            "_post_consent_step",
+        ),
+        ("GET", r"/consents/(?P<consent_id>\w+)/confirm", "_get_consent_confirm"),
+        ("POST", r"/consents/(?P<consent_id>\w+)/record", "_post_consent_record"),
+        (
+            "GET",
+            r"/consents/(?P<consent_id>\w+)/confirmation",
+            "_get_consent_confirmation",
+        ),
+        ("GET", r"/api/testing/locations", "_get_locations"),
+        ("GET", r"/api/testing/refresh-reporting", "_get_refresh_reporting"),
+        ("POST", r"/api/testing/onboard", "_post_onboard"),
+        ("DELETE", r"/api/testing/teams/(?P<workgroup>\w+)", "_delete_team"),
+        (
+            "DELETE",
+            r"/api/testing/teams/(?P<workgroup>\w+)/locations",
+            "_delete_team_locations",
+        ),
+    ]
+]
+
+
+class Config(TypedDict):
+    host: str
+    port: int
+    import_status_available: bool
+    polls_until_processed: int
+    final_status: str
+    # every response takes latency_seconds plus a random delay, uniform up to
+    # latency_jitter_seconds, or with that mean (exponential) or median
+    # (lognormal, for a long tail)
+    latency_seconds: float
+    latency_jitter_seconds: float
+    latency_distribution: LatencyDistribution
+
+
+def default_config(host: str = "127.0.0.1", port: int = 0) -> Config:
+    return {
+        "host": host,
+        "port": port,
+        "import_status_available": True,
+        "polls_until_processed": 3,
+        "final_status": "processed",
+        "latency_seconds": 0,
+        "latency_jitter_seconds": 0,
+        "latency_distribution": "uniform",
+    }
+
+
+class RedirectError(Exception):
+    """Stops handling a request and redirects, as Rails' before_action can."""
+
+    def __init__(self, location: str) -> None:
+        super().__init__(location)
+        self.location = location
+
+
+def _random_delay(distribution: LatencyDistribution, scale: float) -> float:
+    if scale <= 0:
+        return 0
+    if distribution == "exponential":
+        return random.expovariate(1 / scale)
+    if distribution == "lognormal":
+        return random.lognormvariate(0, 1) * scale
+    return random.uniform(0, scale)
+
+
+class MavisStubServer(ThreadingHTTPServer):
+    # the default backlog of 5 resets connections under load
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class MavisStubHandler(BaseHTTPRequestHandler):
+    # keep connections alive, as Mavis does, and send headers and body without
+    # waiting for delayed ACKs
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    config: Config
+    store: MavisStore
+    poll_counts: dict[str, int]
+
+    @classmethod
+    def make_handler(
+        cls, config: Config, store: MavisStore | None = None
+    ) -> type["MavisStubHandler"]:
+        return type(
+            cls.__name__,
+            (cls,),
+            {"config": config, "store": store or MavisStore(), "poll_counts": {}},
+        )
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        log.debug("HTTP %s", format % args)
+
+    def _simulate_latency(self) -> None:
+        latency = self.config["latency_seconds"] + _random_delay(
+            self.config["latency_distribution"], self.config["latency_jitter_seconds"]
+        )
+        if latency > 0:
+            # mocks run without mavis.test installed, so deliberate_sleep isn't
+            # available here
+            time.sleep(latency)  # noqa: TID251
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def _handle(self, method: str) -> None:
+        url = urlsplit(self.path)
+        self.query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.cookie: str | None = None
+        # read the body even if it goes unused, so the connection can be reused
+        self.body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if url.path == "/health":
+            self._send(200, b"ok", "text/plain; charset=utf-8")
+            return
+        self._simulate_latency()
+
+        if (
+            method == "GET"
+            and self.config["import_status_available"]
+            and (match := IMPORT_STATUS_PATH_PATTERN.match(url.path))
+        ):
+            self._get_import_status(url.path, match)
+            return
+
+        # Rails forms send PUT and DELETE as POST with a _method field
+        self.form = {}
+        if method == "POST" and not url.path.startswith("/api/"):
+            self.form = {
+                key: values[0] for key, values in parse_qs(self.body.decode()).items()
+            }
+            method = self.form.get("_method", method).upper()
+            if method == "PUT":
+                method = "POST"
+
+        for route_method, pattern, handler in ROUTES:
+            if route_method == method and (match := pattern.match(url.path)):
+                try:
+                    getattr(self, handler)(**match.groupdict())
+                except RedirectError as exc:
+                    self._redirect(exc.location)
+                except StubError as exc:
+                    self._send(
+                        exc.status, str(exc).encode(), "text/plain; charset=utf-8"
+                    )
+                return
+        self._send(404, b"", "text/plain; charset=utf-8")
+
+    # browser sessions
+
+    def _browser_session(self) -> BrowserSession:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        key = cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+        with self.store.lock:
+            browser_session = self.store.browser_sessions.get(key) if key else None
+            if browser_session is None:
+                key = uuid.uuid4().hex
+                browser_session = BrowserSession()
+                self.store.browser_sessions[key] = browser_session
+                self.cookie = key
+        return browser_session
+
+    def _check_token(self) -> BrowserSession:
+        browser_session = self._browser_session()
+        if self.form.get("authenticity_token") != browser_session.token:
+            msg = "ActionController::InvalidAuthenticityToken"
+            raise StubError(422, msg)
+        return browser_session
+
+    def _signed_in(self, *, check_token: bool = False) -> BrowserSession:
+        browser_session = (
+            self._check_token() if check_token else self._browser_session()
+        )
+        if browser_session.email is None or browser_session.team_id is None:
+            sign_in_url = "/users/sign-in"
+            raise RedirectError(sign_in_url)
+        return browser_session
+
+    # signing in
+
+    def _get_start(self) -> None:
+        self._html(pages.start())
+
+    def _get_sign_in(self) -> None:
+        self._html(pages.sign_in(self._browser_session().token))
+
+    def _post_sign_in(self) -> None:
+        browser_session = self._check_token()
+        email = self.form.get("user[email]", "")
+        password = self.form.get("user[password]", "")
+        # before anything is onboarded, any user can sign in
+        if not email or (self.store.users and self.store.users.get(email) != password):
+            self._html(
+                pages.sign_in(browser_session.token, "Invalid Email or password."),
+                status=422,
+            )
+            return
+        browser_session.email = email
+        browser_session.team_id = None
+        browser_session.rotate_token()
+        self._redirect("/users/teams")
+
+    def _get_teams(self) -> None:
+        browser_session = self._browser_session()
+        if browser_session.email is None:
+            self._redirect("/users/sign-in")
+            return
+        self._html(pages.select_team(browser_session.token, TEAMS))
+
+    def _post_teams(self) -> None:
+        browser_session = self._check_token()
+        team_id = self.form.get("select_team_form[team_id]")
+        if team_id not in dict(TEAMS):
+            msg = f"No team {team_id}"
+            raise StubError(422, msg)
+        browser_session.team_id = team_id
+        self._redirect("/sessions")
+
+    def _post_logout(self) -> None:
+        browser_session = self._check_token()
+        browser_session.email = browser_session.team_id = None
+        browser_session.rotate_token()
+        self._redirect("/start")
+
+    # sessions and recording vaccinations
+
+    def _session(self, session_id: str) -> Session:
+        try:
+            return self.store.sessions[session_id]
+        except KeyError:
+            msg = f"No session {session_id}"
+            raise StubError(404, msg) from None
+
+    def _patient(self, session_id: str, patient_id: str) -> Patient:
+        try:
+            return self._session(session_id).patients[patient_id]
+        except KeyError:
+            msg = f"No patient {patient_id} in session {session_id}"
+            raise StubError(404, msg) from None
+
+    def _get_sessions(self) -> None:
+        browser_session = self._signed_in()
+        self._html(
+            pages.sessions(
+                browser_session.token,
+                [
+                    (session.id, session.school_name)
+                    for session in self.store.sessions.values()
+                ],
+            )
+        )
+
+    def _get_session(self, session_id: str) -> None:
+        browser_session = self._signed_in()
+        session = self._session(session_id)
+        self._html(
+            pages.session(
+                browser_session.token,
+                session.id,
+                session.school_name,
+                len(session.patients),
+            )
+        )
+
+    def _get_offline_spreadsheet(self, session_id: str) -> None:
+        self._signed_in()
+        session = self._session(session_id)
+        body = write_workbook(
+            OFFLINE_SHEET, OFFLINE_COLUMNS, self.store.offline_rows(session)
+        )
+        self._send(200, body, XLSX_CONTENT_TYPE)
+
+    def _get_register(self, session_id: str) -> None:
+        browser_session = self._signed_in()
+        session = self._session(session_id)
+        words = self.query.get("q", "").lower().split()
+        self._html(
+            pages.register(
+                browser_session.token,
+                session.id,
+                [
+                    (
+                        patient.id,
+                        patient.programme_types[0],
+                        patient.register_name,
+                        patient.attending,
+                    )
+                    for patient in session.patients.values()
+                    if all(
+                        word in f"{patient.first_name} {patient.last_name}".lower()
+                        for word in words
+                    )
+                ],
+            )
+        )
+
+    def _post_attending(self, session_id: str, patient_id: str) -> None:
+        self._signed_in(check_token=True)
+        self._patient(session_id, patient_id).attending = True
+        self._redirect(f"/sessions/{session_id}/patients")
+
+    def _get_patient_session(
+        self, session_id: str, patient_id: str, programme_type: str
+    ) -> None:
+        browser_session = self._signed_in()
+        patient = self._patient(session_id, patient_id)
+        if programme_type not in patient.programme_types:
+            msg = f"Patient {patient_id} is not due {programme_type}"
+            raise StubError(404, msg)
+        self._html(
+            pages.patient_session(
+                browser_session.token,
+                session_id,
+                patient_id,
+                programme_type,
+                PROGRAMMES[programme_type][1],
+                f"{patient.first_name} {patient.last_name}",
+            )
+        )
+
+    def _post_vaccinate(
+        self, session_id: str, patient_id: str, programme_type: str
+    ) -> None:
+        browser_session = self._signed_in(check_token=True)
+        self._patient(session_id, patient_id)
+        if (
+            self.form.get("vaccinate_form[programme_id]")
+            != PROGRAMMES.get(programme_type, ("", ""))[1]
+        ):
+            msg = "Programme does not match"
+            raise StubError(422, msg)
+        browser_session.draft_vaccination = {
+            "session_id": session_id,
+            "patient_id": patient_id,
+            "programme_type": programme_type,
+        }
+        self._redirect("/draft-vaccination-record/batch")
+
+    def _draft_vaccination(self, *, check_token: bool = False) -> dict[str, str]:
+        draft = self._signed_in(check_token=check_token).draft_vaccination
+        if not draft:
+            msg = "No vaccination record in progress"
+            raise StubError(404, msg)
+        return draft
+
+    def _get_batch(self) -> None:
+        draft = self._draft_vaccination()
+        self._html(
+            pages.batch(
+                self._browser_session().token,
+                PROGRAMMES[draft["programme_type"]][2],
+            )
+        )
+
+    def _post_batch(self) -> None:
+        draft = self._draft_vaccination(check_token=True)
+        batch_id = self.form.get("draft_vaccination_record[batch_id]", "")
+        if (
+            not batch_id.isdigit()
+            or int(batch_id) not in (PROGRAMMES[draft["programme_type"]][2])
+        ):
+            msg = f"No batch {batch_id}"
+            raise StubError(422, msg)
+        draft["batch_id"] = batch_id
+        self._redirect("/draft-vaccination-record/confirm")
+
+    def _get_vaccination_confirm(self) -> None:
+        draft = self._draft_vaccination()
+        patient = self._patient(draft["session_id"], draft["patient_id"])
+        self._html(
+            pages.vaccination_confirm(
+                self._browser_session().token,
+                f"{patient.first_name} {patient.last_name}",
+            )
+        )
+
+    def _post_vaccination_confirm(self) -> None:
+        browser_session = self._signed_in(check_token=True)
+        draft = self._draft_vaccination()
+        if "batch_id" not in draft:
+            batch_url = "/draft-vaccination-record/batch"
+            raise RedirectError(batch_url)
+        patient = self._patient(draft["session_id"], draft["patient_id"])
+        with self.store.lock:
+            patient.vaccinated[draft["programme_type"]] = int(draft["batch_id"])
+        browser_session.draft_vaccination = {}
+        self._redirect(
+            f"/sessions/{draft['session_id']}/patients/{draft['patient_id']}"
+            f"/{draft['programme_type']}"
+        )
+
+    # parental consent
+
+    def _consent_form(self, consent_id: str) -> ConsentForm:
+        try:
+            return self.store.consent_forms[consent_id]
+        except KeyError:
+            msg = f"No consent form {consent_id}"
+            raise StubError(404, msg) from None
+
+    def _get_consent_start(self, session_id: str, programme_types: str) -> None:
+        self._session(session_id)
+        self._html(
+            pages.consent_start(
+                self._browser_session().token, session_id, programme_types
+            )
+        )
+
+    def _post_consent_start(self) -> None:
+        self._check_token()
+        consent_form = self.store.create_consent_form(
+            self.form.get("session_slug_or_team_location_id", ""),
+            tuple(self.form.get("programme_types", "").split("-")),
+        )
+        self._redirect(f"/consents/{consent_form.id}/edit/name")
+
+    def _get_consent_step(self, consent_id: str, step: str) -> None:
+        self._consent_form(consent_id)
+        self._html(
+            pages.consent_step(
+                self._browser_session().token,
+                consent_id,
+                step,
+                step.replace("-", " ").capitalize(),
+            )
+        )
+
+    def _post_consent_step(self, consent_id: str, step: str) -> None:
+        self._check_token()
+        consent_form = self._consent_form(consent_id)
+        for key, value in self.form.items():
+            if key.startswith("consent_form["):
+                consent_form.answers[key.removeprefix("consent_form[")[:-1]] = value
+        next_step = consent_form.next_step(step)
+        if next_step is None:
+            self._redirect(f"/consents/{consent_id}/confirm")
+        else:
+            self._redirect(f"/consents/{consent_id}/edit/{next_step}")
+
+    def _get_consent_confirm(self, consent_id: str) -> None:
+        consent_form = self._consent_form(consent_id)
+        self._html(
+            pages.consent_confirm(
+                self._browser_session().token, consent_id, consent_form.answers
+            )
+        )
+
+    def _post_consent_record(self, consent_id: str) -> None:
+        self._check_token()
+        consent_form = self._consent_form(consent_id)
+        if consent_form.health_questions_answered < consent_form.health_questions:
+            msg = "The consent form has not been completed"
+            raise StubError(422, msg)
+        self.store.record_consent(consent_form)
+        name = (
+            f"{consent_form.answers.get('given_name', '')}"
+            f" {consent_form.answers.get('family_name', '')}"
+        )
+        self._redirect(f"/consents/{consent_id}/confirmation?name={name}")
+
+    def _get_consent_confirmation(self, consent_id: str) -> None:  # noqa: ARG002
+        self._html(pages.consent_confirmation(self.query.get("name", "")))
+
+    # testing API
+
+    def _get_import_status(self, path: str, match: re.Match[str]) -> None:
+        with self.store.lock:
+            polls = self.poll_counts.get(path, 0) + 1
+            self.poll_counts[path] = polls
+        status = (
+            self.config["final_status"]
+            if polls > self.config["polls_until_processed"]
+            else "pending_import"
+        )
+        self._json(
+            {
+                "id": int(match["import_id"]),
+                "type": match["import_type"],
+                "status": status,
+            }
+        )
+
+    def _get_locations(self) -> None:
+        self._json(self.store.locations())
+
+    def _get_refresh_reporting(self) -> None:
+        self._json({})
+
+    def _post_onboard(self) -> None:
+        try:
+            onboarding = json.loads(self.body)
+            self.store.onboard(onboarding)
+        except (json.JSONDecodeError, KeyError, TypeError) as exc:
+            msg = f"Invalid onboarding: {exc}"
+            raise StubError(422, msg) from None
+        self._json({}, status=201)
+
+    def _delete_team(self, workgroup: str) -> None:
+        self.store.delete_team(
+            workgroup, keep_itself=self.query.get("keep_itself") == "true"
+        )
+        self._send(204, b"", "text/plain; charset=utf-8")
+
+    def _delete_team_locations(self, workgroup: str) -> None:
+        self.store.delete_team_locations(
+            workgroup,
+            keep_base_locations=self.query.get("keep_base_locations") == "true",
+        )
+        self._send(204, b"", "text/plain; charset=utf-8")
+
+    # responses
+
+    def _html(self, page: str, status: int = 200) -> None:
+        self._send(status, page.encode(), "text/html; charset=utf-8")
+
+    def _json(self, data: object, status: int = 200) -> None:
+        self._send(status, json.dumps(data).encode(), "application/json")
+
+    def _redirect(self, location: str) -> None:
+        # 303, so clients follow a redirected POST with a GET
+        self._send(303, b"", "text/html; charset=utf-8", location=location)
+
+    def _send(
+        self, status: int, body: bytes, content_type: str, location: str = ""
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if location:
+            self.send_header("Location", location)
+        if self.cookie:
+            self.send_header(
+                "Set-Cookie", f"{SESSION_COOKIE}={self.cookie}; path=/; HttpOnly"
+            )
+        self.end_headers()
+        self.wfile.write(body)
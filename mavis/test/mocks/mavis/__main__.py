@@ -0,0 +1,108 @@
+"""
+Entry point for running the Mavis stub.
+
+Usage:
+    python -m mavis.test.mocks.mavis [--host 127.0.0.1] [--port 4001]
+      [--polls-until-processed 3] [--final-status processed]
+      [--no-import-status]
+      [--latency-ms 0] [--latency-jitter-ms 0]
+      [--latency-distribution uniform|exponential|lognormal]
+      [--sessions 5] [--patients-per-session 200] [--consented-fraction 0.5]
+      [--seed 1]
+
+Sign in is at:        GET|POST /users/sign-in, then /users/teams
+Sessions are at:      GET /sessions, /sessions/<id>, /sessions/<id>.xlsx
+Consent forms are at: GET /consents/<session id>/<programme types>/start
+Import status is at:  GET /api/testing/<class|cohort|immunisation>-imports/<id>
+Onboarding is at:     POST /api/testing/onboard
+Healthcheck is at:    GET /health
+
+Before any team is onboarded, any email address and password signs in.
+Point BASE_URL at http://<host>:<port>/ to run the load test journeys
+against it.
+"""
+
+import argparse
+import logging
+import typing
+
+from mavis.test.mocks.mavis import (
+    LatencyDistribution,
+    MavisStubHandler,
+    MavisStubServer,
+    default_config,
+)
+from mavis.test.mocks.mavis.store import MavisStore
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 4001
+DEFAULT_SESSIONS = 5
+DEFAULT_PATIENTS_PER_SESSION = 200
+DEFAULT_CONSENTED_FRACTION = 0.5
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    defaults = default_config(DEFAULT_HOST, DEFAULT_PORT)
+
+    parser = argparse.ArgumentParser(description="Mavis stub server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--polls-until-processed",
+        type=int,
+        default=defaults["polls_until_processed"],
+    )
+    parser.add_argument("--final-status", default=defaults["final_status"])
+    parser.add_argument(
+        "--no-import-status",
+        action="store_false",
+        dest="import_status_available",
+        help="answer 404 for import statuses, as a Mavis without that endpoint",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0)
+    parser.add_argument(
+        "--latency-distribution",
+        default=defaults["latency_distribution"],
+        choices=typing.get_args(LatencyDistribution.__value__),
+    )
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument(
+        "--patients-per-session", type=int, default=DEFAULT_PATIENTS_PER_SESSION
+    )
+    parser.add_argument(
+        "--consented-fraction", type=float, default=DEFAULT_CONSENTED_FRACTION
+    )
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = default_config(args.host, args.port)
+    config.update(
+        {
+            "import_status_available": args.import_status_available,
+            "polls_until_processed": args.polls_until_processed,
+            "final_status": args.final_status,
+            "latency_seconds": args.latency_ms / 1000,
+            "latency_jitter_seconds": args.latency_jitter_ms / 1000,
+            "latency_distribution": args.latency_distribution,
+        }
+    )
+    store = MavisStore.generate(
+        args.sessions, args.patients_per_session, args.consented_fraction, args.seed
+    )
+
+    server = MavisStubServer(
+        (args.host, args.port), MavisStubHandler.make_handler(config, store)
+    )
+    log.info("Mavis stub listening on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("Shutting down")
+
+
+if __name__ == "__main__":
+    main()
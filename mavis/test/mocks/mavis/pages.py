@@ -0,0 +1,271 @@
+"""HTML for the pages the load test journeys visit.
+
+The markup follows what Mavis renders closely enough for the patterns in
+mavis.test.load to find their forms, tokens and links. Forms are written on
+one line where those patterns don't match across lines.
+"""
+
+from collections.abc import Iterable
+from html import escape
+
+LAYOUT = """<!DOCTYPE html>
+<html lang="en" class="govuk-template">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title} – Manage vaccinations in schools</title>
+<link rel="stylesheet" href="/assets/application.css">
+</head>
+<body class="nhsuk-frontend-supported">
+<header class="nhsuk-header" role="banner">
+<div class="nhsuk-header__container">
+<a class="nhsuk-header__link" href="/dashboard">Manage vaccinations in schools</a>
+</div>
+{navigation}
+</header>
+<main class="nhsuk-main-wrapper" id="main-content" role="main">
+<div class="nhsuk-width-container">
+<h1 class="nhsuk-heading-l">{title}</h1>
+{body}
+</div>
+</main>
+<footer role="contentinfo"><div class="nhsuk-footer-container">
+<a class="nhsuk-footer__list-item-link" href="/accessibility">Accessibility</a>
+<a class="nhsuk-footer__list-item-link" href="/privacy">Privacy</a>
+</div></footer>
+</body>
+</html>
+"""
+
+NAVIGATION = """<nav class="nhsuk-navigation" aria-label="Menu">
+<ul class="nhsuk-header__navigation-list">
+<li class="nhsuk-header__navigation-item"><a class="nhsuk-header__navigation-link" href="/programmes">Programmes</a></li>
+<li class="nhsuk-header__navigation-item"><a class="nhsuk-header__navigation-link" href="/sessions">Sessions</a></li>
+<li class="nhsuk-header__navigation-item"><a class="nhsuk-header__navigation-link" href="/patients">Children</a></li>
+</ul>
+<form class="button_to" method="post" action="/logout"><input type="hidden" name="_method" value="delete" autocomplete="off" /><button class="nhsuk-header__navigation-link" type="submit">Log out</button><input type="hidden" name="authenticity_token" value="{token}" autocomplete="off" /></form>
+</nav>"""  # noqa: E501
+
+
+def _token_field(token: str) -> str:
+    return (
+        '<input type="hidden" name="authenticity_token" '
+        f'value="{escape(token)}" autocomplete="off" />'
+    )
+
+
+def _form(action: str, token: str, fields: str, button: str) -> str:
+    return f"""<form action="{action}" accept-charset="UTF-8" method="post">
+<input type="hidden" name="_method" value="put" autocomplete="off" />
+{_token_field(token)}
+{fields}
+<button type="submit" class="nhsuk-button" data-module="nhsuk-button">{button}</button>
+</form>"""
+
+
+def layout(title: str, body: str, *, log_out_token: str | None = None) -> str:
+    return LAYOUT.format(
+        title=escape(title),
+        body=body,
+        navigation=NAVIGATION.format(token=escape(log_out_token))
+        if log_out_token
+        else "",
+    )
+
+
+def start() -> str:
+    return layout(
+        "Manage vaccinations in schools",
+        '<a href="/users/sign-in" class="nhsuk-button">Start now</a>',
+    )
+
+
+def sign_in(token: str, error: str = "") -> str:
+    error_summary = (
+        f'<div class="nhsuk-error-summary" role="alert"><p>{escape(error)}</p></div>'
+        if error
+        else ""
+    )
+    return layout(
+        "Log in",
+        f"""{error_summary}
+<form class="new_user" action="/users/sign-in" accept-charset="UTF-8" method="post">
+{_token_field(token)}
+<label class="nhsuk-label" for="user_email">Email address</label>
+<input class="nhsuk-input" type="email" name="user[email]" id="user_email" />
+<label class="nhsuk-label" for="user_password">Password</label>
+<input class="nhsuk-input" type="password" name="user[password]" id="user_password" />
+<button type="submit" class="nhsuk-button">Log in</button>
+</form>""",
+    )
+
+
+def select_team(token: str, teams: Iterable[tuple[str, str]]) -> str:
+    radios = "\n".join(
+        f"""<div class="nhsuk-radios__item">
+<input class="nhsuk-radios__input" type="radio" value="{escape(team_id)}" name="select_team_form[team_id]" id="select-team-form-team-id-{escape(team_id)}-field" />
+<label class="nhsuk-label nhsuk-radios__label" for="select-team-form-team-id-{escape(team_id)}-field">{escape(name)}</label>
+</div>"""  # noqa: E501
+        for team_id, name in teams
+    )
+    return layout(
+        "Select a team",
+        f"""<form action="/users/teams" accept-charset="UTF-8" method="post">
+{_token_field(token)}
+<div class="nhsuk-radios">
+{radios}
+</div>
+<button type="submit" class="nhsuk-button">Continue</button>
+</form>""",
+    )
+
+
+def sessions(token: str, sessions: Iterable[tuple[str, str]]) -> str:
+    rows = "\n".join(
+        f"""<div class="nhsuk-card app-card--session">
+<h4 class="nhsuk-card__heading"><a class="nhsuk-link" href="/sessions/{escape(session_id)}">{escape(school)}</a></h4>
+<dl class="nhsuk-summary-list"><dt class="nhsuk-summary-list__key">Status</dt><dd class="nhsuk-summary-list__value">Scheduled</dd></dl>
+</div>"""  # noqa: E501
+        for session_id, school in sessions
+    )
+    return layout("Sessions", rows, log_out_token=token)
+
+
+def session(token: str, session_id: str, school: str, patients: int) -> str:
+    return layout(
+        school,
+        f"""<p class="nhsuk-body">{patients} children in this session</p>
+<a class="nhsuk-link" href="/sessions/{escape(session_id)}/patients">Register</a>
+<a class="nhsuk-link" href="/sessions/{escape(session_id)}.xlsx">Record offline</a>""",
+        log_out_token=token,
+    )
+
+
+def register(
+    token: str, session_id: str, patients: Iterable[tuple[str, str, str, bool]]
+) -> str:
+    """The session register, for (patient id, programme type, name, attending)."""
+    cards = []
+    for patient_id, programme_type, name, attending in patients:
+        status = "Attending session" if attending else "Not registered yet"
+        colour = "green" if attending else "grey"
+        present_url = (
+            f"/sessions/{escape(session_id)}/patients/{escape(patient_id)}"
+            "/register/present"
+        )
+        attending_button = (
+            ""
+            if attending
+            else f'<form class="button_to" method="post" action="{present_url}">'
+            '<button class="nhsuk-button app-button--secondary" type="submit">'
+            f"Attending</button>{_token_field(token)}</form>"
+        )
+        cards.append(
+            f"""<div class="nhsuk-card app-card--patient">
+<h4 class="nhsuk-card__heading">
+<a class="nhsuk-link" href="/sessions/{escape(session_id)}/patients/{escape(patient_id)}/{escape(programme_type)}?return_to=patients">{escape(name)}</a>
+</h4>
+<dl class="nhsuk-summary-list"><dt class="nhsuk-summary-list__key">Registration status</dt><dd class="nhsuk-summary-list__value"><strong class="nhsuk-tag nhsuk-tag--{colour}">{status}</strong></dd></dl>
+{attending_button}
+</div>"""  # noqa: E501
+        )
+    return layout("Register", "\n".join(cards), log_out_token=token)
+
+
+def patient_session(  # noqa: PLR0913
+    token: str,
+    session_id: str,
+    patient_id: str,
+    programme_type: str,
+    programme_id: str,
+    name: str,
+) -> str:
+    action = (
+        f"/sessions/{escape(session_id)}/patients/{escape(patient_id)}"
+        f"/{escape(programme_type)}/vaccinations"
+    )
+    return layout(
+        name,
+        f"""<h2 class="nhsuk-heading-m">Is {escape(name)} ready for their vaccination?</h2>
+<form action="{action}" accept-charset="UTF-8" method="post">{_token_field(token)}
+<input value="{escape(programme_id)}" autocomplete="off" type="hidden" name="vaccinate_form[programme_id]" id="vaccinate_form_programme_id" />
+<input type="checkbox" value="1" name="vaccinate_form[pre_screening_confirmed]" />
+<textarea name="vaccinate_form[pre_screening_notes]"></textarea>
+<button type="submit" class="nhsuk-button">Continue</button>
+</form>""",  # noqa: E501
+        log_out_token=token,
+    )
+
+
+def batch(token: str, batch_ids: Iterable[int]) -> str:
+    radios = "\n".join(
+        f'<input id="draft-vaccination-record-batch-id-{batch_id}-field" '
+        f'class="nhsuk-radios__input" type="radio" value="{batch_id}" '
+        'name="draft_vaccination_record[batch_id]" />'
+        for batch_id in batch_ids
+    )
+    return layout(
+        "Which batch did you use?",
+        f"""<form action="/draft-vaccination-record/batch" accept-charset="UTF-8" method="post"><input type="hidden" name="_method" value="put" autocomplete="off" />{_token_field(token)}
+{radios}
+<button type="submit" class="nhsuk-button">Continue</button>
+</form>""",  # noqa: E501
+        log_out_token=token,
+    )
+
+
+def vaccination_confirm(token: str, name: str) -> str:
+    return layout(
+        "Check and confirm",
+        f"""<p class="nhsuk-body">Child: {escape(name)}</p>
+{_form("/draft-vaccination-record/confirm", token, '<textarea name="draft_vaccination_record[notes]"></textarea>', "Confirm")}""",  # noqa: E501
+        log_out_token=token,
+    )
+
+
+def consent_start(token: str, session_id: str, programme_types: str) -> str:
+    return layout(
+        "Give or refuse consent for vaccinations",
+        f"""<form action="/consents" accept-charset="UTF-8" method="post">
+{_token_field(token)}
+<input type="hidden" name="session_slug_or_team_location_id" id="session_slug_or_team_location_id" value="{escape(session_id)}" autocomplete="off" />
+<input type="hidden" name="programme_types" id="programme_types" value="{escape(programme_types)}" autocomplete="off" />
+<button type="submit" class="nhsuk-button">Start now</button>
+</form>""",  # noqa: E501
+    )
+
+
+def consent_step(token: str, consent_id: str, step: str, question: str) -> str:
+    return layout(
+        question,
+        _form(
+            f"/consents/{escape(consent_id)}/edit/{escape(step)}",
+            token,
+            '<div class="nhsuk-form-group"></div>',
+            "Continue",
+        ),
+    )
+
+
+def consent_confirm(token: str, consent_id: str, answers: dict[str, str]) -> str:
+    rows = "\n".join(
+        f'<div class="nhsuk-summary-list__row"><dt class="nhsuk-summary-list__key">'
+        f'{escape(key)}</dt><dd class="nhsuk-summary-list__value">{escape(value)}'
+        "</dd></div>"
+        for key, value in answers.items()
+    )
+    return layout(
+        "Check and confirm",
+        f"""<dl class="nhsuk-summary-list">
+{rows}
+</dl>
+<h2 class="nhsuk-heading-m">Confirm</h2>
+{_form(f"/consents/{escape(consent_id)}/record", token, "", "Confirm")}""",
+    )
+
+
+def consent_confirmation(name: str) -> str:
+    return layout(
+        f"Consent confirmed for {name}",
+        '<p class="nhsuk-body">We have sent you a confirmation email.</p>',
+    )
@@ -0,0 +1,84 @@
+"""Writes single-sheet XLSX workbooks with the standard library only, so the stub
+can serve offline spreadsheets without openpyxl.
+"""
+
+import io
+import zipfile
+from xml.sax.saxutils import escape
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+</Types>"""  # noqa: E501
+
+ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""  # noqa: E501
+
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+</Relationships>"""  # noqa: E501
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _cell(reference: str, value: object) -> str:
+    if value is None or value == "":
+        return ""
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    return f'<c r="{reference}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def _worksheet(columns: list[str], rows: list[dict[str, object]]) -> str:
+    letters = [_column_letter(index) for index in range(len(columns))]
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">',
+        # openpyxl pads short rows out to the dimension when reading
+        f'<dimension ref="A1:{letters[-1]}{len(rows) + 1}"/>',
+        "<sheetData>",
+    ]
+    for row_number, values in enumerate(
+        [dict(zip(columns, columns, strict=True)), *rows], 1
+    ):
+        cells = "".join(
+            _cell(f"{letter}{row_number}", values.get(column))
+            for letter, column in zip(letters, columns, strict=True)
+        )
+        lines.append(f'<row r="{row_number}">{cells}</row>')
+    lines += ["</sheetData>", "</worksheet>"]
+    return "\n".join(lines)
+
+
+def write_workbook(
+    sheet_name: str, columns: list[str], rows: list[dict[str, object]]
+) -> bytes:
+    """A workbook with one sheet of rows under a header row of columns."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr("[Content_Types].xml", CONTENT_TYPES)
+        workbook.writestr("_rels/.rels", ROOT_RELS)
+        workbook.writestr("xl/workbook.xml", WORKBOOK.format(sheet_name=sheet_name))
+        workbook.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        workbook.writestr("xl/worksheets/sheet1.xml", _worksheet(columns, rows))
+    return buffer.getvalue()
@@ -0,0 +1,363 @@
+"""In-memory state of the Mavis stub: generated school sessions and patients,
+onboarded teams, browser sessions and parents' consent forms.
+"""
+
+import random
+import secrets
+import string
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+
+# programme type: (name in offline spreadsheets, programme id, batch ids)
+PROGRAMMES = {
+    "flu": ("Flu", "1", (11, 12)),
+    "hpv": ("HPV", "2", (21, 22)),
+    "menacwy": ("ACWYX4", "3", (31, 32)),
+    "mmr": ("MMR(V)", "4", (41, 42)),
+    "td_ipv": ("3-in-1", "5", (51, 52)),
+}
+# the programmes a child can be due together, with a year group to be in
+PROGRAMME_GROUPS = [
+    (("flu",), 4),
+    (("hpv",), 8),
+    (("menacwy", "td_ipv"), 9),
+    (("mmr",), 2),
+]
+
+# how many health questions parents are asked online, as in
+# Programme.health_questions
+HEALTH_QUESTIONS = {
+    "flu": 5,
+    "flu-nasal": 9,
+    "flu-nasal-or-injection": 11,
+    "hpv": 6,
+    "menacwy": 5,
+    "td_ipv": 5,
+    "menacwy-td_ipv": 6,
+    "mmr": 9,
+}
+
+FIRST_NAMES = [
+    "Amelia", "Arlo", "Ava", "Elsie", "Ezra", "Finley", "Freya", "George",
+    "Harper", "Isla", "Jack", "Leo", "Lily", "Luca", "Mia", "Noah", "Oliver",
+    "Olivia", "Theo", "Willow",
+]  # fmt: skip
+LAST_NAMES = [
+    "Ahmed", "Brown", "Clarke", "Davies", "Evans", "Green", "Hughes", "Jones",
+    "Khan", "Lewis", "Morris", "O'Brien", "Patel", "Roberts", "Singh", "Smith",
+    "Taylor", "Thomas", "Walker", "Wilson",
+]  # fmt: skip
+SCHOOL_NAMES = [
+    "Ash Grove Primary", "Beech Hill Academy", "Cedar Park School",
+    "Elm Tree Primary", "Hazel Wood High", "Maple Lane Academy",
+    "Oak Field School", "Rowan Vale Primary", "Willow Bank High",
+    "Yew Tree Academy",
+]  # fmt: skip
+
+SESSION_ID_ALPHABET = string.ascii_letters + string.digits
+SESSION_ID_LENGTH = 10
+
+OFFLINE_SHEET = "Vaccinations"
+OFFLINE_COLUMNS = [
+    "ORGANISATION_CODE",
+    "SCHOOL_URN",
+    "SCHOOL_NAME",
+    "NHS_NUMBER",
+    "PERSON_FORENAME",
+    "PERSON_SURNAME",
+    "PERSON_DOB",
+    "YEAR_GROUP",
+    "PERSON_ADDRESS_LINE_1",
+    "PERSON_POSTCODE",
+    "PROGRAMME",
+    "CONSENT_STATUS",
+    "CONSENT_DETAILS",
+    "VACCINATED",
+    "BATCH_NUMBER",
+]
+
+
+class StubError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _nhs_number(rng: random.Random) -> str:
+    """A random NHS number in the 999 test range with a valid check digit."""
+    while True:
+        digits = [9, 9, 9, *(rng.randrange(10) for _ in range(6))]
+        check = 11 - sum(d * (10 - i) for i, d in enumerate(digits)) % 11
+        if check == 11:  # noqa: PLR2004
+            check = 0
+        if check != 10:  # noqa: PLR2004
+            return "".join(map(str, digits)) + str(check)
+
+
+@dataclass
+class Patient:
+    id: str
+    first_name: str
+    last_name: str
+    nhs_number: str
+    date_of_birth: date
+    year_group: int
+    programme_types: tuple[str, ...]
+    consented: set[str] = field(default_factory=set)
+    vaccinated: dict[str, int] = field(default_factory=dict)
+    attending: bool = False
+
+    @property
+    def register_name(self) -> str:
+        return f"{self.last_name.upper()}, {self.first_name}"
+
+
+@dataclass
+class Session:
+    id: str
+    school_name: str
+    school_urn: str
+    patients: dict[str, Patient] = field(default_factory=dict)
+
+
+@dataclass
+class BrowserSession:
+    """What Mavis keeps in a browser's session cookie."""
+
+    token: str = field(default_factory=lambda: secrets.token_urlsafe(32))
+    email: str | None = None
+    team_id: str | None = None
+    draft_vaccination: dict[str, str] = field(default_factory=dict)
+
+    def rotate_token(self) -> None:
+        self.token = secrets.token_urlsafe(32)
+
+
+@dataclass
+class ConsentForm:
+    id: str
+    session_id: str
+    programme_types: tuple[str, ...]
+    answers: dict[str, str] = field(default_factory=dict)
+    health_questions_answered: int = 0
+
+    @property
+    def response_step(self) -> str:
+        if {"menacwy", "td_ipv"} & set(self.programme_types):
+            return "response-doubles"
+        return f"response-{self.programme_types[0]}"
+
+    @property
+    def health_questions(self) -> int:
+        key = "-".join(self.programme_types)
+        if key == "flu" and self.answers.get("response") == "given_nasal":
+            key = "flu-nasal"
+            if self.answers.get("injection_alternative") == "true":
+                key = "flu-nasal-or-injection"
+        return HEALTH_QUESTIONS[key]
+
+    def next_step(self, step: str) -> str | None:
+        """The step after step, or None once the form is ready to confirm."""
+        if step == "health-question":
+            self.health_questions_answered += 1
+            if self.health_questions_answered < self.health_questions:
+                return "health-question"
+            return None
+        if step == self.response_step:
+            return self._vaccine_preference_step() or "address"
+        steps = {
+            "name": "date-of-birth",
+            "date-of-birth": "confirm-school",
+            "confirm-school": "parent",
+            "parent": self.response_step,
+            "injection-alternative": "address",
+            "without-gelatine": "address",
+            "address": "health-question",
+        }
+        try:
+            return steps[step]
+        except KeyError:
+            msg = f"Unknown consent form step {step}"
+            raise StubError(404, msg) from None
+
+    def _vaccine_preference_step(self) -> str | None:
+        if self.programme_types == ("flu",):
+            if self.answers.get("response") == "given_nasal":
+                return "injection-alternative"
+        elif self.programme_types == ("mmr",):
+            return "without-gelatine"
+        return None
+
+
+class MavisStore:
+    """Thread-safe state shared by all of the stub's request handlers."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.sessions: dict[str, Session] = {}
+        self.browser_sessions: dict[str, BrowserSession] = {}
+        self.consent_forms: dict[str, ConsentForm] = {}
+        self.teams: dict[str, dict] = {}
+        self.users: dict[str, str] = {}
+
+    @classmethod
+    def generate(
+        cls,
+        sessions: int,
+        patients_per_session: int,
+        consented_fraction: float,
+        seed: int | None = None,
+    ) -> "MavisStore":
+        """
+        A store of scheduled school sessions, each with patients_per_session
+        children spread across the programmes. Parents of consented_fraction
+        of the children have already given consent.
+        """
+        rng = random.Random(seed)
+        store = cls()
+        names = [(first, last) for first in FIRST_NAMES for last in LAST_NAMES]
+        today = datetime.now(tz=UTC).date()
+        patient_number = 0
+        for session_number in range(sessions):
+            session_id = "".join(rng.choices(SESSION_ID_ALPHABET, k=SESSION_ID_LENGTH))
+            session = Session(
+                id=session_id,
+                school_name=f"{SCHOOL_NAMES[session_number % len(SCHOOL_NAMES)]}"
+                f" {session_number // len(SCHOOL_NAMES) + 1}",
+                school_urn=str(100000 + session_number),
+            )
+            for index, (first_name, last_name) in enumerate(
+                rng.sample(names, k=min(patients_per_session, len(names)))
+            ):
+                programme_types, year_group = PROGRAMME_GROUPS[
+                    index % len(PROGRAMME_GROUPS)
+                ]
+                patient_number += 1
+                patient = Patient(
+                    id=str(patient_number),
+                    first_name=first_name,
+                    last_name=last_name,
+                    nhs_number=_nhs_number(rng),
+                    date_of_birth=date(
+                        today.year - year_group - 6,
+                        rng.randint(9, 12),
+                        rng.randint(1, 28),
+                    ),
+                    year_group=year_group,
+                    programme_types=programme_types,
+                )
+                if rng.random() < consented_fraction:
+                    patient.consented = set(programme_types)
+                session.patients[patient.id] = patient
+            store.sessions[session_id] = session
+        return store
+
+    def create_consent_form(
+        self, session_id: str, programme_types: tuple[str, ...]
+    ) -> ConsentForm:
+        if session_id not in self.sessions:
+            msg = f"No session {session_id}"
+            raise StubError(404, msg)
+        if not programme_types or not set(programme_types) <= set(PROGRAMMES):
+            msg = f"Unknown programmes {'-'.join(programme_types)}"
+            raise StubError(404, msg)
+        consent_form = ConsentForm(
+            id=uuid.uuid4().hex[:12],
+            session_id=session_id,
+            programme_types=programme_types,
+        )
+        with self.lock:
+            self.consent_forms[consent_form.id] = consent_form
+        return consent_form
+
+    def record_consent(self, consent_form: ConsentForm) -> None:
+        given_name = consent_form.answers.get("given_name", "").lower()
+        family_name = consent_form.answers.get("family_name", "").lower()
+        with self.lock:
+            for patient in self.sessions[consent_form.session_id].patients.values():
+                if (patient.first_name.lower(), patient.last_name.lower()) == (
+                    given_name,
+                    family_name,
+                ):
+                    patient.consented |= set(consent_form.programme_types) & set(
+                        patient.programme_types
+                    )
+            self.consent_forms.pop(consent_form.id, None)
+
+    def onboard(self, onboarding: dict) -> None:
+        workgroup = onboarding["team"]["workgroup"]
+        with self.lock:
+            if workgroup in self.teams:
+                msg = f"Team {workgroup} has already been onboarded"
+                raise StubError(422, msg)
+            self.teams[workgroup] = {
+                "name": onboarding["team"]["name"],
+                "schools": {
+                    urn
+                    for urns in onboarding.get("schools", {}).values()
+                    for urn in urns
+                },
+            }
+            for user in onboarding.get("users", []):
+                self.users[user["email"]] = user["password"]
+
+    def delete_team(self, workgroup: str, *, keep_itself: bool) -> None:
+        with self.lock:
+            if not keep_itself:
+                self.teams.pop(workgroup, None)
+
+    def delete_team_locations(
+        self, workgroup: str, *, keep_base_locations: bool
+    ) -> None:
+        with self.lock:
+            team = self.teams.get(workgroup)
+            if team and not keep_base_locations:
+                team["schools"] = set()
+
+    def locations(self) -> list[dict[str, str]]:
+        """The GIAS schools not yet attached to an onboarded team."""
+        with self.lock:
+            attached = {urn for team in self.teams.values() for urn in team["schools"]}
+        return [
+            {
+                "name": session.school_name,
+                "urn": session.school_urn,
+                "site": "",
+                "address_line_1": "1 School Lane",
+                "address_line_2": "",
+                "address_town": "Anytown",
+                "address_postcode": "SW1A 1AA",
+            }
+            for session in self.sessions.values()
+            if session.school_urn not in attached
+        ]
+
+    def offline_rows(self, session: Session) -> list[dict[str, object]]:
+        with self.lock:
+            return [
+                {
+                    "ORGANISATION_CODE": "R1L",
+                    "SCHOOL_URN": session.school_urn,
+                    "SCHOOL_NAME": session.school_name,
+                    "NHS_NUMBER": patient.nhs_number,
+                    "PERSON_FORENAME": patient.first_name,
+                    "PERSON_SURNAME": patient.last_name,
+                    "PERSON_DOB": patient.date_of_birth.isoformat(),
+                    "YEAR_GROUP": patient.year_group,
+                    "PERSON_ADDRESS_LINE_1": "1 Any Street",
+                    "PERSON_POSTCODE": "SW1A 1AA",
+                    "PROGRAMME": PROGRAMMES[programme_type][0],
+                    "CONSENT_STATUS": "Consent given"
+                    if programme_type in patient.consented
+                    else "No response",
+                    "CONSENT_DETAILS": "Online"
+                    if programme_type in patient.consented
+                    else "",
+                    "VACCINATED": "Y" if programme_type in patient.vaccinated else "",
+                    "BATCH_NUMBER": patient.vaccinated.get(programme_type, ""),
+                }
+                for patient in session.patients.values()
+                for programme_type in patient.programme_types
+            ]
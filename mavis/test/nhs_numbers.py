@@ -0,0 +1,150 @@
+import functools
+import json
+import os
+import random
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+# NHS numbers in the synthetic region start with 9, so the nine digits before the
+# check digit run from 900000000 to 999999999
+SYNTHETIC_BASE_START = 900_000_000
+SYNTHETIC_BASE_END = 1_000_000_000
+
+CHECK_DIGIT_WEIGHTS = np.arange(10, 1, -1)
+INVALID_CHECK_DIGIT = 10
+
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def _get_worker_index() -> int:
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    return int(worker_id.removeprefix("gw")) if worker_id.startswith("gw") else 0
+
+
+def _get_worker_count() -> int:
+    return int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1"))
+
+
+def calculate_check_digits(bases: np.ndarray) -> np.ndarray:
+    """Modulus 11 check digits for an array of nine digit bases.
+
+    A result of 10 means no valid NHS number exists for that base.
+    """
+    digits = (bases[:, np.newaxis] // 10 ** np.arange(8, -1, -1)) % 10
+    check_digits = 11 - (digits @ CHECK_DIGIT_WEIGHTS) % 11
+    return np.where(check_digits == 11, 0, check_digits)  # noqa: PLR2004
+
+
+class NhsNumberPool:
+    """Hands out synthetic NHS numbers that are unique across xdist workers.
+
+    The synthetic range is split into one slice per worker, and each slice is
+    halved between the valid and invalid streams, so no two pools in a test run
+    can return the same number. Numbers are generated a batch at a time by
+    walking the slice from a random starting point.
+
+    If ``state_dir`` is given, the position in the slice is written there before
+    each batch is handed out, so later runs carry on from where the last one
+    stopped instead of generating the same numbers again. Without a saved
+    position, ``seed`` fixes the starting point so the same numbers come back.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        valid: bool = True,
+        worker_index: int | None = None,
+        worker_count: int | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        state_dir: Path | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.valid = valid
+        self._random = random.Random(seed)
+        self.worker_index = (
+            _get_worker_index() if worker_index is None else worker_index
+        )
+        self.worker_count = (
+            _get_worker_count() if worker_count is None else worker_count
+        )
+        self.batch_size = batch_size
+
+        slice_size = (SYNTHETIC_BASE_END - SYNTHETIC_BASE_START) // (
+            self.worker_count * 2
+        )
+        stream_index = self.worker_index * 2 + (0 if valid else 1)
+        self.slice_start = SYNTHETIC_BASE_START + stream_index * slice_size
+        self.slice_end = self.slice_start + slice_size
+
+        self.state_path = (
+            state_dir / f"nhs_numbers_{self.worker_index}_of_{self.worker_count}"
+            f"_{'valid' if valid else 'invalid'}.json"
+            if state_dir
+            else None
+        )
+        self._cursor = self._load_cursor()
+        self._remaining_bases = slice_size
+        self._numbers: deque[str] = deque()
+
+    @classmethod
+    @functools.cache
+    def default(cls, *, valid: bool = True) -> "NhsNumberPool":
+        """The pool shared by everything generating NHS numbers in this worker.
+
+        Set NHS_NUMBER_POOL_DIR to persist its position between runs.
+        """
+        state_dir = os.environ.get("NHS_NUMBER_POOL_DIR")
+        return cls(valid=valid, state_dir=Path(state_dir) if state_dir else None)
+
+    def take(self) -> str:
+        if not self._numbers:
+            self._refill()
+        return self._numbers.popleft()
+
+    def take_many(self, quantity: int) -> list[str]:
+        return [self.take() for _ in range(quantity)]
+
+    def _refill(self) -> None:
+        while not self._numbers:
+            if self._remaining_bases <= 0:
+                msg = (
+                    f"NHS number pool for worker {self.worker_index} is exhausted "
+                    f"({'valid' if self.valid else 'invalid'} stream)"
+                )
+                raise RuntimeError(msg)
+
+            count = min(
+                self.batch_size, self._remaining_bases, self.slice_end - self._cursor
+            )
+            bases = np.arange(self._cursor, self._cursor + count, dtype=np.int64)
+            self._remaining_bases -= count
+            self._cursor += count
+            if self._cursor >= self.slice_end:
+                self._cursor = self.slice_start
+            self._save_cursor()
+
+            self._numbers.extend(self._to_nhs_numbers(bases))
+
+    def _to_nhs_numbers(self, bases: np.ndarray) -> list[str]:
+        check_digits = calculate_check_digits(bases)
+        if self.valid:
+            keep = check_digits != INVALID_CHECK_DIGIT
+            bases, check_digits = bases[keep], check_digits[keep]
+        else:
+            # any final digit is wrong when the check digit is 10
+            check_digits = (check_digits + 1) % 10
+        return [str(number) for number in (bases * 10 + check_digits).tolist()]
+
+    def _load_cursor(self) -> int:
+        if self.state_path and self.state_path.exists():
+            cursor = json.loads(self.state_path.read_text())["cursor"]
+            if self.slice_start <= cursor < self.slice_end:
+                return cursor
+        return self._random.randrange(self.slice_start, self.slice_end)
+
+    def _save_cursor(self) -> None:
+        if self.state_path:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            self.state_path.write_text(json.dumps({"cursor": self._cursor}))
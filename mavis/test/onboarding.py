@@ -1,7 +1,8 @@
+import logging
 from abc import ABC, abstractmethod
-from typing import ClassVar
+from typing import ClassVar, Self
 
-from attr import dataclass
+from attr import asdict, dataclass
 
 from mavis.test.data_models import (
     Clinic,
@@ -13,6 +14,10 @@ from mavis.test.data_models import (
     Team,
     User,
 )
+from mavis.test.testing_api import MavisTestingApiClient
+from mavis.test.utils import deliberate_sleep
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -50,6 +55,18 @@ class Onboarding(ABC):
         Must be implemented by subclasses.
         """
 
+    def to_manifest(self) -> dict[str, object]:
+        """All of the onboarding data, for from_manifest to read back."""
+        return asdict(self)
+
+    @classmethod
+    @abstractmethod
+    def from_manifest(cls, data: dict) -> Self:
+        """
+        Read back onboarding data written by to_manifest.
+        Must be implemented by subclasses.
+        """
+
 
 @dataclass
 class PointOfCareOnboarding(Onboarding):
@@ -80,6 +97,21 @@ class PointOfCareOnboarding(Onboarding):
             programmes=cls.PROGRAMMES,
         )
 
+    @classmethod
+    def from_manifest(cls, data: dict) -> "PointOfCareOnboarding":
+        return cls(
+            organisation=Organisation(**data["organisation"]),
+            team=PointOfCareTeam(**data["team"]),
+            subteam=Subteam(**data["subteam"]),
+            users={role: User(**user) for role, user in data["users"].items()},
+            clinics=[Clinic(**clinic) for clinic in data["clinics"]],
+            schools={
+                group: [School(**school) for school in schools]
+                for group, schools in data["schools"].items()
+            },
+            programmes=data["programmes"],
+        )
+
     def to_dict(self) -> dict[str, object]:
         base = self._base_dict()
         base.update(
@@ -114,5 +146,34 @@ class NationalReportingOnboarding(Onboarding):
             organisation=organisation, team=team, users=users, programmes=cls.PROGRAMMES
         )
 
+    @classmethod
+    def from_manifest(cls, data: dict) -> "NationalReportingOnboarding":
+        return cls(
+            organisation=Organisation(**data["organisation"]),
+            team=NationalReportingTeam(**data["team"]),
+            users={role: User(**user) for role, user in data["users"].items()},
+            programmes=data["programmes"],
+        )
+
     def to_dict(self) -> dict[str, object]:
         return self._base_dict()
+
+
+def create_onboarding_with_retry[T: Onboarding](
+    testing_api: MavisTestingApiClient, onboarding_data: T, max_attempts: int = 3
+) -> T:
+    for attempt in range(1, max_attempts + 1):
+        response = testing_api.post("onboard", json=onboarding_data.to_dict())
+        if response.is_success:
+            return onboarding_data
+
+        logger.warning(
+            "Onboarding request failed (attempt %s): %s", attempt, response.content
+        )
+        if attempt < max_attempts:
+            deliberate_sleep(1, "retry backoff for onboarding API")
+        else:
+            response.raise_for_status()
+
+    msg = "Failed to create onboarding data for tests"
+    raise RuntimeError(msg)
@@ -0,0 +1,550 @@
+"""
+A pool of teams onboarded ahead of a test run, for workers to lease.
+
+Onboarding a team through api/testing/onboard takes seconds per worker. The
+pool is filled beforehand, in parallel, and recorded in a JSON manifest; each
+worker then leases a ready team at session start, which is a read and a write
+of the manifest, and returns it at the end once it has been reset. The
+manifest is only changed while holding a lock file next to it, so workers on
+the same machine (or sharing the directory) never lease the same team.
+
+A lease expires after a few hours, so teams held by a worker that died
+without returning them go back into use: the next lease that finds no ready
+team resets one of them and takes it over.
+
+Set ONBOARDING_POOL to the manifest path to lease from it. Without it, or when
+no ready team fits, the fixtures onboard a team of their own as before.
+
+Usage:
+    python -m mavis.test.onboarding_pool fill --point-of-care 8 \\
+        --national-reporting 8 [--school-year-groups 7 8 9 10 11]
+    python -m mavis.test.onboarding_pool status
+    python -m mavis.test.onboarding_pool drain
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import socket
+import tempfile
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from pathlib import Path
+
+from attr import dataclass
+
+from mavis.test.constants import Programme
+from mavis.test.data_models import Team
+from mavis.test.onboarding import (
+    NationalReportingOnboarding,
+    Onboarding,
+    PointOfCareOnboarding,
+    create_onboarding_with_retry,
+)
+from mavis.test.testing_api import MavisTestingApiClient
+from mavis.test.utils import deliberate_sleep
+
+DEFAULT_LOCK_TIMEOUT_SECONDS = 30
+# a lock older than this was left behind by a process that died holding it
+STALE_LOCK_SECONDS = 60
+LOCK_RETRY_INTERVAL_SECONDS = 0.01
+# longer than any test run, so a lease only expires if its holder died
+DEFAULT_LEASE_DURATION = timedelta(hours=6)
+DEFAULT_FILL_CONCURRENCY = 4
+
+logger = logging.getLogger(__name__)
+
+
+class PooledTeam(StrEnum):
+    POINT_OF_CARE = "point_of_care"
+    NATIONAL_REPORTING = "national_reporting"
+
+    @property
+    def onboarding_class(self) -> type[Onboarding]:
+        return {
+            PooledTeam.POINT_OF_CARE: PointOfCareOnboarding,
+            PooledTeam.NATIONAL_REPORTING: NationalReportingOnboarding,
+        }[self]
+
+
+class TeamState(StrEnum):
+    READY = "ready"
+    LEASED = "leased"
+    # couldn't be reset after a lease; left for drain to delete
+    DISCARDED = "discarded"
+
+
+@dataclass(frozen=True)
+class OnboardingLease:
+    kind: PooledTeam
+    onboarding: Onboarding
+    school_year_groups: dict[str, list[int]]
+    lease_id: str
+
+    @property
+    def workgroup(self) -> str:
+        return self.onboarding.team.workgroup
+
+    def year_groups(self) -> dict[str, int]:
+        """A year group per programme group that the team has schools for."""
+        year_groups = {}
+        for programme in Programme:
+            available = self.school_year_groups[programme.group]
+            year_groups[programme.group] = random.choice(
+                [year for year in available if year in programme.year_groups]
+                or available
+            )
+        return year_groups
+
+
+def _get_lease_holder() -> str:
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return f"{worker}@{socket.gethostname()}:{os.getpid()}"
+
+
+def _has_expired(team: dict, now: datetime) -> bool:
+    expires_at = team.get("lease_expires_at")
+    return (
+        team["state"] == TeamState.LEASED
+        and expires_at is not None
+        and datetime.fromisoformat(expires_at) <= now
+    )
+
+
+def _has_schools_for(
+    school_year_groups: dict[str, list[int]], required: dict[str, list[int]]
+) -> bool:
+    return all(
+        set(years) <= set(school_year_groups.get(group, ()))
+        for group, years in required.items()
+    )
+
+
+class OnboardingPool:
+    """
+    The manifest of pooled teams at path, with a ready list per kind of team
+    and Mavis so that a lease without requirements is a pop from its end.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT_SECONDS,
+        lease_duration: timedelta = DEFAULT_LEASE_DURATION,
+    ) -> None:
+        self.path = path
+        self.lock_path = path.with_name(f"{path.name}.lock")
+        self.lock_timeout = lock_timeout
+        self.lease_duration = lease_duration
+
+    @classmethod
+    def from_environment(cls) -> "OnboardingPool | None":
+        path = os.environ.get("ONBOARDING_POOL")
+        return cls(Path(path)) if path else None
+
+    @staticmethod
+    def _ready_key(kind: PooledTeam, base_url: str) -> str:
+        return f"{kind} {base_url.rstrip('/')}"
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # unique to this use of the lock, to tell it apart from any other
+        token = f"{_get_lease_holder()} {uuid.uuid4().hex}"
+        deadline = time.monotonic() + self.lock_timeout
+        while not self._try_lock(token):
+            if time.monotonic() > deadline:
+                msg = f"Timed out waiting for {self.lock_path}"
+                raise TimeoutError(msg)
+            deliberate_sleep(
+                LOCK_RETRY_INTERVAL_SECONDS, "another worker holds the pool lock"
+            )
+        try:
+            yield
+        finally:
+            # only if it's still this lock, in case it was broken as stale
+            if self._read_lock(self.lock_path) == token:
+                self.lock_path.unlink(missing_ok=True)
+
+    def _try_lock(self, token: str) -> bool:
+        try:
+            descriptor = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            self._break_stale_lock()
+            return False
+        with os.fdopen(descriptor, "w") as file:
+            file.write(token)
+        return True
+
+    @staticmethod
+    def _read_lock(path: Path) -> str | None:
+        try:
+            return path.read_text()
+        except FileNotFoundError:
+            return None
+
+    def _break_stale_lock(self) -> None:
+        """Remove the lock if it was left behind by a process that died."""
+        # read before its age, so that a lock taken in between looks fresh
+        token = self._read_lock(self.lock_path)
+        try:
+            age = time.time() - self.lock_path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if token is None or age <= STALE_LOCK_SECONDS:
+            return
+
+        # moved aside first, so that of the waiters that found it stale only
+        # one gets it, and removed only if it's the lock that was found stale
+        # rather than one taken since
+        moved_path = self.lock_path.with_name(
+            f"{self.lock_path.name}.{uuid.uuid4().hex}"
+        )
+        try:
+            self.lock_path.rename(moved_path)
+        except FileNotFoundError:
+            return
+        if self._read_lock(moved_path) == token:
+            logger.warning("Removed stale lock %s held by %s", self.lock_path, token)
+        else:
+            try:
+                os.link(moved_path, self.lock_path)
+            except FileExistsError:
+                logger.exception("Couldn't put back %s", self.lock_path)
+        moved_path.unlink()
+
+    def _read(self) -> dict:
+        if not self.path.exists():
+            return {"teams": {}, "ready": {}}
+        return json.loads(self.path.read_text())
+
+    def _write(self, manifest: dict) -> None:
+        # written beside the manifest and renamed over it, so a reader never
+        # sees half of it
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path.parent, suffix=".tmp", delete=False
+        ) as file:
+            json.dump(manifest, file, indent=2)
+        Path(file.name).replace(self.path)
+
+    def manifest(self) -> dict:
+        with self._locked():
+            return self._read()
+
+    def add(
+        self,
+        kind: PooledTeam,
+        base_url: str,
+        onboarding: Onboarding,
+        school_year_groups: dict[str, list[int]],
+    ) -> None:
+        workgroup = onboarding.team.workgroup
+        with self._locked():
+            manifest = self._read()
+            manifest["teams"][workgroup] = {
+                "kind": kind,
+                "base_url": base_url,
+                "school_year_groups": school_year_groups,
+                "onboarding": onboarding.to_manifest(),
+                "state": TeamState.READY,
+                "leased_by": None,
+                "lease_id": None,
+                "leased_at": None,
+                "lease_expires_at": None,
+            }
+            manifest["ready"].setdefault(self._ready_key(kind, base_url), []).append(
+                workgroup
+            )
+            self._write(manifest)
+
+    def lease(
+        self,
+        kind: PooledTeam,
+        base_url: str,
+        school_year_groups: dict[str, list[int]] | None = None,
+        *,
+        reset: Callable[[Team], None] | None = None,
+    ) -> OnboardingLease | None:
+        """
+        A ready team of this kind on this Mavis, with schools for at least
+        school_year_groups if given, or None if there isn't one.
+
+        Given a way to reset a team, a team whose lease has expired is taken
+        over and reset when no team is ready.
+        """
+        now = datetime.now(tz=UTC)
+        with self._locked():
+            manifest = self._read()
+            workgroup = self._take_ready(manifest, kind, base_url, school_year_groups)
+            if workgroup is None and reset is not None:
+                workgroup = self._take_expired(
+                    manifest, kind, base_url, school_year_groups, now
+                )
+            if workgroup is None:
+                return None
+
+            team = manifest["teams"][workgroup]
+            expired_holder = team["leased_by"]
+            lease_id = uuid.uuid4().hex
+            team.update(
+                state=TeamState.LEASED,
+                leased_by=_get_lease_holder(),
+                lease_id=lease_id,
+                leased_at=now.isoformat(),
+                lease_expires_at=(now + self.lease_duration).isoformat(),
+            )
+            self._write(manifest)
+
+        lease = OnboardingLease(
+            kind=kind,
+            onboarding=kind.onboarding_class.from_manifest(team["onboarding"]),
+            school_year_groups=team["school_year_groups"],
+            lease_id=lease_id,
+        )
+        if expired_holder is not None and reset is not None:
+            logger.warning(
+                "Taking over %s, whose lease by %s expired", workgroup, expired_holder
+            )
+            try:
+                reset(lease.onboarding.team)
+            except Exception:
+                self.discard(lease)
+                raise
+        return lease
+
+    def _take_ready(
+        self,
+        manifest: dict,
+        kind: PooledTeam,
+        base_url: str,
+        school_year_groups: dict[str, list[int]] | None,
+    ) -> str | None:
+        ready = manifest["ready"].get(self._ready_key(kind, base_url), [])
+        for index in range(len(ready) - 1, -1, -1):
+            team = manifest["teams"][ready[index]]
+            if school_year_groups is None or _has_schools_for(
+                team["school_year_groups"], school_year_groups
+            ):
+                return ready.pop(index)
+        return None
+
+    def _take_expired(
+        self,
+        manifest: dict,
+        kind: PooledTeam,
+        base_url: str,
+        school_year_groups: dict[str, list[int]] | None,
+        now: datetime,
+    ) -> str | None:
+        key = self._ready_key(kind, base_url)
+        for workgroup, team in manifest["teams"].items():
+            if (
+                self._ready_key(team["kind"], team["base_url"]) == key
+                and _has_expired(team, now)
+                and (
+                    school_year_groups is None
+                    or _has_schools_for(team["school_year_groups"], school_year_groups)
+                )
+            ):
+                return workgroup
+        return None
+
+    def _get_leased_team(self, manifest: dict, lease: OnboardingLease) -> dict | None:
+        team = manifest["teams"].get(lease.workgroup)
+        if team is None or team.get("lease_id") != lease.lease_id:
+            logger.warning(
+                "The lease of %s expired and the team was taken over", lease.workgroup
+            )
+            return None
+        return team
+
+    def release(self, lease: OnboardingLease) -> None:
+        """Return a leased team, which must have been reset, to the ready list."""
+        with self._locked():
+            manifest = self._read()
+            team = self._get_leased_team(manifest, lease)
+            if team is None:
+                return
+            team.update(
+                state=TeamState.READY,
+                leased_by=None,
+                lease_id=None,
+                leased_at=None,
+                lease_expires_at=None,
+            )
+            manifest["ready"].setdefault(
+                self._ready_key(lease.kind, team["base_url"]), []
+            ).append(lease.workgroup)
+            self._write(manifest)
+
+    def discard(self, lease: OnboardingLease) -> None:
+        """Keep a leased team out of the pool, for drain to delete."""
+        with self._locked():
+            manifest = self._read()
+            team = self._get_leased_team(manifest, lease)
+            if team is None:
+                return
+            team.update(state=TeamState.DISCARDED, lease_expires_at=None)
+            self._write(manifest)
+
+    def remove(self, workgroup: str) -> None:
+        with self._locked():
+            manifest = self._read()
+            manifest["teams"].pop(workgroup, None)
+            for ready in manifest["ready"].values():
+                with contextlib.suppress(ValueError):
+                    ready.remove(workgroup)
+            self._write(manifest)
+
+
+def _onboard(
+    pool: OnboardingPool,
+    kind: PooledTeam,
+    base_url: str,
+    school_year_groups: list[int] | None,
+) -> str:
+    testing_api = MavisTestingApiClient.for_base_url(base_url)
+    if kind == PooledTeam.NATIONAL_REPORTING:
+        year_groups = {}
+        onboarding = NationalReportingOnboarding.get_onboarding_data_for_tests()
+    else:
+        # as the session fixtures choose them, unless all teams are to have
+        # schools for the same year groups
+        year_groups = {
+            programme.group: school_year_groups
+            or [random.choice(programme.year_groups)]
+            for programme in Programme
+        }
+        onboarding = PointOfCareOnboarding.get_onboarding_data_for_tests(
+            base_url=base_url, year_groups=year_groups
+        )
+    create_onboarding_with_retry(testing_api, onboarding)
+    pool.add(kind, base_url, onboarding, year_groups)
+    return onboarding.team.workgroup
+
+
+def fill(  # noqa: PLR0913
+    pool: OnboardingPool,
+    base_url: str,
+    *,
+    point_of_care: int,
+    national_reporting: int,
+    school_year_groups: list[int] | None = None,
+    concurrency: int = DEFAULT_FILL_CONCURRENCY,
+) -> None:
+    kinds = [PooledTeam.POINT_OF_CARE] * point_of_care
+    kinds += [PooledTeam.NATIONAL_REPORTING] * national_reporting
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(_onboard, pool, kind, base_url, school_year_groups): kind
+            for kind in kinds
+        }
+        for future in as_completed(futures):
+            logger.info("Onboarded %s team %s", futures[future], future.result())
+
+
+def drain(pool: OnboardingPool, *, include_leased: bool = False) -> None:
+    """
+    Delete the pooled teams from Mavis and the manifest, other than those
+    leased (unless include_leased) whose leases haven't expired.
+    """
+    now = datetime.now(tz=UTC)
+    for workgroup, team in pool.manifest()["teams"].items():
+        if (
+            team["state"] == TeamState.LEASED
+            and not _has_expired(team, now)
+            and not include_leased
+        ):
+            logger.info("Leaving %s, leased by %s", workgroup, team["leased_by"])
+            continue
+        testing_api = MavisTestingApiClient.for_base_url(team["base_url"])
+        response = testing_api.delete(f"teams/{workgroup}")
+        if not response.is_success:
+            logger.warning(response.content)
+        response.raise_for_status()
+        pool.remove(workgroup)
+        logger.info("Deleted %s team %s", team["kind"], workgroup)
+
+
+def status(pool: OnboardingPool) -> None:
+    teams = pool.manifest()["teams"]
+    for kind in PooledTeam:
+        counts = {
+            state: sum(
+                team["kind"] == kind and team["state"] == state
+                for team in teams.values()
+            )
+            for state in TeamState
+        }
+        logger.info(
+            "%s: %s",
+            kind,
+            ", ".join(f"{count} {state}" for state, count in counts.items()),
+        )
+    for workgroup, team in teams.items():
+        if team["state"] == TeamState.LEASED:
+            logger.info(
+                "%s leased by %s at %s, until %s",
+                workgroup,
+                team["leased_by"],
+                team["leased_at"],
+                team.get("lease_expires_at"),
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=os.environ.get("ONBOARDING_POOL"),
+        required="ONBOARDING_POOL" not in os.environ,
+        help="defaults to ONBOARDING_POOL",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    fill_parser = commands.add_parser("fill", help="onboard teams into the pool")
+    fill_parser.add_argument("--base-url", default=os.environ.get("BASE_URL"))
+    fill_parser.add_argument("--point-of-care", type=int, default=0)
+    fill_parser.add_argument("--national-reporting", type=int, default=0)
+    fill_parser.add_argument(
+        "--school-year-groups",
+        type=int,
+        nargs="+",
+        help="year groups every point of care team has schools for",
+    )
+    fill_parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_FILL_CONCURRENCY
+    )
+    commands.add_parser("status", help="count the pooled teams by state")
+    drain_parser = commands.add_parser("drain", help="delete the pooled teams")
+    drain_parser.add_argument("--include-leased", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    pool = OnboardingPool(args.manifest)
+    if args.command == "fill":
+        if not args.base_url:
+            parser.error("--base-url or BASE_URL is required")
+        fill(
+            pool,
+            args.base_url,
+            point_of_care=args.point_of_care,
+            national_reporting=args.national_reporting,
+            school_year_groups=args.school_year_groups,
+            concurrency=args.concurrency,
+        )
+    elif args.command == "drain":
+        drain(pool, include_leased=args.include_leased)
+    status(pool)
+
+
+if __name__ == "__main__":
+    main()
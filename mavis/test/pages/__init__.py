@@ -15,7 +15,7 @@ from .dashboard_page import DashboardPage
 from .error_pages import BadRequestPage, PageNotFound, ServiceErrorPage
 from .flipper_page import FlipperPage
 from .imports import ImportIssuesPage, ImportRecordsWizardPage, ImportsPage
-from .log_in_page import LogInPage
+from .log_in_page import LogInPage, LogInSessionCache
 from .log_out_page import LogOutPage
 from .online_consent_wizard_page import OnlineConsentWizardPage
 from .record_vaccination_wizard_page import RecordVaccinationWizardPage
@@ -81,6 +81,7 @@ __all__ = [
     "ImportRecordsWizardPage",
     "ImportsPage",
     "LogInPage",
+    "LogInSessionCache",
     "LogOutPage",
     "MatchConsentResponsePage",
     "NurseConsentWizardPage",
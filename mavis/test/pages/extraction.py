@@ -0,0 +1,41 @@
+"""Read structured content from the page in a single round trip.
+
+Reading a value with a locator means resolving it and fetching its text, a
+round trip to the browser each. These evaluate one script in the page against
+an element instead, and return everything it contains at once, with each
+text as inner_text would have it.
+"""
+
+from playwright.sync_api import Locator
+
+_HEADED_VALUES_SCRIPT = """
+(element, headingSelector) => Array.from(
+  element.querySelectorAll(headingSelector),
+  heading => [heading.innerText, heading.nextElementSibling?.innerText ?? null],
+)
+"""
+
+_TABLE_ROWS_SCRIPT = """
+element => Array.from(
+  element.querySelectorAll("tbody tr"),
+  row => Array.from(row.querySelectorAll("td"), cell => cell.innerText),
+)
+"""
+
+
+def extract_headed_values(
+    locator: Locator, heading_selector: str
+) -> list[tuple[str, str | None]]:
+    """
+    The text of each heading matching heading_selector within locator, with the
+    text of the element after it, such as the cards of a tally.
+    """
+    return [
+        (heading, value)
+        for heading, value in locator.evaluate(_HEADED_VALUES_SCRIPT, heading_selector)
+    ]
+
+
+def extract_table_rows(locator: Locator) -> list[list[str]]:
+    """The text of the cells of each body row of a table (or a tbody)."""
+    return locator.evaluate(_TABLE_ROWS_SCRIPT)
@@ -1,4 +1,7 @@
+import os
 import re
+import time
+import urllib.parse
 from pathlib import Path
 
 from playwright.sync_api import Page, expect
@@ -8,12 +11,15 @@ from mavis.test.constants import Programme
 from mavis.test.data import FileGenerator, FileMapping, read_scenario_list_from_file
 from mavis.test.data.file_mappings import ImportFormatDetails
 from mavis.test.data_models import Child
+from mavis.test.helpers.import_status_helper import ImportStatusClient
 from mavis.test.pages.header_component import HeaderComponent
 from mavis.test.utils import (
     click_secondary_navigation_item,
     reload_until_element_is_visible,
 )
 
+IMPORT_WAIT_SECONDS = 60
+
 
 class ImportRecordsWizardPage:
     # Regex patterns for navigation and verification
@@ -249,7 +255,26 @@ class ImportRecordsWizardPage:
             .first
         )
 
-        reload_until_element_is_visible(self.page, tag, seconds=60)
+        seconds = self.wait_for_import_via_api(IMPORT_WAIT_SECONDS)
+        reload_until_element_is_visible(self.page, tag, seconds=seconds)
+
+    def wait_for_import_via_api(self, seconds: float) -> float:
+        """
+        If USE_IMPORT_STATUS_API is set, poll the testing API until the import
+        shown on this page has finished, then reload once. Otherwise, or if the
+        API cannot say, this returns straight away and the UI wait takes over.
+
+        Returns how much of the given seconds are left for waiting in the UI.
+        """
+        if os.getenv("USE_IMPORT_STATUS_API", "false").lower() != "true":
+            return seconds
+
+        start = time.monotonic()
+        url = urllib.parse.urlsplit(self.page.url)
+        client = ImportStatusClient.for_base_url(f"{url.scheme}://{url.netloc}")
+        if client.wait_until_finished(url.path, seconds=seconds):
+            self.page.reload()
+        return max(0, seconds - (time.monotonic() - start))
 
     def navigate_to_child_record_import(self) -> None:
         self.select_child_records()
@@ -333,7 +358,8 @@ class ImportRecordsWizardPage:
             .or_(self.invalid_tag)
             .or_(self.invalid_file_problem)
         ).first
-        reload_until_element_is_visible(self.page, status_text, seconds=60)
+        seconds = self.wait_for_import_via_api(IMPORT_WAIT_SECONDS)
+        reload_until_element_is_visible(self.page, status_text, seconds=seconds)
 
     @step("Click import link for {1}")
     def click_import_link(self, file_path: Path) -> None:
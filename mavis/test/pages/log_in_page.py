@@ -1,6 +1,7 @@
+import time
 from pathlib import Path
 
-from playwright.sync_api import Page, expect
+from playwright.sync_api import Page, StorageState, expect
 
 from mavis.test.annotations import step
 from mavis.test.data_models import Organisation, Team, User
@@ -111,6 +112,56 @@ class LogInPage:
         expect(self.error_message).to_be_visible()
 
 
+class LogInSessionCache:
+    """
+    Reuses the browser storage state from one real log in per user and team.
+
+    The first log in for a user and team goes through the UI and the resulting
+    storage state is kept. Later log ins add the saved cookies to the page's
+    context and load the dashboard instead. If a saved cookie has expired, or
+    Mavis no longer accepts the session (for example after a test logged out),
+    the log in goes through the UI again and the saved state is replaced.
+    """
+
+    def __init__(self) -> None:
+        self._storage_states: dict[tuple[str, str], StorageState] = {}
+
+    @step(
+        "Log in as {2} and choose team {3}, reusing a saved session if possible",
+        page_object=False,
+    )
+    def log_in(self, page: Page, user: User, team: Team) -> None:
+        key = (user.username, team.name)
+        storage_state = self._storage_states.pop(key, None)
+
+        if storage_state and self._restore(page, storage_state):
+            self._storage_states[key] = storage_state
+            return
+
+        LogInPage(page).navigate()
+        LogInPage(page).log_in_and_choose_team_if_necessary(user, team)
+        self._storage_states[key] = page.context.storage_state()
+
+    @staticmethod
+    def _has_expired(storage_state: StorageState) -> bool:
+        now = time.time()
+        # session cookies have an expiry of -1
+        return any(0 <= cookie["expires"] <= now for cookie in storage_state["cookies"])
+
+    def _restore(self, page: Page, storage_state: StorageState) -> bool:
+        if self._has_expired(storage_state):
+            return False
+
+        page.context.add_cookies(storage_state["cookies"])
+        page.goto("/dashboard")
+        page.wait_for_load_state()
+        if LogInPage(page).log_out_button.is_visible():
+            return True
+
+        page.context.clear_cookies()
+        return False
+
+
 class LogOutPage:
     def __init__(self, page: Page) -> None:
         self.page = page
@@ -1,15 +1,11 @@
-from pathlib import Path
-
 import pandas as pd
 from playwright.sync_api import Page
 
 from mavis.test.annotations import step
 from mavis.test.constants import Programme
+from mavis.test.data import get_download_cache
 from mavis.test.pages.header_component import HeaderComponent
 from mavis.test.pages.reports.reports_tabs import ReportsTabs
-from mavis.test.utils import (
-    get_current_datetime_compact,
-)
 
 
 class ReportsDownloadPage:
@@ -30,13 +26,10 @@ class ReportsDownloadPage:
         self.download_button.click()
 
     def download_and_get_dataframe(self) -> pd.DataFrame:
-        _file_path = Path(f"working/excel_{get_current_datetime_compact()}.csv")
-
         with self.page.expect_download() as download_info:
             self.click_download_button()
-        download = download_info.value
-        download.save_as(_file_path)
-        return pd.read_csv(_file_path)
+        download_cache = get_download_cache()
+        return download_cache.read_csv(download_cache.save(download_info.value))
 
     def check_vaccinated_values(
         self,
@@ -1,15 +1,16 @@
 import os
 import re
 
-import httpx
 from playwright.sync_api import Page
 
 from mavis.test.annotations import step
+from mavis.test.pages.extraction import extract_table_rows
 from mavis.test.pages.header_component import HeaderComponent
 from mavis.test.pages.reports.reports_dashboard_component import (
     ReportsDashboardComponent,
 )
 from mavis.test.pages.reports.reports_tabs import ReportsTabs
+from mavis.test.testing_api import MavisTestingApiClient
 
 
 class ReportsVaccinationsPage(ReportsDashboardComponent):
@@ -32,9 +33,7 @@ class ReportsVaccinationsPage(ReportsDashboardComponent):
         self.navigate()
 
         base_url = os.getenv("BASE_URL", "PROVIDEURL")
-        refresh_reports_url = f"{base_url}/api/testing/refresh-reporting?wait=true"
-        response = httpx.get(refresh_reports_url, timeout=60)
-        response.raise_for_status()
+        MavisTestingApiClient.for_base_url(base_url).refresh_reporting()
 
         self.page.reload()
 
@@ -72,11 +71,7 @@ class ReportsVaccinationsPage(ReportsDashboardComponent):
         table = self.page.locator("table").filter(
             has=self.page.get_by_role("columnheader", name="Month")
         )
-        rows = table.locator("tbody tr")
-        result = {}
-        for row in rows.all():
-            cells = row.locator("td")
-            month = cells.nth(0).inner_text()
-            count = int(cells.nth(1).inner_text().replace(",", ""))
-            result[month] = count
-        return result
+        return {
+            month: int(count.replace(",", ""))
+            for month, count, *_ in extract_table_rows(table)
+        }
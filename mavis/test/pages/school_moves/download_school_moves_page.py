@@ -1,12 +1,11 @@
 from datetime import date
-from io import StringIO
 
-import pandas as pd
 from pandas import DataFrame, Series
 from playwright.sync_api import Page
 
 from mavis.test.annotations import step
 from mavis.test.constants import SCHOOL_MOVE_HEADERS
+from mavis.test.data import get_download_cache
 from mavis.test.data_models import Child, School
 from mavis.test.pages.header_component import HeaderComponent
 
@@ -47,6 +46,7 @@ class DownloadSchoolMovesPage:
         self.click_continue()
 
     def confirm_and_get_school_moves_csv(self) -> DataFrame:
+        download_cache = get_download_cache()
         browser = getattr(self.page.context, "browser", None)
         browser_type_name = getattr(
             getattr(browser, "browser_type", None),
@@ -60,11 +60,12 @@ class DownloadSchoolMovesPage:
             self.click_download_csv()
             csv_content = self.page.locator("pre").inner_text()
             self.page.go_back()
-            return pd.read_csv(StringIO(csv_content), dtype={"NHS_REF": str})
-
-        with self.page.expect_download() as download_info:
-            self.click_download_csv()
-        return pd.read_csv(download_info.value.path(), dtype={"NHS_REF": str})
+            path = download_cache.add(csv_content.encode(), ".csv")
+        else:
+            with self.page.expect_download() as download_info:
+                self.click_download_csv()
+            path = download_cache.save(download_info.value)
+        return download_cache.read_csv(path, dtype={"NHS_REF": str})
 
     def verify_school_moves_csv_contents(
         self, school_moves_csv: DataFrame, children: list[Child], school: School
@@ -2,17 +2,16 @@ import re
 from datetime import date
 from pathlib import Path
 
-import pandas as pd
 from playwright.sync_api import Page, expect
 
 from mavis.test.annotations import step
 from mavis.test.constants import Programme, Vaccine
-from mavis.test.data import get_session_id
+from mavis.test.data import OfflineSpreadsheet, get_download_cache, get_session_id
 from mavis.test.data_models import Child, School, User, VaccinationRecord
+from mavis.test.pages.extraction import extract_headed_values
 from mavis.test.pages.header_component import HeaderComponent
 from mavis.test.pages.sessions.sessions_tabs import SessionsTabs
 from mavis.test.utils import (
-    get_current_datetime_compact,
     get_formatted_date_for_session_dates,
     get_todays_date,
 )
@@ -57,24 +56,37 @@ class SessionsOverviewPage:
         )
 
     def get_total_for_category(self, programme: Programme, category: str) -> int:
-        programme_section = self.page.locator(f'section:has(h3:text("{programme}"))')
-
-        category_locator = programme_section.locator(
-            ".nhsuk-card__heading.nhsuk-heading-xs", has_text=category
-        )
-        total_locator = category_locator.locator("xpath=following-sibling::*[1]")
-        return int(total_locator.inner_text())
+        return self.get_all_totals(programme, [category])[category]
 
-    def get_all_totals(self, programme: Programme) -> dict[str, int]:
-        return {
-            category: self.get_total_for_category(programme, category)
-            for category in programme.tally_categories
+    def get_all_totals(
+        self, programme: Programme, categories: list[str] | None = None
+    ) -> dict[str, int]:
+        """The tally of each category, read from the page in one go."""
+        programme_section = self.page.locator(f'section:has(h3:text("{programme}"))')
+        cards = {
+            " ".join(heading.split()).casefold(): value
+            for heading, value in extract_headed_values(
+                programme_section, ".nhsuk-card__heading.nhsuk-heading-xs"
+            )
         }
 
+        totals = {}
+        for category in categories or programme.tally_categories:
+            name = category.casefold()
+            value = cards.get(name) or next(
+                (value for heading, value in cards.items() if name in heading), None
+            )
+            if value is None:
+                msg = f"No {category} tally for {programme}"
+                raise AssertionError(msg)
+            totals[category] = int(value)
+        return totals
+
     def check_all_totals(self, programme: Programme, totals: dict[str, int]) -> None:
         self.tabs.click_overview_tab()
+        actual_totals = self.get_all_totals(programme, list(totals))
         for category, expected_total in totals.items():
-            actual_total = self.get_total_for_category(programme, category)
+            actual_total = actual_totals[category]
             assert actual_total == expected_total, (
                 f"Expected {expected_total} for {category}, but got {actual_total}"
             )
@@ -141,18 +153,13 @@ class SessionsOverviewPage:
 
     @step("Click on Download offline spreadsheet")
     def download_offline_recording_excel(self) -> Path:
-        _file_path = Path(f"working/excel_{get_current_datetime_compact()}.xlsx")
-
         with self.page.expect_download() as download_info:
             self.download_offline_spreadsheet_button.click()
-        download = download_info.value
-        download.save_as(_file_path)
-
-        return _file_path
+        return get_download_cache().save(download_info.value)
 
-    def get_offline_recording_dataframe(self) -> pd.DataFrame:
+    def get_offline_spreadsheet(self) -> OfflineSpreadsheet:
         file_path = self.download_offline_recording_excel()
-        return pd.read_excel(file_path, sheet_name="Vaccinations", dtype=str)
+        return OfflineSpreadsheet.read(file_path)
 
     @step("Download the offline recording excel and verify consent message pattern")
     def verify_offline_sheet_vaccination_row(
@@ -167,21 +174,22 @@ class SessionsOverviewPage:
         child = vaccination_record.child
         programme = vaccination_record.programme
 
-        _data_frame = self.get_offline_recording_dataframe()
-        row = _data_frame[
-            (_data_frame["PERSON_FORENAME"] == child.first_name)
-            & (_data_frame["PERSON_SURNAME"] == child.last_name)
-            & (_data_frame["VACCINATED"] == "Y")
-            & (_data_frame["PROGRAMME"] == programme.offline_sheet_name)
+        spreadsheet = self.get_offline_spreadsheet()
+        rows = [
+            row
+            for row in spreadsheet.rows_for_child(
+                child.first_name, child.last_name, programme.offline_sheet_name
+            )
+            if row["VACCINATED"] == "Y"
         ]
-        if row.empty:
+        if not rows:
             msg = (
                 f"No matching row found for {child!s} "
                 f"and programme {programme} in offline recording excel."
             )
             raise ValueError(msg)
 
-        row = row.iloc[0]
+        row = rows[0]
 
         assert row["ORGANISATION_CODE"]
         assert row["SCHOOL_NAME"] == school.name
@@ -213,29 +221,26 @@ class SessionsOverviewPage:
         *,
         competent: bool,
     ) -> None:
-        data_frame = self.get_offline_recording_dataframe()
+        spreadsheet = self.get_offline_spreadsheet()
 
-        child_rows = data_frame[
-            (data_frame["PERSON_FORENAME"] == child.first_name)
-            & (data_frame["PERSON_SURNAME"] == child.last_name)
-        ]
+        child_rows = spreadsheet.rows_for_child(child.first_name, child.last_name)
 
-        if child_rows.empty:
+        if not child_rows:
             msg = f"No row found for child {child}."
             raise ValueError(msg)
 
         expected_status = "Gillick competent" if competent else "Not Gillick competent"
-        rows = child_rows[child_rows["GILLICK_STATUS"] == expected_status]
+        rows = [row for row in child_rows if row["GILLICK_STATUS"] == expected_status]
 
-        if rows.empty:
+        if not rows:
             msg = (
                 f"Child {child} found but Gillick competence status of "
                 f"'{expected_status}' was not. Current status: "
-                f"{child_rows.iloc[0]['GILLICK_STATUS']}"
+                f"{child_rows[0]['GILLICK_STATUS']}"
             )
             raise ValueError(msg)
 
-        row = rows.iloc[0]
+        row = rows[0]
 
         assert row["GILLICK_ASSESSMENT_DATE"].split(" ")[
             0
@@ -247,20 +252,20 @@ class SessionsOverviewPage:
         self,
         child: Child,
     ) -> None:
-        _data_frame = self.get_offline_recording_dataframe()
-        row = _data_frame[
-            (_data_frame["PERSON_FORENAME"] == child.first_name)
-            & (_data_frame["PERSON_SURNAME"] == child.last_name)
-            & (_data_frame["TRIAGE_STATUS"] == "Safe to vaccinate")
+        spreadsheet = self.get_offline_spreadsheet()
+        rows = [
+            row
+            for row in spreadsheet.rows_for_child(child.first_name, child.last_name)
+            if row["TRIAGE_STATUS"] == "Safe to vaccinate"
         ]
-        if row.empty:
+        if not rows:
             msg = (
                 f"No corresponding triage status found for {child!s} "
                 "in offline recording excel."
             )
             raise ValueError(msg)
 
-        row = row.iloc[0]
+        row = rows[0]
 
         assert row["TRIAGE_DATE"].split(" ")[0] == get_todays_date().strftime(
             "%Y-%m-%d"
@@ -272,13 +277,11 @@ class SessionsOverviewPage:
         self,
         child: Child,
     ) -> None:
-        _data_frame = self.get_offline_recording_dataframe()
-        row = _data_frame[
-            (_data_frame["PERSON_FORENAME"] == child.first_name)
-            & (_data_frame["PERSON_SURNAME"] == child.last_name)
-            & (_data_frame["PSD_STATUS"] == "PSD added")
-        ]
-        if row.empty:
+        spreadsheet = self.get_offline_spreadsheet()
+        if not any(
+            row["PSD_STATUS"] == "PSD added"
+            for row in spreadsheet.rows_for_child(child.first_name, child.last_name)
+        ):
             msg = (
                 f"No corresponding psd status found for {child!s} "
                 "in offline recording excel."
@@ -287,16 +290,17 @@ class SessionsOverviewPage:
 
     @step("Download the offline recording excel and verify consent message pattern")
     def verify_consent_message_in_excel(self) -> None:
-        _data_frame = self.get_offline_recording_dataframe()
+        spreadsheet = self.get_offline_spreadsheet()
         _consent_details_pattern = (
             r"On \d{4}-\d{2}-\d{2} at \d{2}:\d{2} (GIVEN|REFUSED) by "
             r"[A-Z][a-z]+(?: [A-Z][a-z]+)*"
         )
-        invalid_found = _data_frame["CONSENT_DETAILS"].apply(
-            lambda x: pd.notna(x) and len(re.findall(_consent_details_pattern, x)) == 0
-        )
         # Raise error if any invalid entry is found
-        if invalid_found.any():
+        if any(
+            consent_details is not None
+            and not re.search(_consent_details_pattern, consent_details)
+            for consent_details in spreadsheet.column("CONSENT_DETAILS")
+        ):
             msg = "CONSENT_DETAILS has entries in an invalid format."
             raise ValueError(msg)
 
@@ -304,8 +308,6 @@ class SessionsOverviewPage:
     def download_consent_form(
         self, programme: Programme, *, prefer_mmrv: bool = False
     ) -> Path:
-        _file_path = Path(f"working/consent_{get_current_datetime_compact()}.pdf")
-
         # For MMR, the link text uses "MMR" not "MMR(V)"
         # When prefer_mmrv=True and programme is MMR, download MMRV form instead
         if programme is Programme.MMR_MMRV and prefer_mmrv:
@@ -319,10 +321,7 @@ class SessionsOverviewPage:
             self.page.get_by_role(
                 "link", name=f"Download the {programme_name} consent form (PDF)"
             ).click()
-        download = download_info.value
-        download.save_as(_file_path)
-
-        return _file_path
+        return get_download_cache().save(download_info.value)
 
     def is_date_scheduled(self, date: date) -> bool:
         return self.page.get_by_text(
@@ -2,6 +2,7 @@ from playwright.sync_api import Page, expect
 
 from mavis.test.annotations import step
 from mavis.test.data_models import School
+from mavis.test.pages.extraction import extract_table_rows
 from mavis.test.pages.header_component import HeaderComponent
 from mavis.test.pages.team.team_links_component import TeamLinksComponent
 
@@ -48,14 +49,10 @@ class TeamSchoolsPage:
         }
 
         tbody = self.page.locator("tbody.nhsuk-table__body").first
-        rows = tbody.locator("tr.nhsuk-table__row")
-
         actual_school_names = {
-            row.locator("td.nhsuk-table__cell")
-            .first.inner_text()
-            .split("\n", 1)[0]
-            .strip()
-            for row in rows.all()
+            cells[0].split("\n", 1)[0].strip()
+            for cells in extract_table_rows(tbody)
+            if cells
         }
 
         assert actual_school_names == expected_school_names
@@ -0,0 +1,67 @@
+import functools
+import importlib.util
+
+import httpx
+
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30
+DEFAULT_RETRIES = 3
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class MavisTestingApiClient:
+    """
+    One pooled httpx client for Mavis' api/testing endpoints.
+
+    Connections are kept alive between calls, so resetting teams, onboarding
+    and refreshing reporting reuse the same TCP and TLS connection rather than
+    opening a new one per request. HTTP/2 is used when h2 is installed.
+    Connection failures are retried by the transport; HTTP errors are not.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        base_url: str,
+        *,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        retries: int = DEFAULT_RETRIES,
+        http2: bool = HTTP2_AVAILABLE,
+    ) -> None:
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        self.client = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            transport=httpx.HTTPTransport(limits=limits, retries=retries, http2=http2),
+        )
+
+    @classmethod
+    @functools.cache
+    def for_base_url(cls, base_url: str) -> "MavisTestingApiClient":
+        """The client shared by everything calling this Mavis in this worker."""
+        return cls(base_url)
+
+    def get(self, path: str, **kwargs) -> httpx.Response:  # noqa: ANN003
+        return self.client.get(f"api/testing/{path}", **kwargs)
+
+    def post(self, path: str, **kwargs) -> httpx.Response:  # noqa: ANN003
+        return self.client.post(f"api/testing/{path}", **kwargs)
+
+    def delete(self, path: str, **kwargs) -> httpx.Response:  # noqa: ANN003
+        return self.client.delete(f"api/testing/{path}", **kwargs)
+
+    def refresh_reporting(self) -> None:
+        response = self.get("refresh-reporting", params={"wait": "true"}, timeout=60)
+        response.raise_for_status()
+
+    def close(self) -> None:
+        self.client.close()
@@ -1,15 +1,26 @@
+import asyncio
+import functools
+import hashlib
+import json
 import random
 import re
 import time
+import traceback
 import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
+import allure
 from faker import Faker
 from playwright.sync_api import Locator, Page, expect
 from pypdf import PdfReader
 
+from mavis.test import annotations
 from mavis.test.annotations import step
 from mavis.test.constants import MMRV_ELIGIBILITY_CUTOFF_DOB
 
@@ -94,16 +105,20 @@ def get_offset_date_compact_format(
     return _offset_date.strftime("%Y%m%d")
 
 
-def get_date_of_birth_for_year_group(year_group: int) -> date:
-    today = get_todays_date()
+def get_date_of_birth_range_for_year_group(
+    year_group: int, today: date | None = None
+) -> tuple[date, date]:
+    today = today or get_todays_date()
     academic_year = today.year - year_group - 6
 
     if today >= date(today.year, 9, 1):
         academic_year += 1
 
-    start_date = date(academic_year, 9, 1)
-    end_date = date(academic_year + 1, 8, 31)
+    return date(academic_year, 9, 1), date(academic_year + 1, 8, 31)
+
 
+def get_date_of_birth_for_year_group(year_group: int) -> date:
+    start_date, end_date = get_date_of_birth_range_for_year_group(year_group)
     return faker.date_between(start_date, end_date)
 
 
@@ -198,34 +213,94 @@ def deliberate_sleep(seconds: float, reason: str) -> None:  # noqa: ARG001
     time.sleep(seconds)
 
 
-@step("Reload page until {1} is visible", page_object=False)
-def reload_until_element_is_visible(
-    page: Page, tag: Locator, seconds: int = DEFAULT_TIMEOUT_SECONDS
+def run_coroutine[T](coroutine: Coroutine[object, object, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Sync Playwright keeps an event loop running on the test's thread, where
+    asyncio.run refuses to start another, so the coroutine gets a thread and
+    an event loop of its own.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+WAIT_INITIAL_INTERVAL_SECONDS = 0.25
+WAIT_MAX_INTERVAL_SECONDS = 1.0
+
+_WAIT_INTERNAL_FILES = {__file__, annotations.__file__}
+
+
+def _get_call_site() -> str:
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename in _WAIT_INTERNAL_FILES or "allure" in frame.filename:
+            continue
+        return f"{Path(frame.filename).name}:{frame.lineno} ({frame.name})"
+    return "unknown"
+
+
+def _reload_until(
+    page: Page, condition: Callable[[], bool], seconds: float, description: str
 ) -> None:
-    for _ in range(seconds * 2):
-        if tag.is_visible():
-            break
+    """
+    Reload the page until the condition holds or the time runs out.
+
+    Checks back off exponentially with jitter, up to about a second apart. The
+    time allowed is the time spent backing off, so slow reloads don't cut the
+    number of checks. How long the wait took and how many reloads it needed
+    are attached to the Allure report. Imports are better waited for through
+    ImportStatusClient, which asks the testing API.
+    """
+    call_site = _get_call_site()
+    start = time.monotonic()
+    interval = WAIT_INITIAL_INTERVAL_SECONDS
+    slept = 0.0
+    reloads = 0
 
-        deliberate_sleep(0.5, "polling interval for reload loop")
+    condition_met = condition()
+
+    while not condition_met and slept < seconds:
+        backoff = min(random.uniform(interval / 2, interval), seconds - slept)
+        deliberate_sleep(backoff, "backing off between reloads")
+        slept += backoff
+        interval = min(interval * 2, WAIT_MAX_INTERVAL_SECONDS)
 
         page.reload()
-    else:
-        expect(tag).to_be_visible()
+        reloads += 1
+        condition_met = condition()
+
+    allure.attach(
+        json.dumps(
+            {
+                "call_site": call_site,
+                "waiting_for": description,
+                "condition_met": condition_met,
+                "reloads": reloads,
+                "elapsed_seconds": round(time.monotonic() - start, 3),
+            },
+            indent=2,
+        ),
+        name=f"Wait telemetry: {call_site}",
+        attachment_type=allure.attachment_type.JSON,
+    )
 
 
-@step("Reload page until {1} is not visible", page_object=False)
-def reload_until_element_is_not_visible(
-    page: Page, tag: Locator, seconds: int = DEFAULT_TIMEOUT_SECONDS
+@step("Reload page until {1} is visible", page_object=False)
+def reload_until_element_is_visible(
+    page: Page, tag: Locator, seconds: float = DEFAULT_TIMEOUT_SECONDS
 ) -> None:
-    for _ in range(seconds * 2):
-        if not tag.is_visible():
-            break
+    _reload_until(page, tag.is_visible, seconds, f"{tag} to be visible")
+    expect(tag).to_be_visible()
 
-        deliberate_sleep(0.5, "polling interval for reload loop")
 
-        page.reload()
-    else:
-        expect(tag).to_be_hidden()
+@step("Reload page until {1} is not visible", page_object=False)
+def reload_until_element_is_not_visible(
+    page: Page, tag: Locator, seconds: float = DEFAULT_TIMEOUT_SECONDS
+) -> None:
+    _reload_until(
+        page, lambda: not tag.is_visible(), seconds, f"{tag} to not be visible"
+    )
+    expect(tag).to_be_hidden()
 
 
 def expect_alert_text(page: Page, text: str) -> None:
@@ -253,27 +328,81 @@ def format_nhs_number(nhs_number: str) -> str:
     return f"{nhs_number[:3]} {nhs_number[3:6]} {nhs_number[6:]}"
 
 
-def normalize_text(text: str) -> str:
-    """Normalize text by handling ligatures and whitespace.
-
-    Useful for comparing text extracted from PDFs where ligatures
-    and whitespace formatting may differ from source text.
-    """
-    # Normalize Unicode (NFKD decomposes ligatures)
-    text = unicodedata.normalize("NFKD", text)
-    pdf_ligatures = {
+PDF_LIGATURES = str.maketrans(
+    {
         "\ufb00": "ff",
         "\ufb01": "fi",
         "\ufb02": "fl",
         "\ufb03": "ffi",
         "\ufb04": "ffl",
     }
-    # Replace common ligatures that might not decompose
-    for ligature, replacement in pdf_ligatures.items():
-        text = text.replace(ligature, replacement)
-    # Normalize whitespace
-    text = re.sub(r"\s+", " ", text)
-    return text.lower()
+)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# normalized text of the PDFs read most recently, by a digest of the file
+PDF_TEXT_CACHE_SIZE = 32
+
+
+class _PdfText(NamedTuple):
+    # the normalized text of the first pages_read pages
+    text: str
+    pages_read: int
+    complete: bool
+
+
+_pdf_text_cache: OrderedDict[bytes, _PdfText] = OrderedDict()
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text by handling ligatures and whitespace.
+
+    Useful for comparing text extracted from PDFs where ligatures
+    and whitespace formatting may differ from source text.
+    """
+    # Normalize Unicode (NFKD decomposes ligatures), then replace common
+    # ligatures that might not decompose
+    text = unicodedata.normalize("NFKD", text).translate(PDF_LIGATURES)
+    return WHITESPACE_PATTERN.sub(" ", text).lower()
+
+
+@functools.cache
+def _normalize_phrase(phrase: str) -> str:
+    return normalize_text(phrase)
+
+
+def _get_pdf_digest(pdf_path: Path) -> bytes:
+    with pdf_path.open("rb") as pdf_file:
+        return hashlib.file_digest(pdf_file, "blake2b").digest()
+
+
+def _get_cached_pdf_text(digest: bytes) -> _PdfText:
+    pdf_text = _pdf_text_cache.get(digest)
+    if pdf_text is None:
+        return _PdfText("", 0, complete=False)
+    _pdf_text_cache.move_to_end(digest)
+    return pdf_text
+
+
+def _cache_pdf_text(digest: bytes, pdf_text: _PdfText) -> None:
+    _pdf_text_cache[digest] = pdf_text
+    if len(_pdf_text_cache) > PDF_TEXT_CACHE_SIZE:
+        _pdf_text_cache.popitem(last=False)
+
+
+def _normalize_pages(
+    reader: PdfReader, start: int, *, ends_with_space: bool
+) -> Iterator[str]:
+    """Yield the normalized text of each page from start, as it is extracted.
+
+    Whitespace between pages is collapsed as it is within them, so the pages
+    join up into the normalized text of the whole PDF.
+    """
+    for index in range(start, len(reader.pages)):
+        text = normalize_text(reader.pages[index].extract_text())
+        if ends_with_space:
+            text = text.removeprefix(" ")
+        if text:
+            ends_with_space = text.endswith(" ")
+        yield text
 
 
 def read_pdf_as_normalized_text(pdf_path: Path) -> str:
@@ -281,6 +410,8 @@ def read_pdf_as_normalized_text(pdf_path: Path) -> str:
 
     Extracts text from all pages of the PDF and normalizes it by
     handling ligatures and whitespace to facilitate text comparison.
+    The text is cached by a digest of the file, so reading the same PDF
+    again (even downloaded again) doesn't extract it again.
 
     Args:
         pdf_path: Path to the PDF file to read
@@ -288,32 +419,104 @@ def read_pdf_as_normalized_text(pdf_path: Path) -> str:
     Returns:
         Normalized text content from the PDF
     """
+    digest = _get_pdf_digest(pdf_path)
+    cached = _get_cached_pdf_text(digest)
+    if cached.complete:
+        return cached.text
+
+    reader = PdfReader(pdf_path)
+    text = cached.text + "".join(
+        _normalize_pages(
+            reader, cached.pages_read, ends_with_space=cached.text.endswith(" ")
+        )
+    )
+    _cache_pdf_text(digest, _PdfText(text, len(reader.pages), complete=True))
+    return text
+
+
+def find_phrases_missing_from_pdf[T](pdf_path: Path, phrases: Iterable[T]) -> list[T]:
+    """Find the phrases that are not in a PDF file's normalized text.
+
+    Pages are extracted only until every phrase has been found, so phrases
+    near the start of a long PDF don't need the rest of it read. The pages
+    read are cached with read_pdf_as_normalized_text's text, and later reads
+    of the same PDF carry on from them.
+
+    Args:
+        pdf_path: Path to the PDF file to search
+        phrases: Phrases to look for, normalized before searching
+
+    Returns:
+        The phrases not found, in the order given
+    """
+    digest = _get_pdf_digest(pdf_path)
+    cached = _get_cached_pdf_text(digest)
+    remaining = {
+        phrase: normalized
+        for phrase in phrases
+        if (normalized := _normalize_phrase(str(phrase))) not in cached.text
+    }
+    if not remaining or cached.complete:
+        return list(remaining)
+
+    # a phrase can span pages, so each page is searched with the end of the
+    # text before it
+    overlap = max(map(len, remaining.values())) - 1
     reader = PdfReader(pdf_path)
-    pdf_text = ""
-    for pdf_page in reader.pages:
-        pdf_text += pdf_page.extract_text()
-    return normalize_text(pdf_text)
+    pages = [cached.text]
+    pages_read = cached.pages_read
+    previous_text = cached.text[max(0, len(cached.text) - overlap) :]
+    for page_text in _normalize_pages(
+        reader, pages_read, ends_with_space=cached.text.endswith(" ")
+    ):
+        pages.append(page_text)
+        pages_read += 1
+        text = previous_text + page_text
+        remaining = {
+            phrase: normalized
+            for phrase, normalized in remaining.items()
+            if normalized not in text
+        }
+        if not remaining:
+            break
+        previous_text = text[max(0, len(text) - overlap) :]
+
+    _cache_pdf_text(
+        digest,
+        _PdfText("".join(pages), pages_read, complete=pages_read == len(reader.pages)),
+    )
+    return list(remaining)
 
 
 def assert_questions_in_pdf(
-    pdf_text_normalized: str,
+    pdf: str | Path,
     questions: list,
     context: str = "PDF",
 ) -> None:
-    """Assert that all questions are present in normalized PDF text.
+    """Assert that all questions are present in a PDF.
+
+    Each question is normalized once and looked for in a single pass over
+    the questions still missing.
 
     Args:
-        pdf_text_normalized: The normalized PDF text to search in
+        pdf: The normalized PDF text to search in, or the PDF file, which is
+            then only read as far as the last question
         questions: List of questions to verify
         context: Context description for error messages (default: "PDF")
 
     Raises:
         AssertionError: If any question is not found in the PDF
     """
-
-    for question in questions:
-        question_normalized = normalize_text(str(question))
-
-        assert question_normalized in pdf_text_normalized, (  # noqa: S101
-            f"Health question '{question}' not found in {context}"
-        )
+    if isinstance(pdf, Path):
+        missing = find_phrases_missing_from_pdf(pdf, questions)
+    else:
+        missing = [
+            question
+            for question in questions
+            if _normalize_phrase(str(question)) not in pdf
+        ]
+
+    assert not missing, (  # noqa: S101
+        f"Health questions not found in {context}: "
+        + ", ".join(f"'{question}'" for question in missing)
+    )
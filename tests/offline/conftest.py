@@ -0,0 +1,106 @@
+import threading
+import urllib.parse
+
+import httpx
+import pytest
+
+from mavis.test.fixtures.fhir_api import AuthToken
+from mavis.test.mocks.careplus import (
+    DEFAULT_MAX_REQUEST_BYTES,
+    CarePlusServer,
+    SOAPHandler,
+    build_service_path,
+)
+from mavis.test.mocks.careplus.faults import PROFILES, FaultInjector
+from mavis.test.mocks.careplus.store import MemoryRecordStore, SQLiteRecordStore
+from mavis.test.mocks.imms import IMMSHandler, IMMSServer
+from mavis.test.mocks.mavis import MavisStubHandler, MavisStubServer, default_config
+from mavis.test.testing_api import MavisTestingApiClient
+
+
+# these tests run against the local stubs, so there are no teams to reset or delete
+@pytest.fixture(scope="session", autouse=True)
+def delete_teams_after_tests():
+    return
+
+
+@pytest.fixture(scope="module", autouse=True)
+def reset_before_each_module():
+    return
+
+
+@pytest.fixture
+def mavis_stub_config():
+    return default_config()
+
+
+@pytest.fixture
+def mavis_stub(mavis_stub_config):
+    server = MavisStubServer(
+        (mavis_stub_config["host"], mavis_stub_config["port"]),
+        MavisStubHandler.make_handler(mavis_stub_config),
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://{mavis_stub_config['host']}:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_testing_api(mavis_stub):
+    testing_api = MavisTestingApiClient(mavis_stub)
+    yield testing_api
+    testing_api.client.close()
+
+
+@pytest.fixture(params=[MemoryRecordStore, SQLiteRecordStore])
+def careplus_mock(request):
+    config = {
+        "host": "127.0.0.1",
+        "port": 0,
+        "path": build_service_path("MOCK"),
+        "max_request_bytes": DEFAULT_MAX_REQUEST_BYTES,
+    }
+    server = CarePlusServer(
+        (config["host"], config["port"]),
+        SOAPHandler.make_handler(
+            config, request.param(), FaultInjector(PROFILES["healthy"])
+        ),
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://{config['host']}:{server.server_port}{config['path']}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def imms_mock(monkeypatch):
+    server = IMMSServer(
+        ("127.0.0.1", 0),
+        IMMSHandler.make_handler(
+            {
+                "host": "127.0.0.1",
+                "port": 0,
+                "latency_seconds": 0,
+                "latency_jitter_seconds": 0,
+            }
+        ),
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/"
+    # ImmsEndpoints reads the base URL from the environment
+    monkeypatch.setenv("IMMS_BASE_URL", base_url)
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def imms_mock_token(imms_mock):
+    response = httpx.post(
+        urllib.parse.urljoin(imms_mock, "oauth2-mock/token"),
+        data={"grant_type": "client_credentials", "client_assertion": "offline"},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return AuthToken(response.json()["access_token"])
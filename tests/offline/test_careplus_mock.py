@@ -0,0 +1,104 @@
+import urllib.parse
+from datetime import UTC, datetime, timedelta
+
+import httpx
+
+from mavis.test.benchmarks.careplus import careplus_csv, soap_envelope
+from mavis.test.mocks.careplus.store import NHS_NUMBER_COLUMN
+
+ROWS = 5
+PAGE_SIZE = 2
+OUTAGE_PERCENT = 100
+
+
+def _records(careplus_mock: str, **params: object) -> httpx.Response:
+    return httpx.get(
+        urllib.parse.urljoin(careplus_mock, "/records"), params=params, timeout=30
+    )
+
+
+def test_records_are_kept_and_paged(careplus_mock):
+    """
+    Test: The rows of an accepted payload can be read back from the mock a page
+       at a time, and filtered.
+    Steps:
+    1. Post a CarePlus payload of five rows.
+    2. Page through /records two at a time.
+    3. Filter by NHS number and by time received, then clear the records.
+    Verification:
+    - The pages hold every row, in the order posted, with the total count.
+    - The filters match only the records they should.
+    - Bad parameters are rejected, and no records are left once cleared.
+    """
+    before = datetime.now(tz=UTC)
+    payload = careplus_csv(ROWS)
+    response = httpx.post(careplus_mock, content=soap_envelope(payload), timeout=30)
+    response.raise_for_status()
+    nhs_numbers = [line.split(",")[0] for line in payload.splitlines()[1:]]
+
+    pages = []
+    for offset in range(0, ROWS, PAGE_SIZE):
+        page = _records(careplus_mock, offset=offset, limit=PAGE_SIZE).json()
+        assert page["total"] == ROWS
+        assert page["offset"] == offset
+        pages.extend(page["records"])
+    assert [record["fields"][NHS_NUMBER_COLUMN] for record in pages] == nhs_numbers
+    assert {record["user_id"] for record in pages} == {"benchmark"}
+
+    page = _records(careplus_mock, nhs_number=nhs_numbers[2]).json()
+    assert page["total"] == 1
+    assert page["records"][0]["fields"][NHS_NUMBER_COLUMN] == nhs_numbers[2]
+
+    after = datetime.now(tz=UTC) + timedelta(seconds=1)
+    assert _records(careplus_mock, since=before.isoformat()).json()["total"] == ROWS
+    assert _records(careplus_mock, since=after.isoformat()).json()["total"] == 0
+    assert _records(careplus_mock, until=before.isoformat()).json()["total"] == 0
+
+    assert _records(careplus_mock, limit=0).status_code == httpx.codes.BAD_REQUEST
+    assert (
+        _records(careplus_mock, since="yesterday").status_code
+        == httpx.codes.BAD_REQUEST
+    )
+    assert _records(careplus_mock, sort="id").status_code == httpx.codes.BAD_REQUEST
+
+    response = httpx.delete(urllib.parse.urljoin(careplus_mock, "/records"))
+    assert response.status_code == httpx.codes.NO_CONTENT
+    assert _records(careplus_mock).json()["total"] == 0
+
+
+def test_invalid_fault_profiles_are_rejected(careplus_mock):
+    """
+    Test: Changing the fault profile to something invalid is answered with a
+       400, and leaves the profile as it was.
+    Steps:
+    1. PUT fault profiles with an unhashable profile name, an unknown profile,
+       a fractional and a non-5xx server error status, and an unknown field.
+    2. PUT a valid profile.
+    Verification:
+    - Each invalid profile gets a 400 with an error, and the mock keeps serving.
+    - The valid profile is taken.
+    """
+    faults_url = urllib.parse.urljoin(careplus_mock, "/admin/faults")
+    for data in (
+        {"profile": []},
+        {"profile": "broken"},
+        {"server_error_status": 503.5},
+        {"server_error_status": 404},
+        {"server_error_percent": "10"},
+        {"retries": 3},
+        [],
+    ):
+        response = httpx.put(faults_url, json=data, timeout=30)
+        assert response.status_code == httpx.codes.BAD_REQUEST, data
+        assert response.json()["error"]
+
+    assert httpx.get(faults_url, timeout=30).json()["server_error_percent"] == 0
+
+    response = httpx.put(
+        faults_url,
+        json={"profile": "outage", "server_error_status": httpx.codes.BAD_GATEWAY},
+        timeout=30,
+    )
+    response.raise_for_status()
+    assert response.json()["server_error_percent"] == OUTAGE_PERCENT
+    assert response.json()["server_error_status"] == httpx.codes.BAD_GATEWAY
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+from mavis.test.constants import DeliverySite, Vaccine
+from mavis.test.data_models import Child, School
+from mavis.test.helpers.imms_api_helper import (
+    AsyncImmsApiHelper,
+    ImmsApiVaccinationRecord,
+)
+from mavis.test.utils import get_current_datetime
+
+
+def test_check_records_while_an_event_loop_is_running(imms_mock_token):
+    """
+    Test: The batch IMMS API checks can be called from a test that has an event
+       loop running, as sync Playwright does.
+    Steps:
+    1. Within a running event loop, check a record is not in the IMMS mock.
+    2. Create the record, then check it is there.
+    Verification:
+    - Both checks pass rather than refusing to start another event loop.
+    """
+    helper = AsyncImmsApiHelper(imms_mock_token, initial_interval_seconds=0.1)
+    child = Child.generate(9)
+    school = School(
+        name="School",
+        urn="123456",
+        site="",
+        address_line_1="",
+        address_line_2="",
+        address_town="",
+        address_postcode="",
+    )
+    record = ImmsApiVaccinationRecord.from_values(
+        Vaccine.SEQUIRUS,
+        child,
+        DeliverySite.LEFT_ARM_UPPER,
+        school,
+        get_current_datetime().replace(microsecond=0),
+    )
+
+    async def check_records() -> None:
+        helper.check_records_are_not_in_imms_api([record], seconds=1)
+        helper.create_vaccination_record(
+            Vaccine.SEQUIRUS,
+            child,
+            school,
+            DeliverySite.LEFT_ARM_UPPER,
+            record.vaccination_time,
+            skip_verification=True,
+        )
+        helper.check_records_in_imms_api([record], seconds=5)
+
+    asyncio.run(check_records())
+
+
+def test_check_records_are_not_in_imms_api_polls_at_the_deadline(
+    imms_mock_token, monkeypatch
+):
+    """
+    Test: The negative batch check looks once more at the end of its window,
+       even when the next backoff interval would run past it.
+    Steps:
+    1. Report a record as present until shortly before the deadline, later
+       than the last doubled interval that fits in the window.
+    2. Check the record is not in the IMMS API.
+    Verification:
+    - The check passes, because the final poll at the deadline sees it gone.
+    """
+    helper = AsyncImmsApiHelper(imms_mock_token, initial_interval_seconds=0.2)
+    record = ImmsApiVaccinationRecord.from_values(
+        Vaccine.SEQUIRUS,
+        Child.generate(9),
+        DeliverySite.LEFT_ARM_UPPER,
+        School(
+            name="School",
+            urn="123456",
+            site="",
+            address_line_1="",
+            address_line_2="",
+            address_town="",
+            address_postcode="",
+        ),
+        get_current_datetime().replace(microsecond=0),
+    )
+    # polls run at about 0, 0.2 and 0.6s, and the next interval would end at 1.4s
+    removed_at = time.monotonic() + 0.8
+
+    async def get_record(_client, expected_record):
+        return expected_record if time.monotonic() < removed_at else None
+
+    monkeypatch.setattr(helper, "_get_imms_api_record_async", get_record)
+
+    helper.check_records_are_not_in_imms_api([record], seconds=1)
@@ -0,0 +1,137 @@
+import httpx
+
+from mavis.test.helpers.import_status_helper import ImportStatusClient
+
+IMPORT_PATH = "/class-imports/123"
+
+
+def test_wait_until_finished_when_processed(stub_testing_api, mavis_stub_config):
+    """
+    Test: Waiting for an import through the testing API returns once it has
+       been processed.
+    Steps:
+    1. Poll the stub, which reports pending_import for the first three polls.
+    Verification:
+    - The wait succeeds and the client still uses the API.
+    """
+    mavis_stub_config["polls_until_processed"] = 3
+    client = ImportStatusClient(stub_testing_api)
+
+    assert client.wait_until_finished(IMPORT_PATH, seconds=10)
+    assert client.available
+    assert client.get_status("class-imports", "123") == "processed"
+
+
+def test_wait_until_finished_times_out(stub_testing_api, mavis_stub_config):
+    """
+    Test: Waiting for an import that never finishes gives up in time.
+    Steps:
+    1. Poll the stub, which reports pending_import for longer than the wait.
+    Verification:
+    - The wait fails, so the caller can wait in the UI, and the API stays in use.
+    """
+    mavis_stub_config["polls_until_processed"] = 1_000
+    client = ImportStatusClient(stub_testing_api)
+
+    assert not client.wait_until_finished(IMPORT_PATH, seconds=0.5)
+    assert client.available
+
+
+def test_wait_until_finished_without_status_api(stub_testing_api, mavis_stub_config):
+    """
+    Test: A Mavis without the import status endpoint falls back to the UI.
+    Steps:
+    1. Poll the stub with the import status endpoint turned off (404).
+    Verification:
+    - The wait fails straight away and the client stops asking.
+    """
+    mavis_stub_config["import_status_available"] = False
+    client = ImportStatusClient(stub_testing_api)
+
+    assert not client.wait_until_finished(IMPORT_PATH, seconds=10)
+    assert not client.available
+    assert client.get_status("class-imports", "123") is None
+
+
+def test_wait_until_finished_ignores_other_pages(stub_testing_api):
+    """
+    Test: Pages that are not an import are not polled.
+    Verification:
+    - The wait fails without asking the API.
+    """
+    client = ImportStatusClient(stub_testing_api)
+
+    assert not client.wait_until_finished("/dashboard", seconds=10)
+    assert client.available
+
+
+def test_wait_until_finished_after_a_transient_error(stub_testing_api, monkeypatch):
+    """
+    Test: An unreachable or failing status API only falls back for one wait.
+    Steps:
+    1. Wait for an import while the API is unreachable, then while it returns
+       503.
+    2. Wait again once it answers.
+    Verification:
+    - The first two waits fail, so the caller waits in the UI.
+    - The client keeps asking, and the last wait succeeds through the API.
+    """
+    client = ImportStatusClient(stub_testing_api)
+    get = stub_testing_api.get
+    failures = [
+        httpx.ConnectError("connection refused"),
+        httpx.Response(httpx.codes.SERVICE_UNAVAILABLE),
+    ]
+
+    def flaky_get(path, **kwargs):
+        if failures:
+            failure = failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        return get(path, **kwargs)
+
+    monkeypatch.setattr(stub_testing_api, "get", flaky_get)
+
+    assert not client.wait_until_finished(IMPORT_PATH, seconds=10)
+    assert not client.wait_until_finished(IMPORT_PATH, seconds=10)
+    assert client.available
+    assert client.wait_until_finished(IMPORT_PATH, seconds=10)
+
+
+def test_wait_until_finished_for_an_import_not_found(
+    stub_testing_api, mavis_stub_config
+):
+    """
+    Test: A 404 once the status API has answered is for that import only.
+    Steps:
+    1. Wait for an import through the API.
+    2. Wait for an import the stub answers 404 for.
+    Verification:
+    - The second wait fails, so the caller waits in the UI, but the client
+      keeps using the API.
+    """
+    client = ImportStatusClient(stub_testing_api)
+    assert client.wait_until_finished(IMPORT_PATH, seconds=10)
+
+    mavis_stub_config["import_status_available"] = False
+    assert not client.wait_until_finished("/class-imports/456", seconds=10)
+    assert client.available
+
+
+def test_wait_until_finished_without_a_status(stub_testing_api, monkeypatch):
+    """
+    Test: A status API that answers with something other than a status, such
+       as an HTML page, is taken to be missing.
+    Verification:
+    - The wait fails rather than raising, and the client stops asking.
+    """
+    client = ImportStatusClient(stub_testing_api)
+    monkeypatch.setattr(
+        stub_testing_api,
+        "get",
+        lambda *_args, **_kwargs: httpx.Response(httpx.codes.OK, text="<html>"),
+    )
+
+    assert not client.wait_until_finished(IMPORT_PATH, seconds=10)
+    assert not client.available
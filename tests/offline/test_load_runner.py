@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from mavis.test.load.runner import JourneyError, LoadProfile, LoadRunner
+
+LOOPS = 2
+
+
+class _Journey:
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+        self.iterations = 0
+
+    async def setup(self, user) -> None:
+        pass
+
+    async def run_iteration(self, user) -> None:
+        self.iterations += 1
+        raise self.error
+
+
+def _run(journey: _Journey, users: int):
+    profile = LoadProfile(
+        users=users,
+        ramp_up_seconds=0,
+        duration_seconds=5,
+        think_time_scale=0,
+        loops=LOOPS,
+    )
+    return asyncio.run(LoadRunner("http://127.0.0.1:1/", profile).run(journey))
+
+
+def test_run_without_users():
+    """
+    Test: A load run with no virtual users finishes without running the journey.
+    """
+    journey = _Journey(JourneyError("unused"))
+
+    _run(journey, users=0)
+
+    assert journey.iterations == 0
+
+
+def test_run_carries_on_after_journey_errors():
+    """
+    Test: A failed step skips the rest of the iteration but not the run.
+    Verification:
+    - Every user runs every iteration, and the run finishes.
+    """
+    journey = _Journey(JourneyError("step failed"))
+
+    _run(journey, users=2)
+
+    assert journey.iterations == 2 * LOOPS
+
+
+def test_run_fails_when_a_journey_crashes():
+    """
+    Test: A journey that raises anything but a JourneyError fails the run,
+       rather than passing for a clean one.
+    """
+    journey = _Journey(KeyError("missing"))
+
+    with pytest.raises(KeyError):
+        _run(journey, users=2)
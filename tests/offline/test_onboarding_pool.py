@@ -0,0 +1,137 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+
+from mavis.test.onboarding import NationalReportingOnboarding
+from mavis.test.onboarding_pool import STALE_LOCK_SECONDS, OnboardingPool, PooledTeam
+
+BASE_URL = "http://127.0.0.1:4001/"
+KIND = PooledTeam.NATIONAL_REPORTING
+TEAMS = 20
+DEAD_HOLDER = "gw0@host:1 dead"
+LIVE_HOLDER = "gw1@host:2 alive"
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    return tmp_path / "onboarding_pool.json"
+
+
+def _fill(pool: OnboardingPool, teams: int) -> None:
+    for _ in range(teams):
+        onboarding = NationalReportingOnboarding.get_onboarding_data_for_tests()
+        pool.add(KIND, BASE_URL, onboarding, {})
+
+
+def _make_stale(path) -> None:
+    stale = time.time() - STALE_LOCK_SECONDS - 1
+    os.utime(path, (stale, stale))
+
+
+def test_concurrent_leases_are_unique(manifest_path):
+    """
+    Test: Workers leasing at the same time never get the same team.
+    Verification:
+    - Each team is leased once, and no more leases are given than there are
+      teams.
+    """
+    _fill(OnboardingPool(manifest_path), TEAMS)
+
+    def lease_all(_):
+        pool = OnboardingPool(manifest_path)
+        return [
+            lease.workgroup
+            for _ in range(10)
+            if (lease := pool.lease(KIND, BASE_URL)) is not None
+        ]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        workgroups = [w for leased in executor.map(lease_all, range(4)) for w in leased]
+
+    assert len(workgroups) == len(set(workgroups)) == TEAMS
+
+
+def test_stale_lock_is_broken(manifest_path):
+    """
+    Test: A lock left behind by a process that died doesn't block the pool.
+    """
+    pool = OnboardingPool(manifest_path, lock_timeout=1)
+    _fill(pool, 1)
+    pool.lock_path.write_text(DEAD_HOLDER)
+    _make_stale(pool.lock_path)
+
+    assert pool.lease(KIND, BASE_URL) is not None
+    assert not pool.lock_path.exists()
+
+
+def test_fresh_lock_is_kept(manifest_path):
+    """
+    Test: A lock in use isn't broken by a waiter, which times out instead.
+    """
+    pool = OnboardingPool(manifest_path, lock_timeout=0.1)
+    pool.lock_path.parent.mkdir(parents=True, exist_ok=True)
+    pool.lock_path.write_text(LIVE_HOLDER)
+
+    with pytest.raises(TimeoutError):
+        pool.lease(KIND, BASE_URL)
+    assert pool.lock_path.read_text() == LIVE_HOLDER
+
+
+def test_lock_taken_since_it_was_found_stale_is_kept(manifest_path, monkeypatch):
+    """
+    Test: A waiter that found the lock stale, but was overtaken by another
+       waiter that broke it and took the lock, leaves the new lock in place.
+    """
+    pool = OnboardingPool(manifest_path)
+    pool.lock_path.parent.mkdir(parents=True, exist_ok=True)
+    pool.lock_path.write_text(DEAD_HOLDER)
+    _make_stale(pool.lock_path)
+    read_lock = OnboardingPool._read_lock  # noqa: SLF001
+
+    def read_then_overtaken(path):
+        token = read_lock(path)
+        if token == DEAD_HOLDER:
+            pool.lock_path.write_text(LIVE_HOLDER)
+            _make_stale(pool.lock_path)
+        return token
+
+    monkeypatch.setattr(OnboardingPool, "_read_lock", staticmethod(read_then_overtaken))
+    pool._break_stale_lock()  # noqa: SLF001
+
+    assert pool.lock_path.read_text() == LIVE_HOLDER
+    assert list(manifest_path.parent.iterdir()) == [pool.lock_path]
+
+
+def test_expired_lease_is_reset_and_taken_over(manifest_path):
+    """
+    Test: A team whose holder never returned it is reset and leased again once
+       its lease expires, and its old holder can no longer return it.
+    """
+    pool = OnboardingPool(manifest_path, lease_duration=timedelta(0))
+    _fill(pool, 1)
+    abandoned = pool.lease(KIND, BASE_URL)
+    reset_teams = []
+
+    assert pool.lease(KIND, BASE_URL) is None
+    lease = pool.lease(KIND, BASE_URL, reset=reset_teams.append)
+
+    assert lease.workgroup == abandoned.workgroup
+    assert reset_teams == [lease.onboarding.team]
+
+    pool.release(abandoned)
+    assert pool.manifest()["teams"][lease.workgroup]["lease_id"] == lease.lease_id
+
+
+def test_released_team_is_leased_again(manifest_path):
+    """
+    Test: A returned team is ready to lease again, with its onboarding data.
+    """
+    pool = OnboardingPool(manifest_path)
+    _fill(pool, 1)
+    lease = pool.lease(KIND, BASE_URL)
+    pool.release(lease)
+
+    assert pool.lease(KIND, BASE_URL).onboarding == lease.onboarding
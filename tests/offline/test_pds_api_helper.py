@@ -0,0 +1,328 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from mavis.test.constants import PdsEndpoints
+from mavis.test.fixtures.fhir_api import AuthToken
+from mavis.test.helpers.pds_api_helper import (
+    MAX_ATTEMPTS,
+    PdsApiHelper,
+    PdsValidationCache,
+    TokenBucket,
+)
+
+PATIENT_PATH = "/personal-demographics/FHIR/R4/Patient"
+THROTTLED_TIMES = 2
+TOKENS = 5
+TOKENS_PER_SECOND = 50
+
+
+def _resource(patient) -> dict:
+    return {
+        "resourceType": "Patient",
+        "id": patient.nhs_number,
+        "name": [{"given": [patient.given_name], "family": patient.family_name}],
+        "birthDate": patient.date_of_birth.isoformat(),
+        "address": [
+            {
+                "use": "home",
+                "line": [
+                    patient.address_line_1,
+                    patient.address_line_2,
+                    patient.address_town,
+                ],
+                "postalCode": patient.address_postcode,
+            }
+        ],
+    }
+
+
+class _PdsStub:
+    """
+    Patients served by the PDS stub, by NHS number. Looking up a patient is
+    answered 429 for as many times as throttled says first, and 404 for an
+    NHS number with no patient.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.patients: dict[str, dict] = {}
+        self.throttled: Counter[str] = Counter()
+        self.lookups: Counter[str] = Counter()
+        self.searches = 0
+
+
+class _PdsStubHandler(BaseHTTPRequestHandler):
+    stub: _PdsStub
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == PATIENT_PATH:
+            self._search(parse_qs(url.query))
+            return
+
+        nhs_number = url.path.removeprefix(f"{PATIENT_PATH}/")
+        with self.stub.lock:
+            self.stub.lookups[nhs_number] += 1
+            throttled = self.stub.throttled[nhs_number] > 0
+            self.stub.throttled[nhs_number] -= throttled
+        if throttled:
+            self._send(429, {"issue": [{"code": "throttled"}]})
+        elif nhs_number in self.stub.patients:
+            self._send(200, self.stub.patients[nhs_number])
+        else:
+            self._send(404, {"issue": [{"code": "not-found"}]})
+
+    def _search(self, query: dict[str, list[str]]) -> None:
+        with self.stub.lock:
+            self.stub.searches += 1
+        entries = [
+            {"resource": resource}
+            for resource in self.stub.patients.values()
+            if resource["name"][0]["family"] == query["family"][0]
+            and resource["name"][0]["given"][0] == query["given"][0]
+            and f"eq{resource['birthDate']}" == query["birthdate"][0]
+            and resource["address"][0]["postalCode"].replace(" ", "")
+            == query["address-postcode"][0]
+        ]
+        self._send(
+            200,
+            {"resourceType": "Bundle", "total": len(entries)}
+            | ({"entry": entries} if entries else {}),
+        )
+
+    def _send(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/fhir+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def pds_stub(monkeypatch):
+    stub = _PdsStub()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), type("_PdsStubHandler", (_PdsStubHandler,), {"stub": stub})
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # PdsEndpoints reads the base URL from the environment
+    monkeypatch.setenv("IMMS_BASE_URL", f"http://127.0.0.1:{server.server_port}/")
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "pds_validation.json"
+
+
+@pytest.fixture
+def helper(pds_stub, cache_path):
+    # one worker, so candidates are looked up in order
+    return PdsApiHelper(
+        AuthToken("offline"),
+        max_concurrency=1,
+        requests_per_second=1_000,
+        cache_path=cache_path,
+    )
+
+
+def _eligible_children(helper, count):
+    return helper._get_eligible_child_patients()[:count]  # noqa: SLF001
+
+
+def _find_valid_child(helper, children):
+    return asyncio.run(helper._find_valid_child_patient(children))  # noqa: SLF001
+
+
+def _cached_outcomes(cache_path) -> dict[str, bool]:
+    cache = json.loads(cache_path.read_text())
+    return {
+        nhs_number: outcome["valid"]
+        for nhs_number, outcome in cache[
+            PdsEndpoints.GET_PATIENT_DETAILS.to_url
+        ].items()
+    }
+
+
+def test_get_child_while_an_event_loop_is_running(monkeypatch):
+    """
+    Test: A child can be picked from the PDS export from a test that has an
+       event loop running, as sync Playwright does.
+    Steps:
+    1. Within a running event loop, pick a child, with every candidate taken
+       to be valid rather than looked up in PDS.
+    Verification:
+    - A child from the export is returned rather than refusing to start
+      another event loop.
+    """
+    helper = PdsApiHelper(AuthToken("offline"), cache_path=None)
+
+    async def first_candidate(child_patients):
+        return child_patients[0]
+
+    monkeypatch.setattr(helper, "_find_valid_child_patient", first_candidate)
+
+    async def get_child():
+        return helper.get_random_child_patient_without_date_of_death()
+
+    child = asyncio.run(get_child())
+
+    assert child.nhs_number in {patient.nhs_number for patient in helper.patients}
+
+
+def test_find_valid_child_patient(helper, pds_stub, cache_path):
+    """
+    Test: Children are looked up in PDS until one matches, retrying those PDS
+       is rate limiting.
+    Steps:
+    1. Serve one child with a different name, none for another, and the third
+       as in the export, after two 429s. The fourth is always rate limited.
+    2. Pick a valid child from the four.
+    Verification:
+    - The third child is picked, after three lookups.
+    - The rate limited child is looked up at most MAX_ATTEMPTS times.
+    - The cache records the first two as outdated and the third as valid, and
+      nothing for the fourth.
+    """
+    mismatched, missing, valid, throttled = _eligible_children(helper, 4)
+    pds_stub.patients[mismatched.nhs_number] = _resource(
+        mismatched._replace(family_name="Different")
+    )
+    pds_stub.patients[valid.nhs_number] = _resource(valid)
+    pds_stub.throttled[valid.nhs_number] = THROTTLED_TIMES
+    pds_stub.throttled[throttled.nhs_number] = MAX_ATTEMPTS * 2
+
+    child = _find_valid_child(helper, [mismatched, missing, valid, throttled])
+
+    assert child == valid
+    assert pds_stub.lookups[valid.nhs_number] == THROTTLED_TIMES + 1
+    assert pds_stub.lookups[throttled.nhs_number] <= MAX_ATTEMPTS
+    assert pds_stub.searches == 1
+    assert _cached_outcomes(cache_path) == {
+        mismatched.nhs_number: False,
+        missing.nhs_number: False,
+        valid.nhs_number: True,
+    }
+
+
+def test_find_valid_child_patient_gives_up_when_rate_limited(
+    helper, pds_stub, cache_path
+):
+    """
+    Test: Children PDS keeps rate limiting are given up on.
+    Steps:
+    1. Answer every lookup with a 429.
+    2. Pick a valid child from two.
+    Verification:
+    - Picking fails, after MAX_ATTEMPTS lookups of each child.
+    - Nothing is cached, as nothing was learned.
+    """
+    children = _eligible_children(helper, 2)
+    for child in children:
+        pds_stub.throttled[child.nhs_number] = MAX_ATTEMPTS * 2
+
+    with pytest.raises(RuntimeError, match="outdated"):
+        _find_valid_child(helper, children)
+
+    assert pds_stub.lookups == {child.nhs_number: MAX_ATTEMPTS for child in children}
+    assert not cache_path.exists()
+
+
+def test_find_valid_child_patient_uses_the_cache(helper, pds_stub, cache_path):
+    """
+    Test: Children cached as outdated are skipped and those cached as valid are
+       tried first, until their outcome expires.
+    Steps:
+    1. Cache one child as outdated, one as valid a long time ago and one as
+       valid recently, alongside an outcome for another PDS environment.
+    2. Serve all three as in the export, and pick a valid child.
+    Verification:
+    - The recently valid child is picked, and the only one looked up.
+    - The other environment's outcome is kept when the cache is saved.
+    """
+    outdated, expired, recent = _eligible_children(helper, 3)
+    for child in (outdated, expired, recent):
+        pds_stub.patients[child.nhs_number] = _resource(child)
+    now = datetime.now(tz=UTC)
+    other_environment = {"9999999999": {"valid": True, "checked_at": now.isoformat()}}
+    cache_path.write_text(
+        json.dumps(
+            {
+                PdsEndpoints.GET_PATIENT_DETAILS.to_url: {
+                    outdated.nhs_number: {
+                        "valid": False,
+                        "checked_at": now.isoformat(),
+                    },
+                    expired.nhs_number: {
+                        "valid": True,
+                        "checked_at": (now - timedelta(days=30)).isoformat(),
+                    },
+                    recent.nhs_number: {
+                        "valid": True,
+                        "checked_at": now.isoformat(),
+                    },
+                },
+                "other": other_environment,
+            }
+        )
+    )
+
+    child = _find_valid_child(helper, [outdated, expired, recent])
+
+    assert child == recent
+    assert pds_stub.lookups == {recent.nhs_number: 1}
+    assert json.loads(cache_path.read_text())["other"] == other_environment
+
+
+def test_validation_cache_merges_outcomes_and_expires(cache_path):
+    """
+    Test: Outcomes saved by two runs at once are both kept, and outcomes
+       older than the TTL are forgotten.
+    Verification:
+    - A cache loaded after both runs saved knows both outcomes.
+    - A cache with a TTL of zero knows neither.
+    """
+    first = PdsValidationCache(cache_path, timedelta(days=1), "int")
+    second = PdsValidationCache(cache_path, timedelta(days=1), "int")
+    first.set("1111111111", valid=True)
+    second.set("2222222222", valid=False)
+    first.save()
+    second.save()
+
+    cache = PdsValidationCache(cache_path, timedelta(days=1), "int")
+    assert cache.is_valid("1111111111") is True
+    assert cache.is_valid("2222222222") is False
+
+    expired = PdsValidationCache(cache_path, timedelta(0), "int")
+    assert expired.is_valid("1111111111") is None
+    assert expired.is_valid("2222222222") is None
+
+
+def test_token_bucket_spaces_out_requests():
+    """
+    Test: Requests through a token bucket are held to its rate.
+    Verification:
+    - Five requests at 50 a second, with no burst, take at least 80ms.
+    """
+
+    async def acquire_all() -> float:
+        bucket = TokenBucket(TOKENS_PER_SECOND)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(TOKENS)))
+        return time.monotonic() - start
+
+    assert asyncio.run(acquire_all()) >= (TOKENS - 1) / TOKENS_PER_SECOND * 0.95
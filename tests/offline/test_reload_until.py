@@ -0,0 +1,56 @@
+import pytest
+
+from mavis.test import utils
+from mavis.test.utils import WAIT_MAX_INTERVAL_SECONDS, _reload_until
+
+RELOADS = 2
+
+
+class _Page:
+    def __init__(self) -> None:
+        self.reloads = 0
+
+    def reload(self) -> None:
+        self.reloads += 1
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr(
+        utils, "deliberate_sleep", lambda seconds, _reason: sleeps.append(seconds)
+    )
+    return sleeps
+
+
+def test_reload_until_backs_off_for_the_whole_budget(sleeps):
+    """
+    Test: Waiting for a condition that never holds backs off for the whole
+       time allowed, however long the reloads take, with checks at most about a
+       second apart.
+    Verification:
+    - The time spent backing off adds up to the time allowed.
+    - No interval is longer than WAIT_MAX_INTERVAL_SECONDS, and the page is
+      reloaded after each one.
+    """
+    page = _Page()
+
+    _reload_until(page, lambda: False, 10, "nothing")
+
+    assert sum(sleeps) == pytest.approx(10)
+    assert max(sleeps) <= WAIT_MAX_INTERVAL_SECONDS
+    assert page.reloads == len(sleeps)
+
+
+def test_reload_until_stops_once_the_condition_holds(sleeps):
+    """
+    Test: Waiting stops at the first check the condition holds.
+    Verification:
+    - The page is reloaded until the third check, and not after.
+    """
+    page = _Page()
+
+    _reload_until(page, lambda: page.reloads >= RELOADS, 10, "two reloads")
+
+    assert page.reloads == RELOADS
+    assert len(sleeps) == RELOADS
@@ -3,7 +3,10 @@ import pytest
 from mavis.test.annotations import issue
 from mavis.test.constants import ConsentOption, DeliverySite, Programme, Vaccine
 from mavis.test.data import ClassFileMapping, VaccsFileMapping
-from mavis.test.helpers.imms_api_helper import ImmsApiHelper
+from mavis.test.helpers.imms_api_helper import (
+    AsyncImmsApiHelper,
+    ImmsApiVaccinationRecord,
+)
 from mavis.test.pages import (
     DashboardPage,
     EditVaccinationRecordPage,
@@ -23,7 +26,7 @@ pytestmark = pytest.mark.imms_api
 
 @pytest.fixture(scope="session")
 def imms_api_helper(authenticate_api):
-    return ImmsApiHelper(authenticate_api)
+    return AsyncImmsApiHelper(authenticate_api)
 
 
 @pytest.fixture
@@ -99,13 +102,10 @@ def test_create_edit_delete_injected_flu_vaccination_and_verify_imms_api(
     )
 
     # Step 3: Verify creation in IMMS API
-    imms_api_helper.check_record_in_imms_api(
-        Vaccine.SEQUIRUS,
-        child,
-        school,
-        DeliverySite.LEFT_ARM_UPPER,
-        vaccination_time,
+    created_record = ImmsApiVaccinationRecord.from_values(
+        Vaccine.SEQUIRUS, child, DeliverySite.LEFT_ARM_UPPER, school, vaccination_time
     )
+    imms_api_helper.check_records_in_imms_api([created_record])
 
     # Step 4: Edit delivery site to RIGHT_ARM_LOWER
     VaccinationRecordPage(page).page.reload()
@@ -120,13 +120,8 @@ def test_create_edit_delete_injected_flu_vaccination_and_verify_imms_api(
     EditVaccinationRecordPage(page).click_save_changes()
 
     # Step 5: Verify update in IMMS API
-    imms_api_helper.check_record_in_imms_api(
-        Vaccine.SEQUIRUS,
-        child,
-        school,
-        DeliverySite.RIGHT_ARM_UPPER,
-        vaccination_time,
-    )
+    updated_record = created_record._replace(delivery_site=DeliverySite.RIGHT_ARM_UPPER)
+    imms_api_helper.check_records_in_imms_api([updated_record])
 
     # Step 6: Edit outcome to refused
     SessionsPatientPage(page).click_vaccination_details()
@@ -141,7 +136,7 @@ def test_create_edit_delete_injected_flu_vaccination_and_verify_imms_api(
     EditVaccinationRecordPage(page).click_save_changes()
 
     # Step 7: Verify deletion in IMMS API
-    imms_api_helper.check_record_is_not_in_imms_api(Vaccine.SEQUIRUS, child)
+    imms_api_helper.check_records_are_not_in_imms_api([updated_record])
     SessionsPatientPage(page).click_vaccination_details()
     VaccinationRecordPage(page).expect_vaccination_details(
         "Synced with NHS England?", "Not synced"
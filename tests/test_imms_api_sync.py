@@ -1,9 +1,7 @@
 import json
 import re
-import urllib.parse
 from datetime import timedelta
 
-import httpx
 import pytest
 from playwright.sync_api import expect
 
@@ -17,6 +15,7 @@ from mavis.test.pages import (
     DashboardPage,
     VaccinationRecordPage,
 )
+from mavis.test.testing_api import MavisTestingApiClient
 from mavis.test.utils import deliberate_sleep, get_current_datetime
 
 pytestmark = pytest.mark.imms_api
@@ -90,12 +89,12 @@ def test_create_imms_record_then_verify_on_children_page(
         vaccination_time=vaccination_time,
     )
 
-    api_url = urllib.parse.urljoin(base_url, "api/testing/vaccinations-search-in-nhs")
-    httpx.post(api_url, timeout=30).raise_for_status()
+    testing_api = MavisTestingApiClient.for_base_url(base_url)
+    testing_api.post("vaccinations-search-in-nhs").raise_for_status()
 
     # Poll until the search queue has drained (GET returns 200 when empty)
     for _ in range(1200):
-        r = httpx.get(api_url, timeout=30)
+        r = testing_api.get("vaccinations-search-in-nhs")
         if r.is_success:
             break
         deliberate_sleep(0.25, "waiting for IMMS search queue to drain")
@@ -6,7 +6,7 @@ from mavis.test.pages import (
     SessionsOverviewPage,
     StartPage,
 )
-from mavis.test.utils import assert_questions_in_pdf, read_pdf_as_normalized_text
+from mavis.test.utils import assert_questions_in_pdf
 
 
 @pytest.fixture
@@ -152,14 +152,12 @@ def test_pdf_consent_form_contains_health_questions(
     Verifies that the downloadable PDF consent form includes all health questions
     that parents need to answer when giving consent for their child to be vaccinated.
     """
-    pdf_text_normalized = read_pdf_as_normalized_text(
-        SessionsOverviewPage(page).download_consent_form(programme)
-    )
+    consent_form = SessionsOverviewPage(page).download_consent_form(programme)
 
     expected_questions = programme.health_questions()
 
     assert_questions_in_pdf(
-        pdf_text_normalized,
+        consent_form,
         expected_questions,
         context=f"{programme} consent PDF",
     )
@@ -9,7 +9,6 @@ from mavis.test.pages import (
 from mavis.test.utils import (
     assert_questions_in_pdf,
     generate_random_dob_for_mmr_not_mmrv,
-    read_pdf_as_normalized_text,
 )
 
 
@@ -140,14 +139,12 @@ def test_pdf_consent_form_contains_health_questions(
     """
     programme = Programme.MMR_MMRV
 
-    pdf_text_normalized = read_pdf_as_normalized_text(
-        SessionsOverviewPage(page).download_consent_form(programme)
-    )
+    consent_form = SessionsOverviewPage(page).download_consent_form(programme)
 
     expected_questions = programme.health_questions(consent_option)
 
     assert_questions_in_pdf(
-        pdf_text_normalized,
+        consent_form,
         expected_questions,
         context=f"{programme} {consent_option} consent PDF",
     )
@@ -9,7 +9,7 @@ from mavis.test.pages import (
     SessionsOverviewPage,
     StartPage,
 )
-from mavis.test.utils import assert_questions_in_pdf, read_pdf_as_normalized_text
+from mavis.test.utils import assert_questions_in_pdf
 
 
 @pytest.fixture
@@ -162,8 +162,8 @@ def test_pdf_consent_form_contains_health_questions(
     """
     programme = Programme.MMR_MMRV
 
-    pdf_text_normalized = read_pdf_as_normalized_text(
-        SessionsOverviewPage(page).download_consent_form(programme, prefer_mmrv=True)
+    consent_form = SessionsOverviewPage(page).download_consent_form(
+        programme, prefer_mmrv=True
     )
 
     expected_questions = programme.health_questions(
@@ -171,7 +171,7 @@ def test_pdf_consent_form_contains_health_questions(
     )
 
     assert_questions_in_pdf(
-        pdf_text_normalized,
+        consent_form,
         expected_questions,
         context=f"MMRV {consent_option} consent PDF",
     )
@@ -1,17 +1,20 @@
+import functools
 import random
-import urllib.parse
 from datetime import UTC, datetime
 
-import httpx
 import pytest
 
 from mavis.test.constants import Programme
 from mavis.test.data import ClassFileMapping, VaccsFileMapping
 from mavis.test.data.file_generator import FileGenerator
 from mavis.test.data_models import Child
-from mavis.test.fixtures.onboarding import _create_onboarding_with_retry
-from mavis.test.fixtures.team_reset import _delete_team
-from mavis.test.onboarding import PointOfCareOnboarding
+from mavis.test.fixtures.team_reset import (
+    _delete_team,
+    _reset_team,
+    _return_leased_team,
+)
+from mavis.test.onboarding import PointOfCareOnboarding, create_onboarding_with_retry
+from mavis.test.onboarding_pool import OnboardingPool, PooledTeam
 from mavis.test.pages import (
     DashboardPage,
     ImportRecordsWizardPage,
@@ -28,6 +31,7 @@ from mavis.test.pages import (
     SessionsOverviewPage,
 )
 from mavis.test.pages.utils import schedule_school_session_if_needed
+from mavis.test.testing_api import MavisTestingApiClient
 
 pytestmark = [pytest.mark.reporting]
 
@@ -43,13 +47,35 @@ def _onboard_team(base_url):
         base_url=base_url,
         year_groups=_school_year_groups,
     )
-    return _create_onboarding_with_retry(base_url, onboarding)
+    return create_onboarding_with_retry(
+        MavisTestingApiClient.for_base_url(base_url), onboarding
+    )
+
+
+def _team(base_url):
+    """
+    A team with schools for the year groups of this module, leased from the
+    pool if one is set up with such a team, or onboarded and deleted after.
+    """
+    testing_api = MavisTestingApiClient.for_base_url(base_url)
+    pool = OnboardingPool.from_environment()
+    lease = pool and pool.lease(
+        PooledTeam.POINT_OF_CARE,
+        base_url,
+        school_year_groups=_school_year_groups,
+        reset=functools.partial(_reset_team, testing_api),
+    )
+    if lease:
+        yield lease.onboarding
+        _return_leased_team(testing_api, pool, lease)
+    else:
+        onboarding = _onboard_team(base_url)
+        yield onboarding
+        _delete_team(testing_api, onboarding.team)
 
 
 def _refresh_reporting(base_url):
-    url = urllib.parse.urljoin(base_url, "api/testing/refresh-reporting?wait=true")
-    response = httpx.get(url, timeout=60)
-    response.raise_for_status()
+    MavisTestingApiClient.for_base_url(base_url).refresh_reporting()
 
 
 def _make_file_generator(onboarding, children_list):
@@ -89,16 +115,12 @@ def _download_aggregate_csv(page, programme):
 
 @pytest.fixture(scope="module")
 def team_a(base_url):
-    onboarding = _onboard_team(base_url)
-    yield onboarding
-    _delete_team(base_url, onboarding.team)
+    yield from _team(base_url)
 
 
 @pytest.fixture(scope="module")
 def team_b(base_url):
-    onboarding = _onboard_team(base_url)
-    yield onboarding
-    _delete_team(base_url, onboarding.team)
+    yield from _team(base_url)
 
 
 @pytest.fixture(scope="module")